@@ -0,0 +1,42 @@
+import os
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from be.utils.cache import render_cache
+from be.utils.documents import render_document_page, compare_document_page_formats, DocumentNotFoundError
+
+router = APIRouter()
+
+@router.get("/images/{image_key:path}")
+async def get_image(image_key: str):
+    """렌더 캐시에 저장된 이미지 반환"""
+    image_path = render_cache.get(os.path.normpath(image_key))
+    if image_path is None:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    return FileResponse(image_path)
+
+@router.get("/documents/{doc_id}/pages/{page_number}/image")
+def get_page_image(doc_id: str, page_number: int, size: str = "display", profile: Optional[str] = None):
+    """문서 페이지 이미지 반환 (처음 요청 시 렌더링 후 캐시에서 제공)"""
+    # 렌더링이 이벤트 루프를 막지 않도록 동기 함수로 선언하여 스레드풀에서 실행
+    try:
+        image_path = render_document_page(doc_id, page_number, size, profile)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FileResponse(image_path)
+
+@router.get("/documents/{doc_id}/pages/{page_number}/formats")
+def get_page_image_formats(doc_id: str, page_number: int):
+    """페이지를 PNG와 각 이미지 프로파일로 인코딩했을 때의 크기 비교"""
+    try:
+        report = compare_document_page_formats(doc_id, page_number)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {
+        "success": True,
+        "doc_id": doc_id,
+        "page_number": page_number,
+        **report
+    }
@@ -0,0 +1,76 @@
+import json
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from be.services.jobs import job_manager, JobNotFoundError
+
+router = APIRouter()
+
+class IndexJobRequest(BaseModel):
+    data_dir: Optional[str] = None
+    pdf_paths: Optional[List[str]] = None
+    force: bool = False
+
+@router.post("/jobs")
+def create_index_job(request: IndexJobRequest):
+    """
+    폴더 또는 PDF 목록 일괄 인덱싱 작업 등록
+    등록 시 폴더 탐색, PDF 페이지 수 확인, 작업 저장소 기록이 일어나므로 이벤트 루프가 아닌 스레드풀에서 실행
+    """
+    try:
+        job = job_manager.submit(request.pdf_paths, request.data_dir, force=request.force)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, **job.get_status()}
+
+@router.get("/jobs")
+async def list_index_jobs():
+    """인덱싱 작업 목록"""
+    return {
+        "success": True,
+        "jobs": [job.get_status() for job in job_manager.list_jobs()]
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_index_job(job_id: str):
+    """인덱싱 작업 상태 (처리량, 남은 시간, 문서별 결과)"""
+    try:
+        job = job_manager.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"success": True, **job.get_status(with_results=True)}
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_index_job(job_id: str, interval: float = 1.0):
+    """인덱싱 작업 진행 상황 스트리밍 (SSE, 작업 종료 시 문서별 결과 포함)"""
+    try:
+        job = job_manager.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    async def generate_progress():
+        while not job.is_finished:
+            yield f"data: {json.dumps(job.get_status(), ensure_ascii=False)}\n\n"
+            await asyncio.sleep(max(interval, 0.2))
+        yield f"data: {json.dumps(job.get_status(with_results=True), ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        generate_progress(),
+        media_type="text/plain",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Content-Type": "text/event-stream",
+        }
+    )
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_index_job(job_id: str):
+    """인덱싱 작업 취소"""
+    try:
+        job = job_manager.cancel(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"success": True, **job.get_status()}
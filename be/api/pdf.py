@@ -1,12 +1,13 @@
 import os
 import json
 import queue
-import threading
+import asyncio
+from typing import List, Optional
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from be.config import api_config
 from be.services.service_manager import service_manager
+from be.services.jobs import job_manager
 
 router = APIRouter()
 
@@ -19,28 +20,60 @@ async def get_pdf_list():
 @router.get("/pdf-preview")
 async def get_pdf_preview(pdf_path: str):
     """PDF 첫 페이지 미리보기 이미지 생성"""
-    result = service_manager.rag_service.get_pdf_preview(pdf_path, api_config.TEMP_IMAGE_DIR)
-    
-    if result.get("success") and result.get("preview_path"):
-        # 파일명만 추출해서 반환
-        preview_path = result["preview_path"]
-        filename = os.path.basename(preview_path)
-        result["image_name"] = filename
-    
-    return result
+    # 썸네일 렌더링이 이벤트 루프를 막지 않도록 스레드에서 실행
+    return await asyncio.to_thread(service_manager.rag_service.get_pdf_preview, pdf_path)
+
+class PdfPreviewsRequest(BaseModel):
+    pdf_paths: List[str]
+
+@router.post("/pdf-previews")
+async def get_pdf_previews(request: PdfPreviewsRequest):
+    """여러 PDF의 첫 페이지 미리보기 썸네일을 한 번에 생성"""
+    return await asyncio.to_thread(service_manager.rag_service.get_pdf_previews, request.pdf_paths)
 
 class IndexPdfRequest(BaseModel):
     pdf_path: str
+    force: bool = False
 
 @router.post("/index-pdf")
 async def index_pdf(request: IndexPdfRequest):
-    """선택된 PDF 인덱싱 (논블로킹)"""
-    return service_manager.rag_service.process_pdf(request.pdf_path)
+    """선택된 PDF 인덱싱 (변경된 페이지만 다시 인덱싱, 인덱싱 작업 워커 풀에서 실행)"""
+    # 작업 등록(페이지 수 확인, 작업 저장소 기록)과 종료 대기가 이벤트 루프를 막지 않도록 스레드에서 실행
+    try:
+        job = await asyncio.to_thread(job_manager.submit, [request.pdf_path], force=request.force)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    await asyncio.to_thread(job.wait)
+    return {**job.results.get(request.pdf_path, {}), "job_id": job.job_id}
+
+@router.get("/index-diff")
+def get_index_diff(data_dir: Optional[str] = None, page_diff: bool = True):
+    """데이터 폴더를 다시 인덱싱할 때 추가/변경/삭제될 문서와 페이지 확인 (dry-run)"""
+    return service_manager.rag_service.diff_index(data_dir, page_diff=page_diff)
+
+class ReindexRequest(BaseModel):
+    data_dir: Optional[str] = None
+    force: bool = False
+    dry_run: bool = False
+
+@router.post("/reindex")
+def reindex(request: ReindexRequest):
+    """
+    데이터 폴더 다시 인덱싱 (새 문서/변경된 문서만 인덱싱, 사라진 문서는 삭제)
+    인덱싱 작업으로 등록하고 바로 반환하므로 진행 상황은 /jobs/{job_id}로 확인
+    """
+    if request.dry_run:
+        return service_manager.rag_service.diff_index(request.data_dir)
+    try:
+        job = job_manager.submit(None, request.data_dir, force=request.force)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return {"success": True, "message": "폴더 인덱싱 작업 등록", **job.get_status()}
 
 
 @router.get("/index-pdf-stream")
-async def index_pdf_stream(pdf_path: str):
-    """선택된 PDF 인덱싱 with 실시간 진행상황 스트리밍"""
+async def index_pdf_stream(pdf_path: str, force: bool = False):
+    """선택된 PDF 인덱싱 with 실시간 진행상황 스트리밍 (인덱싱 작업 워커 풀에서 실행)"""
     
     async def generate_progress():
         # 스레드 안전한 큐 사용
@@ -50,62 +83,34 @@ async def index_pdf_stream(pdf_path: str):
             # 동기적으로 큐에 데이터 추가
             progress_queue.put(data)
         
-        # 백그라운드에서 인덱싱 실행
-        def run_indexing():
-            try:
-                result = service_manager.rag_service.process_pdf(pdf_path, progress_callback)
-                progress_queue.put({"status": "done", "result": result})
-            except Exception as e:
-                progress_queue.put({
-                    "status": "error", 
-                    "message": f"인덱싱 중 오류 발생: {str(e)}"
-                })
-        
-        # 스레드로 인덱싱 작업 시작
-        indexing_thread = threading.Thread(target=run_indexing)
-        indexing_thread.start()
+        # 인덱싱 작업으로 등록하여 동시에 실행되는 인덱싱 수를 제한
+        try:
+            job = await asyncio.to_thread(job_manager.submit, [pdf_path], force=force,
+                                        progress_callback=progress_callback)
+        except ValueError as e:
+            yield f"data: {json.dumps({'status': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            return
         
         try:
             while True:
                 try:
-                    # 논블로킹으로 큐에서 데이터 가져오기 (타임아웃 1초)
-                    try:
-                        data = progress_queue.get(timeout=1.0)
-                        
-                        # SSE 형식으로 데이터 전송
-                        yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-                        
-                        # 완료 또는 에러 시 종료
-                        if data.get("status") in ["done", "error"]:
-                            break
-                            
-                    except queue.Empty:
-                        # 타임아웃 시 연결 유지를 위한 heartbeat
-                        yield f"data: {json.dumps({'status': 'heartbeat'})}\n\n"
-                        
-                    # 스레드가 종료되었는지 확인
-                    if not indexing_thread.is_alive():
-                        # 큐에 남은 데이터가 있는지 확인
-                        try:
-                            while True:
-                                data = progress_queue.get_nowait()
-                                yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-                                if data.get("status") in ["done", "error"]:
-                                    break
-                        except queue.Empty:
-                            break
+                    # 큐에서 데이터 가져오기 (타임아웃 1초)
+                    data = await asyncio.to_thread(progress_queue.get, timeout=1.0)
+                    
+                    # SSE 형식으로 데이터 전송
+                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+                    
+                except queue.Empty:
+                    # 작업이 끝났으면 결과 전송 후 종료
+                    if job.is_finished:
+                        result = job.results.get(pdf_path, {})
+                        yield f"data: {json.dumps({'status': 'done', 'result': result}, ensure_ascii=False)}\n\n"
                         break
-                        
-                except Exception as e:
-                    yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
-                    break
+                    # 타임아웃 시 연결 유지를 위한 heartbeat
+                    yield f"data: {json.dumps({'status': 'heartbeat'})}\n\n"
                     
         except Exception as e:
             yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
-        finally:
-            # 스레드가 아직 실행 중이면 종료될 때까지 대기
-            if indexing_thread.is_alive():
-                indexing_thread.join(timeout=5.0)
     
     return StreamingResponse(
         generate_progress(), 
@@ -1,9 +1,22 @@
 from fastapi import APIRouter
 from be.services.service_manager import service_manager
+from be.utils.cache import render_cache, embedding_cache, query_cache
+from be.utils.pdf import get_encoding_stats
 
 router = APIRouter()
 
 @router.get("/status")
 async def get_status():
     """서비스 상태 확인"""
-    return service_manager.rag_service.get_status()
\ No newline at end of file
+    return service_manager.rag_service.get_status()
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """렌더 캐시, 임베딩 캐시, 쿼리 임베딩 캐시 및 이미지 인코딩 통계 확인"""
+    return {
+        "success": True,
+        "render_cache": render_cache.get_stats(),
+        "embedding_cache": embedding_cache.get_stats(),
+        "query_cache": query_cache.get_stats(),
+        "image_encoding": get_encoding_stats()
+    }
@@ -0,0 +1,63 @@
+import os
+# tokenizers 경고 메시지 제거
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.cors import CORSMiddleware
+from be.config import api_config, settings
+from be.api.frontend import router as frontend_router
+from be.api.images import router as images_router
+from be.api.jobs import router as jobs_router
+from be.api.pdf import router as pdf_router
+from be.api.rag import router as rag_router
+from be.api.system import router as system_router
+from be.utils.documents import prewarm_thumbnails
+from be.services.jobs import job_manager
+from be.core.models import colpali_manager
+from be.utils.pdf import shutdown_render_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # PDF 목록 썸네일을 백그라운드에서 미리 렌더링
+    if settings.prewarm_thumbnails:
+        threading.Thread(target=prewarm_thumbnails, daemon=True).start()
+    # 서버 종료로 중단된 인덱싱 작업을 마지막 체크포인트부터 재개
+    if settings.resume_jobs:
+        job_manager.resume_unfinished()
+    yield
+    # 임베딩 워커 프로세스 종료
+    if settings.embedding_workers > 0:
+        colpali_manager.unload()
+    # PDF 렌더링 프로세스 종료
+    shutdown_render_pool()
+
+
+app = FastAPI(title="ColPali RAG API", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# 디렉토리 생성
+if not os.path.exists(api_config.STATIC_DIR):
+    os.makedirs(api_config.STATIC_DIR)
+
+if not os.path.exists(api_config.TEMP_IMAGE_DIR):
+    os.makedirs(api_config.TEMP_IMAGE_DIR)
+
+app.mount("/static", StaticFiles(directory=api_config.STATIC_DIR), name="static")
+
+app.include_router(frontend_router)
+app.include_router(images_router)
+app.include_router(jobs_router)
+app.include_router(pdf_router)
+app.include_router(rag_router)
+app.include_router(system_router)
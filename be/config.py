@@ -12,7 +12,83 @@ class ColPaliConfig:
     PROCESSOR_NAME = "vidore/colpaligemma2-3b-pt-448-base"
     COLLECTION_NAME = "colpali-documents"
     QDRANT_URL = ":memory:"  # 메모리 DB 사용, 실제 배포시에는 외부 URL 사용
-    BATCH_SIZE = 4
+    QDRANT_PREFER_GRPC = False  # 원격 Qdrant에 gRPC로 연결 (벡터를 JSON 대신 protobuf float32로 전송)
+    QDRANT_GRPC_PORT = 6334
+    BATCH_SIZE = 4  # 초기 임베딩 배치 크기
+    
+    # 임베딩 배치 크기 자동 조정
+    ADAPTIVE_BATCH = True  # 처리량 측정 결과에 따라 배치 크기 조정
+    MIN_BATCH_SIZE = 1
+    MAX_BATCH_SIZE = 32
+    BATCH_MEMORY_CEILING = 0.85  # 배치 크기를 줄이는 메모리 사용률 상한 (CPU: 시스템 RAM, CUDA: GPU 메모리)
+    
+    # 쿼리 마이크로 배치 (동시에 들어온 /query, /chat 쿼리를 한 번의 forward로 임베딩)
+    QUERY_BATCH_MAX_WAIT_MS = 5  # 첫 쿼리 도착 후 추가 쿼리를 기다리는 최대 시간 (0이면 이미 대기 중인 쿼리만 묶음)
+    QUERY_BATCH_MAX_SIZE = 16
+    
+    # 쿼리 임베딩 캐시 (정규화한 쿼리 + 모델 식별자 기준, 메모리 LRU + TTL)
+    QUERY_CACHE = True
+    QUERY_CACHE_MAX_MB = 64
+    QUERY_CACHE_TTL = 3600  # 초
+    
+    # 추론 스케줄러 (쿼리 레인이 대기 중인 인덱싱 배치보다 먼저 실행됨)
+    INFERENCE_LANES = ("query", "indexing")  # 우선순위 순
+    INFERENCE_CONCURRENCY = 0  # 동시에 실행하는 forward 수 (0이면 임베딩 워커 수, 워커를 사용하지 않으면 1)
+    QUERY_LANE_CONCURRENCY = 0  # 레인별 동시 실행 수 (0이면 전체 제한만 적용)
+    INDEXING_LANE_CONCURRENCY = 0
+    RENDER_WORKERS = os.cpu_count() or 1  # PDF 페이지 렌더링 프로세스 수
+    
+    # 인덱싱 파이프라인 (render → preprocess → embed → upsert)
+    PREPROCESS_WORKERS = 2  # 이미지 전처리 스레드 수
+    EMBED_WORKERS = 1  # 모델 추론 스레드 수
+    UPSERT_WORKERS = 2  # Qdrant 저장 스레드 수
+    PIPELINE_QUEUE_SIZE = 4  # 단계 사이 큐에 대기할 수 있는 최대 배치 수
+    INDEXING_JOB_WORKERS = 1  # 일괄 인덱싱 작업에서 동시에 인덱싱하는 문서 수
+    
+    # 렌더링 프로파일
+    EMBED_RENDER_SIZE = None  # 임베딩용 렌더링 크기(짧은 변, px). None이면 프로세서 입력 크기 사용
+    EMBED_RENDER_SCALE = 1.0  # 프로세서 입력 크기 대비 임베딩용 렌더링 배율
+    DISPLAY_DPI = 350  # 표시/LLM 컨텍스트용 렌더링 DPI (요청 시 렌더링 후 재사용)
+    RENDER_CACHE_MAX_MB = 2048  # 렌더 캐시 디스크 용량 제한
+    DOCUMENT_POOL_SIZE = 8  # 요청 시 렌더링을 위해 열어두는 PDF 문서 수
+    MAX_PAGE_IMAGE_WIDTH = 4096  # 페이지 이미지 요청 시 허용하는 최대 너비(px)
+    THUMBNAIL_WIDTH = 320  # PDF 목록 미리보기 썸네일 너비(px)
+    
+    # 페이지 임베딩 캐시 (이미지 픽셀 해시 + 모델 식별자 기준)
+    EMBEDDING_CACHE = True
+    EMBEDDING_CACHE_DIR = "./embedding_cache"
+    EMBEDDING_CACHE_MAX_MB = 10240  # 임베딩 캐시 디스크 용량 제한
+    
+    # 페이지 텍스트 추출 방식: auto(텍스트 레이어 우선, 없으면 Vision OCR), vision(항상 Vision OCR)
+    TEXT_EXTRACTION = "auto"
+    MIN_TEXT_LAYER_CHARS = 50  # 텍스트 레이어를 사용하기 위한 최소 글자 수
+    
+    # 페이지 멀티벡터 토큰 풀링 (계층적 군집화로 토큰 수를 약 1/배율로 줄여 저장, 1이면 풀링하지 않음)
+    # 배율을 바꾸면 기존 문서는 다음 인덱싱 때 다시 임베딩됨
+    TOKEN_POOL_FACTOR = 1
+
+    # 2단계 검색: 페이지 요약 벡터(HNSW)로 후보를 찾고(prefetch), 후보만 전체 멀티벡터 MaxSim으로 다시 정렬
+    # 요약 벡터가 없는 기존 컬렉션은 전체 멀티벡터로 검색 (사용하려면 컬렉션을 새로 만들어 다시 인덱싱)
+    MULTIVECTOR_NAME = "colpali"  # 전체 멀티벡터 이름
+    SUMMARY_VECTOR_NAME = "summary"  # 요약 벡터 이름
+    SUMMARY_VECTORS = 4  # 페이지당 요약 벡터 수 (1이면 평균 벡터, 2 이상이면 토큰 임베딩 군집 중심)
+    PREFETCH_LIMIT = 100  # 1단계 후보 수 (0이면 전체 멀티벡터로 바로 검색)
+    
+    # 임베딩 전 페이지 필터
+    SKIP_BLANK_PAGES = True  # 빈 페이지 임베딩 생략
+    BLANK_PAGE_MAX_STDDEV = 2.0  # 빈 페이지로 판단하는 그레이스케일 표준편차 상한
+    DEDUPLICATE_PAGES = True  # 같은 문서 안에서 픽셀까지 같은 페이지는 원본 페이지 포인트를 참조
+    # 거의 같은 페이지(perceptual hash가 가깝고 텍스트 레이어가 같은 페이지)도 중복으로 처리
+    # 숫자 몇 글자만 다른 슬라이드도 해시가 가까우므로 텍스트 레이어가 없는 페이지는 대상에서 제외
+    NEAR_DUPLICATE_PAGES = False
+    DUPLICATE_HASH_DISTANCE = 4  # 거의 같은 페이지로 판단하는 perceptual hash(256bit) 최대 해밍 거리
+    
+    # 용도별 이미지 포맷/품질 프로파일 (format: png, jpeg, webp)
+    IMAGE_PROFILES = {
+        "display": {"format": "webp", "quality": 80},  # 브라우저 표시용
+        "thumbnail": {"format": "webp", "quality": 70},  # PDF 목록 썸네일
+        "llm": {"format": "jpeg", "quality": 85},  # LLM 컨텍스트 전송용
+    }
     
     @staticmethod
     def get_device() -> str:
@@ -26,11 +102,41 @@ class ColPaliConfig:
     
     DEFAULT_DATA_DIR = "./data"
     DEFAULT_OUTPUT_DIR = "./temp_images"
+    DEFAULT_MANIFEST_PATH = "./index_manifest.json"  # 인덱싱 기록 (변경된 문서/페이지만 다시 인덱싱)
+    DEFAULT_JOB_STORE_PATH = "./index_jobs.db"  # 인덱싱 작업/체크포인트 저장소 (SQLite)
     
     DEFAULT_SEARCH_LIMIT = 5
     SEARCH_TIMEOUT = 100
     
     TORCH_DTYPE = torch.bfloat16
+    
+    # 추론 프로파일
+    # bf16: TORCH_DTYPE 그대로 로드 (기본), fp32: float32로 로드,
+    # int8: float32로 로드 후 Linear 레이어를 동적 int8 양자화 (CPU 전용)
+    INFERENCE_PROFILES = ("bf16", "fp32", "int8")
+    INFERENCE_PROFILE = "bf16"
+    TORCH_COMPILE = False  # torch.compile 적용 여부 (첫 추론 시 컴파일 시간 소요)
+
+    # 추론 백엔드
+    # torch: PyTorch 모델 (추론 프로파일 적용), onnx: ONNX_DIR에 내보낸 그래프를 ONNX Runtime으로 실행
+    INFERENCE_BACKENDS = ("torch", "onnx")
+    INFERENCE_BACKEND = "torch"
+    ONNX_DIR = "./onnx"
+    ONNX_OPSET = 17
+    ONNX_THREADS = 0  # ONNX Runtime intra-op 스레드 수 (0이면 ONNX Runtime 기본값)
+    ONNX_PARITY_MIN_COSINE = 0.999  # 정합성 검사 통과 기준 (PyTorch 대비 토큰별 최소 코사인 유사도)
+
+    # 임베딩 워커 프로세스 (0이면 API 프로세스에서 직접 추론)
+    EMBEDDING_DIM = 128  # ColPali 멀티벡터 차원 수
+    EMBEDDING_WORKERS = 0
+    EMBEDDING_WORKER_THREADS = 0  # 워커별 torch 스레드 수 (0이면 CPU 코어 수 / 워커 수)
+    EMBEDDING_WORKER_START_TIMEOUT = 900  # 워커 모델 로딩 제한 시간(초)
+    EMBEDDING_WORKER_TASK_TIMEOUT = 600  # 배치 하나의 결과 대기 제한 시간(초)
+    EMBEDDING_WORKER_MAX_RESTARTS = 5  # 배치를 끝내지 못하고 연속으로 재시작할 수 있는 횟수 (넘으면 워커 중지, 풀은 unhealthy)
+    EMBEDDING_WORKER_RESTART_BACKOFF = 1.0  # 재시작 전 대기 시간(초), 연속 재시작마다 두 배로 증가
+    EMBEDDING_WORKER_MAX_RESTART_BACKOFF = 60.0
+    # 워커가 메모리 매핑으로 공유하는 모델 파일 폴더 (pickle 파일을 읽으므로 서버 실행 사용자 전용 폴더여야 함)
+    SHARED_WEIGHTS_DIR = "./model_cache"
 
 
 class AzureConfig:
@@ -57,9 +163,54 @@ class Settings:
     def __init__(self):
         self.data_dir = os.getenv("COLPALI_DATA_DIR", ColPaliConfig.DEFAULT_DATA_DIR)
         self.output_dir = os.getenv("COLPALI_OUTPUT_DIR", ColPaliConfig.DEFAULT_OUTPUT_DIR)
+        self.manifest_path = os.getenv("COLPALI_MANIFEST_PATH", ColPaliConfig.DEFAULT_MANIFEST_PATH)
+        self.job_store_path = os.getenv("COLPALI_JOB_STORE_PATH", ColPaliConfig.DEFAULT_JOB_STORE_PATH)
+        self.resume_jobs = os.getenv("COLPALI_RESUME_JOBS", "true").lower() == "true"
         self.qdrant_url = os.getenv("QDRANT_URL", ColPaliConfig.QDRANT_URL)
+        self.qdrant_prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", str(ColPaliConfig.QDRANT_PREFER_GRPC)).lower() == "true"
+        self.qdrant_grpc_port = int(os.getenv("QDRANT_GRPC_PORT", ColPaliConfig.QDRANT_GRPC_PORT))
         self.batch_size = int(os.getenv("COLPALI_BATCH_SIZE", ColPaliConfig.BATCH_SIZE))
+        self.adaptive_batch = os.getenv("COLPALI_ADAPTIVE_BATCH", str(ColPaliConfig.ADAPTIVE_BATCH)).lower() == "true"
+        self.max_batch_size = int(os.getenv("COLPALI_MAX_BATCH_SIZE", ColPaliConfig.MAX_BATCH_SIZE))
+        self.batch_memory_ceiling = float(os.getenv("COLPALI_BATCH_MEMORY_CEILING", ColPaliConfig.BATCH_MEMORY_CEILING))
+        self.query_batch_max_wait_ms = float(os.getenv("COLPALI_QUERY_BATCH_MAX_WAIT_MS", ColPaliConfig.QUERY_BATCH_MAX_WAIT_MS))
+        self.query_batch_max_size = int(os.getenv("COLPALI_QUERY_BATCH_MAX_SIZE", ColPaliConfig.QUERY_BATCH_MAX_SIZE))
+        self.query_cache = os.getenv("COLPALI_QUERY_CACHE", str(ColPaliConfig.QUERY_CACHE)).lower() == "true"
+        self.query_cache_max_mb = int(os.getenv("COLPALI_QUERY_CACHE_MAX_MB", ColPaliConfig.QUERY_CACHE_MAX_MB))
+        self.query_cache_ttl = float(os.getenv("COLPALI_QUERY_CACHE_TTL", ColPaliConfig.QUERY_CACHE_TTL))
+        self.inference_concurrency = int(os.getenv("COLPALI_INFERENCE_CONCURRENCY", ColPaliConfig.INFERENCE_CONCURRENCY))
+        self.query_lane_concurrency = int(os.getenv("COLPALI_QUERY_LANE_CONCURRENCY", ColPaliConfig.QUERY_LANE_CONCURRENCY))
+        self.indexing_lane_concurrency = int(
+            os.getenv("COLPALI_INDEXING_LANE_CONCURRENCY", ColPaliConfig.INDEXING_LANE_CONCURRENCY)
+        )
+        self.render_workers = int(os.getenv("COLPALI_RENDER_WORKERS", ColPaliConfig.RENDER_WORKERS))
+        self.preprocess_workers = int(os.getenv("COLPALI_PREPROCESS_WORKERS", ColPaliConfig.PREPROCESS_WORKERS))
+        self.embed_workers = int(os.getenv("COLPALI_EMBED_WORKERS", ColPaliConfig.EMBED_WORKERS))
+        self.upsert_workers = int(os.getenv("COLPALI_UPSERT_WORKERS", ColPaliConfig.UPSERT_WORKERS))
+        self.pipeline_queue_size = int(os.getenv("COLPALI_PIPELINE_QUEUE_SIZE", ColPaliConfig.PIPELINE_QUEUE_SIZE))
+        self.indexing_job_workers = int(os.getenv("COLPALI_INDEXING_JOB_WORKERS", ColPaliConfig.INDEXING_JOB_WORKERS))
+        self.save_page_images = os.getenv("COLPALI_SAVE_PAGE_IMAGES", "false").lower() == "true"
+        self.render_cache_max_mb = int(os.getenv("COLPALI_RENDER_CACHE_MAX_MB", ColPaliConfig.RENDER_CACHE_MAX_MB))
+        self.embedding_cache = os.getenv("COLPALI_EMBEDDING_CACHE", str(ColPaliConfig.EMBEDDING_CACHE)).lower() == "true"
+        self.embedding_cache_dir = os.getenv("COLPALI_EMBEDDING_CACHE_DIR", ColPaliConfig.EMBEDDING_CACHE_DIR)
+        self.embedding_cache_max_mb = int(os.getenv("COLPALI_EMBEDDING_CACHE_MAX_MB", ColPaliConfig.EMBEDDING_CACHE_MAX_MB))
+        self.document_pool_size = int(os.getenv("COLPALI_DOCUMENT_POOL_SIZE", ColPaliConfig.DOCUMENT_POOL_SIZE))
+        self.prewarm_thumbnails = os.getenv("COLPALI_PREWARM_THUMBNAILS", "true").lower() == "true"
+        self.token_pool_factor = int(os.getenv("COLPALI_TOKEN_POOL_FACTOR", ColPaliConfig.TOKEN_POOL_FACTOR))
+        self.summary_vectors = max(1, int(os.getenv("COLPALI_SUMMARY_VECTORS", ColPaliConfig.SUMMARY_VECTORS)))
+        self.prefetch_limit = int(os.getenv("COLPALI_PREFETCH_LIMIT", ColPaliConfig.PREFETCH_LIMIT))
+        self.text_extraction = os.getenv("COLPALI_TEXT_EXTRACTION", ColPaliConfig.TEXT_EXTRACTION)
         self.device = os.getenv("COLPALI_DEVICE", ColPaliConfig.get_device())
+        self.inference_profile = os.getenv("COLPALI_INFERENCE_PROFILE", ColPaliConfig.INFERENCE_PROFILE)
+        self.torch_compile = os.getenv("COLPALI_TORCH_COMPILE", str(ColPaliConfig.TORCH_COMPILE)).lower() == "true"
+        self.inference_backend = os.getenv("COLPALI_INFERENCE_BACKEND", ColPaliConfig.INFERENCE_BACKEND)
+        self.onnx_dir = os.getenv("COLPALI_ONNX_DIR", ColPaliConfig.ONNX_DIR)
+        self.onnx_threads = int(os.getenv("COLPALI_ONNX_THREADS", ColPaliConfig.ONNX_THREADS))
+        self.embedding_workers = int(os.getenv("COLPALI_EMBEDDING_WORKERS", ColPaliConfig.EMBEDDING_WORKERS))
+        self.embedding_worker_threads = int(
+            os.getenv("COLPALI_EMBEDDING_WORKER_THREADS", ColPaliConfig.EMBEDDING_WORKER_THREADS)
+        )
+        self.shared_weights_dir = os.getenv("COLPALI_SHARED_WEIGHTS_DIR", ColPaliConfig.SHARED_WEIGHTS_DIR)
 
 settings = Settings()
 
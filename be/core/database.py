@@ -22,19 +22,69 @@ class QdrantManager:
     def __init__(self):
         self._client: Optional[QdrantClient] = None
         self._url: str = settings.qdrant_url
+        self._prefer_grpc: bool = settings.qdrant_prefer_grpc
         self._collection_name: str = ColPaliConfig.COLLECTION_NAME
         self._initialized: bool = False
+        self._summary_vectors: bool = False
         
     @property
     def is_initialized(self) -> bool:
         """데이터베이스가 초기화되었는지 확인"""
         return self._initialized and self._client is not None
     
+    @property
+    def uses_grpc(self) -> bool:
+        """gRPC로 연결하는지 확인 (메모리/로컬 모드는 gRPC를 사용하지 않음)"""
+        return self._prefer_grpc and self._url.startswith(("http://", "https://"))
+
+    @property
+    def has_summary_vectors(self) -> bool:
+        """컬렉션에 2단계 검색용 요약 벡터가 있는지 확인 (없으면 이름 없는 멀티벡터 하나만 있는 기존 컬렉션)"""
+        return self._summary_vectors
+
     @property
     def collection_name(self) -> str:
         """현재 사용 중인 컬렉션 이름 반환"""
         return self._collection_name
 
+    @staticmethod
+    def get_vectors_config(hnsw: bool = True) -> models.VectorParams:
+        """
+        컬렉션 벡터 설정 반환 (ColPali multi-vector, MaxSim, 이진 양자화)
+
+        Args:
+            hnsw: HNSW 인덱스 생성 여부 (요약 벡터로 후보를 찾는 경우 전체 멀티벡터는 인덱스 없이 재정렬에만 사용)
+        """
+        return models.VectorParams(
+            size=ColPaliConfig.EMBEDDING_DIM,  # 벡터 차원 수 (128차원)
+            distance=models.Distance.COSINE,  # 코사인 유사도 측정 방식 사용
+            on_disk=True,  # 원본 벡터를 디스크로 이동하여 메모리 사용량 감소
+            multivector_config=models.MultiVectorConfig(
+                comparator=models.MultiVectorComparator.MAX_SIM  # 다중 벡터 중 최대 유사도 사용
+            ),
+            quantization_config=models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=True  # 양자화된 벡터만 RAM에 유지하여 검색 속도 향상
+                ),
+            ),
+            hnsw_config=None if hnsw else models.HnswConfigDiff(m=0),  # m=0이면 HNSW 그래프를 만들지 않음
+        )
+
+    @classmethod
+    def get_named_vectors_config(cls) -> Dict[str, models.VectorParams]:
+        """2단계 검색용 벡터 설정 반환 (전체 멀티벡터 + HNSW 인덱스를 만드는 페이지 요약 벡터)"""
+        return {
+            ColPaliConfig.MULTIVECTOR_NAME: cls.get_vectors_config(hnsw=False),
+            ColPaliConfig.SUMMARY_VECTOR_NAME: models.VectorParams(
+                size=ColPaliConfig.EMBEDDING_DIM,
+                distance=models.Distance.COSINE,
+                on_disk=False,  # 페이지당 벡터 몇 개뿐이므로 RAM에 유지
+                multivector_config=models.MultiVectorConfig(
+                    comparator=models.MultiVectorComparator.MAX_SIM
+                ),
+            ),
+        }
+
     def create_collection(self):
         """
         Qdrant 컬렉션 존재 확인 및 생성
@@ -46,26 +96,19 @@ class QdrantManager:
             
             if self._collection_name in existing_collections:
                 logger.info(f"컬렉션이 이미 존재합니다: {self._collection_name}")
+                vectors = self._client.get_collection(self._collection_name).config.params.vectors
+                self._summary_vectors = isinstance(vectors, dict) and ColPaliConfig.SUMMARY_VECTOR_NAME in vectors
+                if not self._summary_vectors:
+                    logger.info("요약 벡터가 없는 컬렉션입니다. 2단계 검색 없이 전체 멀티벡터로 검색합니다.")
                 return
             
-            # 새 컬렉션 생성 (ColPali multi-vector 지원)
+            # 새 컬렉션 생성 (ColPali multi-vector + 2단계 검색용 요약 벡터)
             self._client.create_collection(
                 collection_name=self._collection_name,
                 on_disk_payload=True,  # 페이로드를 디스크에 저장
-                vectors_config=models.VectorParams(
-                    size=128,  # 벡터 차원 수 (128차원)
-                    distance=models.Distance.COSINE,  # 코사인 유사도 측정 방식 사용
-                    on_disk=True,  # 원본 벡터를 디스크로 이동하여 메모리 사용량 감소
-                    multivector_config=models.MultiVectorConfig(
-                        comparator=models.MultiVectorComparator.MAX_SIM  # 다중 벡터 중 최대 유사도 사용
-                    ),
-                    quantization_config=models.BinaryQuantization(
-                        binary=models.BinaryQuantizationConfig(
-                            always_ram=True  # 양자화된 벡터만 RAM에 유지하여 검색 속도 향상
-                        ),
-                    ),
-                ),
+                vectors_config=self.get_named_vectors_config(),
             )
+            self._summary_vectors = True
             logger.info(f"새 컬렉션 생성 완료: {self._collection_name}")
             
         except Exception as e:
@@ -88,7 +131,10 @@ class QdrantManager:
             
         try:
             # 클라이언트 생성
-            self._client = QdrantClient(self._url)
+            if self.uses_grpc:
+                self._client = QdrantClient(self._url, prefer_grpc=True, grpc_port=settings.qdrant_grpc_port)
+            else:
+                self._client = QdrantClient(self._url)
             
             # 컬렉션 확인 및 생성
             self.create_collection()
@@ -158,6 +204,7 @@ class QdrantManager:
         return self._client.query_points(
             collection_name=self._collection_name,
             query=query_vector,
+            using=ColPaliConfig.MULTIVECTOR_NAME if self._summary_vectors else None,
             limit=limit,
             timeout=timeout,
             search_params=search_params
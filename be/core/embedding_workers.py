@@ -0,0 +1,425 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import torch
+
+from be.config import ColPaliConfig
+
+logger = logging.getLogger(__name__)
+
+# 공유 메모리 안에서 텐서 시작 위치 정렬 단위 (bytes)
+_ALIGNMENT = 64
+
+
+def _get_worker_context():
+    """
+    워커 프로세스 시작 방식 반환
+    forkserver를 사용할 수 있으면 워커 모듈만 미리 import한 서버 프로세스에서 워커를 fork하여,
+    API 앱(__main__)을 import하지 않은 깨끗한 프로세스에서 시작하고 재시작 시 torch/모델 모듈 import 시간을 줄임
+    (forkserver가 없는 플랫폼은 spawn)
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__, "be.core.models"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _pack_inputs(inputs) -> Tuple[shared_memory.SharedMemory, List[Tuple[str, str, Tuple[int, ...], int]]]:
+    """
+    모델 입력 텐서를 하나의 공유 메모리 블록에 복사
+
+    Returns:
+        Tuple: (공유 메모리, [(입력 이름, numpy dtype, shape, offset), ...])
+    """
+    arrays = {}
+    for name, tensor in inputs.items():
+        tensor = tensor.detach().cpu()
+        # numpy에는 bfloat16이 없으므로 실수 텐서는 float32로 전달 (모델이 자체 dtype으로 변환)
+        arrays[name] = tensor.float().numpy() if tensor.is_floating_point() else tensor.numpy()
+
+    specs = []
+    offset = 0
+    for name, array in arrays.items():
+        specs.append((name, array.dtype.str, array.shape, offset))
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, dtype, shape, start), array in zip(specs, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+    return shm, specs
+
+
+def _worker_main(worker_id: int, task_queue, result_queue, current_tasks, weights_path: str, num_threads: int):
+    """
+    임베딩 워커 프로세스
+    모델을 한 번 로드한 뒤 작업 큐에서 배치를 받아 공유 메모리의 입력으로 추론하고,
+    결과를 미리 할당된 출력 공유 메모리에 기록
+    처리 중인 작업 ID는 current_tasks[worker_id]에 기록하여, 워커가 "accepted" 전송 전에 종료되어도 작업을 찾을 수 있도록 함
+    """
+    logging.basicConfig(level=logging.INFO)
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+
+    try:
+        from be.core.models import ColPaliModelManager
+
+        manager = ColPaliModelManager()
+        model = manager.load_worker_model(weights_path)
+    except Exception as e:
+        result_queue.put(("failed", worker_id, str(e)))
+        return
+    result_queue.put(("ready", worker_id, {"pid": os.getpid()}))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        task_id, specs, input_name, output_name, output_shape = task
+        current_tasks[worker_id] = task_id
+        result_queue.put(("accepted", task_id, worker_id))
+
+        start_time = time.perf_counter()
+        input_shm = output_shm = None
+        try:
+            input_shm = shared_memory.SharedMemory(name=input_name)
+            output_shm = shared_memory.SharedMemory(name=output_name)
+            inputs = {
+                name: torch.from_numpy(np.ndarray(shape, dtype=dtype, buffer=input_shm.buf, offset=offset))
+                for name, dtype, shape, offset in specs
+            }
+            with torch.no_grad():
+                embeddings = model(**inputs).cpu().float().numpy()
+            del inputs
+
+            if embeddings.shape != tuple(output_shape):
+                raise RuntimeError(f"임베딩 크기가 예상과 다릅니다: {embeddings.shape} (예상: {tuple(output_shape)})")
+            np.ndarray(output_shape, dtype=np.float32, buffer=output_shm.buf)[...] = embeddings
+            result_queue.put(("done", task_id, {"compute_seconds": time.perf_counter() - start_time}))
+        except Exception as e:
+            result_queue.put(("error", task_id, f"{type(e).__name__}: {e}"))
+        finally:
+            for shm in (input_shm, output_shm):
+                if shm is not None:
+                    shm.close()
+            current_tasks[worker_id] = -1
+
+
+class EmbeddingWorkerPool:
+    """
+    임베딩 워커 프로세스 풀
+    모델 추론을 별도 프로세스에서 수행하여 API 프로세스의 GIL과 이벤트 루프를 점유하지 않도록 함
+    입력(pixel_values 등)과 출력 임베딩은 공유 메모리로 전달하고, 큐에는 작업 정보만 전달
+
+    ColPali 모델과 같은 방식(model(**inputs))으로 호출하며, 호출한 스레드는 결과가 나올 때까지 대기 (task_timeout 초과 시 실패)
+    워커가 여러 개이면 여러 스레드의 호출이 워커 수만큼 동시에 처리됨
+
+    비정상 종료된 워커는 대기 시간을 두 배씩 늘리며 다시 시작하고,
+    배치를 끝내지 못한 채 max_restarts번 넘게 연속으로 종료되면 다시 시작하지 않음 (풀은 unhealthy로 보고)
+    """
+
+    # ColPali(nn.Module)와 같은 방식으로 사용할 수 있도록 맞춘 속성
+    training = False
+
+    def __init__(self, workers: int, weights_path: str, num_threads: int = 0,
+                 start_timeout: float = ColPaliConfig.EMBEDDING_WORKER_START_TIMEOUT,
+                 task_timeout: float = ColPaliConfig.EMBEDDING_WORKER_TASK_TIMEOUT,
+                 max_restarts: int = ColPaliConfig.EMBEDDING_WORKER_MAX_RESTARTS):
+        self.workers = workers
+        self.weights_path = weights_path
+        self.num_threads = num_threads
+        self.start_timeout = start_timeout
+        self.task_timeout = task_timeout
+        self.max_restarts = max_restarts
+        # 입력은 공유 메모리로 복사하므로 텐서는 CPU에 둠
+        self.device = torch.device("cpu")
+
+        self._context = _get_worker_context()
+        self._task_queue = None
+        self._result_queue = None
+        self._processes: Dict[int, Any] = {}
+        self._current_tasks = None  # 워커별 처리 중인 작업 ID (공유 메모리 배열, -1이면 대기 중)
+        self._restart_at: Dict[int, float] = {}  # 종료된 워커 ID -> 다시 시작할 시각 (monotonic)
+        self._consecutive_restarts: Dict[int, int] = {}  # 워커 ID -> 배치를 끝내지 못한 연속 재시작 횟수
+        self._failed_workers = set()  # 재시작 한도를 넘어 중지된 워커 ID
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._collector: Optional[threading.Thread] = None
+
+        self._tasks = 0
+        self._items = 0
+        self._errors = 0
+        self._restarts = 0
+        self._transport_bytes = 0
+        self._latency_seconds = 0.0
+        self._compute_seconds = 0.0
+
+    def start(self):
+        """
+        워커 프로세스 시작 (모든 워커의 모델 로딩이 끝날 때까지 대기)
+        첫 워커가 공유 가중치 파일을 만든 뒤 나머지 워커를 시작하여 같은 파일을 메모리 매핑하도록 함
+
+        Raises:
+            RuntimeError: 워커의 모델 로딩이 실패하거나 제한 시간을 넘긴 경우
+        """
+        # API 프로세스는 torch/uvicorn 스레드를 사용하므로 직접 fork하지 않음 (forkserver 또는 spawn)
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+        self._current_tasks = self._context.Array("q", [-1] * self.workers)
+        self._restart_at.clear()
+        self._consecutive_restarts.clear()
+        self._failed_workers.clear()
+        self._stopping.clear()
+
+        try:
+            self._spawn(0)
+            self._wait_ready([0])
+            for worker_id in range(1, self.workers):
+                self._spawn(worker_id)
+            self._wait_ready(list(range(1, self.workers)))
+        except Exception:
+            self.shutdown()
+            raise
+
+        self._collector = threading.Thread(target=self._collect_results, name="embedding-results", daemon=True)
+        self._collector.start()
+        logger.info(f"임베딩 워커 시작 완료: {self.workers}개")
+
+    def _spawn(self, worker_id: int):
+        """워커 프로세스 하나 시작"""
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self._task_queue, self._result_queue, self._current_tasks,
+                  self.weights_path, self.num_threads),
+            name=f"colpali-embedding-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def _wait_ready(self, worker_ids: List[int]):
+        """워커들의 모델 로딩 완료 메시지 대기"""
+        waiting = set(worker_ids)
+        deadline = time.monotonic() + self.start_timeout
+        while waiting:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"임베딩 워커 시작 시간 초과: {sorted(waiting)}")
+            try:
+                kind, worker_id, info = self._result_queue.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                dead = [worker_id for worker_id in waiting if not self._processes[worker_id].is_alive()]
+                if dead:
+                    raise RuntimeError(f"임베딩 워커가 시작 중 종료되었습니다: {dead}")
+                continue
+
+            if kind == "failed":
+                raise RuntimeError(f"임베딩 워커 {worker_id} 모델 로딩 실패: {info}")
+            if kind == "ready":
+                waiting.discard(worker_id)
+                logger.info(f"임베딩 워커 {worker_id} 준비 완료 (pid {info['pid']})")
+
+    def __call__(self, **inputs) -> torch.Tensor:
+        input_ids = inputs["input_ids"]
+        output_shape = (input_ids.shape[0], input_ids.shape[1], ColPaliConfig.EMBEDDING_DIM)
+        output_bytes = int(np.prod(output_shape)) * np.dtype(np.float32).itemsize
+
+        input_shm, specs = _pack_inputs(inputs)
+        output_shm = shared_memory.SharedMemory(create=True, size=max(output_bytes, 1))
+        future = Future()
+        start_time = time.perf_counter()
+        try:
+            with self._lock:
+                if self._stopping.is_set():
+                    raise RuntimeError("임베딩 워커가 종료되었습니다.")
+                if len(self._failed_workers) == self.workers:
+                    raise RuntimeError("모든 임베딩 워커가 재시작 한도를 넘어 중지되었습니다.")
+                task_id = next(self._task_ids)
+                self._pending[task_id] = {"future": future, "worker": None}
+            self._task_queue.put((task_id, specs, input_shm.name, output_shm.name, output_shape))
+
+            try:
+                compute_seconds = future.result(timeout=self.task_timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    if self._pending.pop(task_id, None) is not None:
+                        self._errors += 1
+                raise RuntimeError(f"임베딩 워커 응답 시간 초과 ({self.task_timeout}초)")
+            embeddings = np.ndarray(output_shape, dtype=np.float32, buffer=output_shm.buf).copy()
+            with self._lock:
+                self._tasks += 1
+                self._items += output_shape[0]
+                self._transport_bytes += input_shm.size + output_shm.size
+                self._latency_seconds += time.perf_counter() - start_time
+                self._compute_seconds += compute_seconds
+            return torch.from_numpy(embeddings)
+        finally:
+            for shm in (input_shm, output_shm):
+                shm.close()
+                shm.unlink()
+
+    @property
+    def healthy(self) -> bool:
+        """재시작 한도를 넘어 중지된 워커가 없으면 True"""
+        return not self._failed_workers and not self._stopping.is_set()
+
+    def _collect_results(self):
+        """결과 큐를 읽어 대기 중인 호출에 결과 전달 (종료된 워커는 다시 시작)"""
+        while not self._stopping.is_set():
+            # 결과가 계속 들어오는 동안에도 종료된 워커를 확인
+            self._check_workers()
+            try:
+                kind, key, info = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            if kind == "ready":
+                logger.info(f"임베딩 워커 {key} 재시작 완료 (pid {info['pid']})")
+                continue
+            if kind == "failed":
+                logger.error(f"임베딩 워커 {key} 재시작 실패: {info}")
+                continue
+
+            with self._lock:
+                task = self._pending.get(key)
+                if task is None:
+                    continue
+                if kind == "accepted":
+                    task["worker"] = info
+                    continue
+                del self._pending[key]
+                if kind == "error":
+                    self._errors += 1
+                # 배치를 끝까지 처리한 워커는 연속 재시작 횟수 초기화
+                if task["worker"] is not None:
+                    self._consecutive_restarts.pop(task["worker"], None)
+
+            if kind == "done":
+                task["future"].set_result(info["compute_seconds"])
+            else:
+                task["future"].set_exception(RuntimeError(info))
+
+    def _check_workers(self):
+        """종료된 워커가 처리 중이던 작업을 실패 처리하고, 대기 시간이 지나면 워커를 다시 시작"""
+        now = time.monotonic()
+        for worker_id, process in list(self._processes.items()):
+            if self._stopping.is_set():
+                return
+            if process.is_alive() or worker_id in self._failed_workers:
+                continue
+            if worker_id not in self._restart_at:
+                self._handle_worker_exit(worker_id, process.exitcode, now)
+            elif now >= self._restart_at[worker_id]:
+                del self._restart_at[worker_id]
+                self._spawn(worker_id)
+
+    def _handle_worker_exit(self, worker_id: int, exitcode: Optional[int], now: float):
+        """
+        종료된 워커가 가져간 작업을 실패 처리하고 재시작 시각 예약
+        연속 재시작 한도를 넘으면 워커를 중지하고, 모든 워커가 중지되면 대기 중인 작업도 모두 실패 처리
+        """
+        # "accepted" 전송 전에 종료된 경우도 처리하도록 워커가 기록한 작업 ID도 확인
+        current_task = self._current_tasks[worker_id]
+        self._current_tasks[worker_id] = -1
+        with self._lock:
+            failed = [
+                task_id for task_id, task in self._pending.items()
+                if task["worker"] == worker_id or task_id == current_task
+            ]
+            tasks = [self._pending.pop(task_id) for task_id in failed]
+            restarts = self._consecutive_restarts.get(worker_id, 0) + 1
+            self._consecutive_restarts[worker_id] = restarts
+            if restarts > self.max_restarts:
+                self._failed_workers.add(worker_id)
+                if len(self._failed_workers) == self.workers:
+                    # 남은 작업을 처리할 워커가 없음
+                    tasks.extend(self._pending.values())
+                    self._pending.clear()
+            else:
+                self._restarts += 1
+                delay = min(
+                    ColPaliConfig.EMBEDDING_WORKER_RESTART_BACKOFF * 2 ** (restarts - 1),
+                    ColPaliConfig.EMBEDDING_WORKER_MAX_RESTART_BACKOFF
+                )
+                self._restart_at[worker_id] = now + delay
+            self._errors += len(tasks)
+
+        if worker_id in self._failed_workers:
+            logger.error(
+                f"임베딩 워커 {worker_id} 비정상 종료 (exit code {exitcode}), "
+                f"연속 재시작 한도({self.max_restarts}회)를 넘어 다시 시작하지 않습니다."
+            )
+        else:
+            logger.error(
+                f"임베딩 워커 {worker_id} 비정상 종료 (exit code {exitcode}), "
+                f"{self._restart_at[worker_id] - now:.1f}초 후 다시 시작합니다. (연속 {restarts}회)"
+            )
+        for task in tasks:
+            task["future"].set_exception(RuntimeError(f"임베딩 워커 {worker_id}의 프로세스가 처리 중 종료되었습니다."))
+
+    def shutdown(self, timeout: float = 10.0):
+        """워커 프로세스 종료 (대기 중인 호출은 실패 처리)"""
+        self._stopping.set()
+        for _ in self._processes:
+            self._task_queue.put(None)
+        for process in self._processes.values():
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+
+        if self._collector is not None:
+            self._collector.join(timeout=timeout)
+            self._collector = None
+
+        with self._lock:
+            tasks = list(self._pending.values())
+            self._pending.clear()
+        for task in tasks:
+            task["future"].set_exception(RuntimeError("임베딩 워커가 종료되었습니다."))
+        logger.info("임베딩 워커 종료 완료")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        워커 상태와 처리 통계 반환
+
+        Returns:
+            Dict: 워커 수, 상태(healthy), 처리한 배치/입력 수, 평균 지연 시간(요청~결과), 평균 추론 시간,
+                  전송 오버헤드(지연 - 추론), 공유 메모리 전송량 등
+        """
+        with self._lock:
+            tasks = self._tasks
+            return {
+                "workers": self.workers,
+                "healthy": self.healthy,
+                "failed_workers": sorted(self._failed_workers),
+                "alive_workers": sum(process.is_alive() for process in self._processes.values()),
+                "pending": len(self._pending),
+                "tasks": tasks,
+                "items": self._items,
+                "errors": self._errors,
+                "restarts": self._restarts,
+                "avg_latency_ms": round(self._latency_seconds / tasks * 1000, 2) if tasks else 0.0,
+                "avg_compute_ms": round(self._compute_seconds / tasks * 1000, 2) if tasks else 0.0,
+                "avg_overhead_ms": round((self._latency_seconds - self._compute_seconds) / tasks * 1000, 2) if tasks else 0.0,
+                "shared_memory_mb": round(self._transport_bytes / (1024 * 1024), 2)
+            }
+
+    def eval(self) -> "EmbeddingWorkerPool":
+        return self
+
+    def train(self, mode: bool = True) -> "EmbeddingWorkerPool":
+        return self
@@ -1,11 +1,20 @@
+import os
+import gc
+import time
+import stat
+import hashlib
+import importlib.metadata
 import torch
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence, Union
 from contextlib import contextmanager
 
 from colpali_engine.models import ColPali, ColPaliProcessor
 from langchain_openai import AzureChatOpenAI
-from be.config import ColPaliConfig, azure_config
+from be.config import ColPaliConfig, azure_config, settings
+from be.core.onnx_backend import OnnxColPaliModel, export_onnx, load_onnx_model, check_onnx_parity
+from be.core.embedding_workers import EmbeddingWorkerPool
+from be.core.scheduler import InferenceScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +24,30 @@ class ModelLoadError(Exception):
     pass
 
 
+def _get_library_version(name: str) -> str:
+    """설치된 패키지 버전 반환 (없으면 unknown)"""
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _check_trusted_path(path: str):
+    """
+    공유 모델 파일과 폴더가 신뢰할 수 있는지 확인
+    torch.load(weights_only=False)는 pickle을 실행하므로 현재 사용자 소유이고 다른 사용자가 쓸 수 없는 경로만 허용
+
+    Raises:
+        ModelLoadError: 다른 사용자 소유이거나 모든 사용자가 쓸 수 있는 경로인 경우
+    """
+    for target in (os.path.dirname(os.path.abspath(path)), path):
+        target_stat = os.stat(target)
+        if hasattr(os, "geteuid") and target_stat.st_uid != os.geteuid():
+            raise ModelLoadError(f"공유 모델 경로가 현재 사용자 소유가 아닙니다: {target}")
+        if target_stat.st_mode & stat.S_IWOTH:
+            raise ModelLoadError(f"공유 모델 경로를 모든 사용자가 쓸 수 있습니다: {target}")
+
+
 class ColPaliModelManager:
     """
     ColPali 모델과 프로세서를 관리하는 싱글톤 클래스
@@ -22,13 +55,27 @@ class ColPaliModelManager:
     """
     
     def __init__(self):
-        self._model: Optional[ColPali] = None
+        self._model: Optional[Union[ColPali, OnnxColPaliModel, EmbeddingWorkerPool]] = None
         self._processor: Optional[ColPaliProcessor] = None
         
         self.model_name = ColPaliConfig.MODEL_NAME
         self.processor_name = ColPaliConfig.PROCESSOR_NAME
         self.torch_dtype = ColPaliConfig.TORCH_DTYPE
         self.device = ColPaliConfig.get_device()
+        self.inference_profile = settings.inference_profile
+        self.torch_compile = settings.torch_compile
+        self.inference_backend = settings.inference_backend
+        self.onnx_dir = settings.onnx_dir
+        self.embedding_workers = settings.embedding_workers
+        # 동시에 실행하는 forward 수 제한 및 레인(쿼리 > 인덱싱) 우선순위 스케줄링
+        self.scheduler = InferenceScheduler(
+            ColPaliConfig.INFERENCE_LANES,
+            max_concurrency=settings.inference_concurrency or max(1, self.embedding_workers),
+            lane_concurrency={
+                "query": settings.query_lane_concurrency,
+                "indexing": settings.indexing_lane_concurrency
+            }
+        )
         
         self._initialized: bool = False
         self._loading: bool = False
@@ -76,13 +123,16 @@ class ColPaliModelManager:
             print("ColPali 모델 로딩 중...")
             logger.info(f"ColPali 모델 로딩 시작: {self.model_name}")
             
-            # ColPali 모델 로딩
-            self._model = ColPali.from_pretrained(
-                self.model_name,
-                torch_dtype=self.torch_dtype,
-                device_map=self.device,
-            )
-            logger.info(f"ColPali 모델 로딩 완료: {self.model_name}")
+            # ColPali 모델 로딩 (임베딩 워커 프로세스를 사용하면 각 워커에서 로딩)
+            if self.embedding_workers > 0:
+                threads = settings.embedding_worker_threads or max(1, (os.cpu_count() or 1) // self.embedding_workers)
+                self._model = EmbeddingWorkerPool(
+                    self.embedding_workers, self.get_shared_weights_path(), num_threads=threads
+                )
+                self._model.start()
+            else:
+                self._model = self._load_backend_model()
+            logger.info(f"ColPali 모델 로딩 완료: {self.model_name} ({self.inference_backend}, {self.inference_profile})")
             
             # ColPali 프로세서 로딩
             self._processor = ColPaliProcessor.from_pretrained(
@@ -106,12 +156,116 @@ class ColPaliModelManager:
         finally:
             self._loading = False
     
-    def get_model(self) -> ColPali:
+    def _load_backend_model(self) -> Union[ColPali, OnnxColPaliModel]:
+        """
+        추론 백엔드에 맞는 모델 로딩 (ONNX 그래프 또는 추론 프로파일을 적용한 PyTorch 모델)
+
+        Raises:
+            ValueError: 알 수 없는 추론 백엔드인 경우
+        """
+        if self.inference_backend == "onnx":
+            return load_onnx_model(
+                self.onnx_dir, self.model_name, device=self.device, num_threads=settings.onnx_threads
+            )
+        if self.inference_backend == "torch":
+            return self._load_model(self.inference_profile, self.torch_compile)
+        raise ValueError(
+            f"알 수 없는 추론 백엔드: {self.inference_backend} (지원: {', '.join(ColPaliConfig.INFERENCE_BACKENDS)})"
+        )
+
+    def get_shared_weights_path(self) -> str:
+        """
+        임베딩 워커가 메모리 매핑으로 공유하는 모델 파일 경로 반환
+        모델 식별자와 torch/transformers/colpali-engine 버전별로 구분하여,
+        라이브러리를 업그레이드하면 이전 버전으로 pickle된 파일 대신 새 파일을 저장
+        """
+        versions = "|".join(
+            [torch.__version__] + [_get_library_version(name) for name in ("transformers", "colpali-engine")]
+        )
+        key = hashlib.sha256(f"{self.get_model_id()}|{versions}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(settings.shared_weights_dir, f"{key}.pt")
+
+    def load_worker_model(self, weights_path: str) -> Union[ColPali, OnnxColPaliModel]:
+        """
+        임베딩 워커 프로세스용 모델 로딩
+        CPU에서 bf16/fp32 PyTorch 모델을 사용하면 로드한 모델을 한 번 파일로 저장한 뒤
+        모든 워커가 같은 파일을 메모리 매핑(torch.load(mmap=True))하여 가중치 메모리를 운영체제 페이지 캐시로 공유
+        그 외(ONNX, int8, GPU)에는 워커마다 모델을 로드
+
+        공유 모델 파일은 모듈 전체를 pickle로 저장하므로 torch.load(weights_only=False)로 읽으며,
+        이 파일을 쓸 수 있는 사용자는 워커에서 임의 코드를 실행할 수 있음
+        따라서 SHARED_WEIGHTS_DIR은 서버 실행 사용자 전용 폴더여야 하고, 다른 사용자 소유이거나
+        모든 사용자가 쓸 수 있는 폴더/파일이면 로딩을 거부함
+
+        Args:
+            weights_path: 공유 모델 파일 경로
+
+        Returns:
+            ColPali | OnnxColPaliModel: 평가 모드로 설정된 모델
+
+        Raises:
+            ModelLoadError: 공유 모델 경로를 신뢰할 수 없는 경우
+        """
+        if self.inference_backend != "torch" or self.inference_profile == "int8" or self.device != "cpu":
+            return self._load_backend_model()
+
+        if not os.path.exists(weights_path):
+            model = self._load_model(self.inference_profile)
+            os.makedirs(os.path.dirname(os.path.abspath(weights_path)), mode=0o700, exist_ok=True)
+            temp_path = f"{weights_path}.{os.getpid()}.tmp"
+            torch.save(model, temp_path)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, weights_path)
+            del model
+            gc.collect()
+            logger.info(f"공유 모델 파일 저장 완료: {weights_path}")
+
+        _check_trusted_path(weights_path)
+        model = torch.load(weights_path, mmap=True, weights_only=False).eval()
+        if self.torch_compile:
+            model = torch.compile(model)
+        return model
+
+    def _load_model(self, profile: str, compile_model: bool = False) -> ColPali:
+        """
+        추론 프로파일을 적용하여 ColPali 모델 로딩
+
+        Args:
+            profile: 추론 프로파일 (bf16, fp32, int8)
+            compile_model: torch.compile 적용 여부
+
+        Returns:
+            ColPali: 평가 모드로 설정된 모델
+
+        Raises:
+            ValueError: 알 수 없는 추론 프로파일인 경우
+        """
+        if profile not in ColPaliConfig.INFERENCE_PROFILES:
+            raise ValueError(f"알 수 없는 추론 프로파일: {profile} (지원: {', '.join(ColPaliConfig.INFERENCE_PROFILES)})")
+
+        model = ColPali.from_pretrained(
+            self.model_name,
+            torch_dtype=self.torch_dtype if profile == "bf16" else torch.float32,
+            device_map=self.device,
+        ).eval()
+
+        if profile == "int8":
+            if self.device == "cpu":
+                # 가중치를 int8로 저장하고 활성값은 추론 시 동적으로 양자화
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            else:
+                logger.warning(f"int8 동적 양자화는 CPU에서만 지원됩니다. fp32로 실행합니다: {self.device}")
+
+        if compile_model:
+            model = torch.compile(model)
+        return model
+
+    def get_model(self) -> Union[ColPali, OnnxColPaliModel]:
         """
         ColPali 모델 반환
         
         Returns:
-            ColPali: 로드된 모델
+            ColPali | OnnxColPaliModel: 로드된 모델 (추론 백엔드에 따라 다르며 호출 방식은 동일)
             
         Raises:
             ModelLoadError: 모델이 로드되지 않은 경우
@@ -134,6 +288,163 @@ class ColPaliModelManager:
             raise ModelLoadError("ColPali 프로세서가 초기화되지 않았습니다. initialize()를 먼저 호출하세요.")
         return self._processor
     
+    def get_image_size(self) -> int:
+        """
+        프로세서가 모델에 입력하는 이미지 크기(px) 반환
+        (페이지 렌더링 시 짧은 변을 이 크기에 맞춤, 프로세서가 정사각형으로 리사이즈하므로 그 이상은 버려짐)
+        
+        Returns:
+            int: 입력 이미지 한 변의 크기 (height/width 중 큰 값)
+        """
+        image_processor = self.get_processor().image_processor
+        size = getattr(image_processor, "size", None) or {}
+        return max(size.get("height", 0), size.get("width", 0), size.get("shortest_edge", 0))
+
+    def get_model_id(self) -> str:
+        """
+        임베딩 결과를 결정하는 모델 식별자 반환 (임베딩 캐시 키에 사용)
+
+        Returns:
+            str: 모델명, 프로세서명, 추론 프로파일 조합 (bf16 프로파일은 dtype 사용, ONNX 백엔드는 onnx)
+        """
+        if self.inference_backend == "onnx":
+            profile = "onnx"
+        else:
+            profile = str(self.torch_dtype) if self.inference_profile == "bf16" else self.inference_profile
+        return f"{self.model_name}|{self.processor_name}|{profile}"
+
+    def inference_slot(self, lane: str):
+        """
+        추론 스케줄러의 실행 슬롯 (with 블록 안에서 forward 실행)
+
+        Args:
+            lane: 요청 레인 (query, indexing)
+        """
+        return self.scheduler.slot(lane)
+
+    def get_worker_stats(self) -> Optional[Dict[str, Any]]:
+        """임베딩 워커 상태 반환 (워커를 사용하지 않으면 None)"""
+        if isinstance(self._model, EmbeddingWorkerPool):
+            return self._model.get_stats()
+        return None
+
+    def calibrate_profiles(self, images: List[Any], profiles: Sequence[str] = ColPaliConfig.INFERENCE_PROFILES,
+                           compile_model: bool = False, runs: int = 2) -> Dict[str, Any]:
+        """
+        추론 프로파일별 임베딩 오차와 속도 측정
+        fp32 모델 임베딩을 기준으로 토큰별 코사인 유사도와 페이지당 추론 시간을 비교
+        프로파일마다 모델을 새로 로드하므로 모델 크기만큼의 추가 메모리가 필요
+
+        Args:
+            images: 측정에 사용할 페이지 이미지 목록 (PIL)
+            profiles: 측정할 추론 프로파일 목록
+            compile_model: torch.compile을 적용한 경우도 함께 측정할지 여부
+            runs: 프로파일별 측정 반복 횟수 (워밍업 1회 별도)
+
+        Returns:
+            Dict: 프로파일별 seconds_per_page, speedup(fp32 대비), mean_cosine, min_cosine
+        """
+        processor = self._processor or ColPaliProcessor.from_pretrained(self.processor_name)
+        inputs = processor.process_images(images)
+
+        def measure(model):
+            batch = inputs.to(model.device)
+            with torch.no_grad():
+                embeddings = model(**batch)  # 워밍업 (torch.compile 시 컴파일 포함)
+                start_time = time.perf_counter()
+                for _ in range(runs):
+                    embeddings = model(**batch)
+                elapsed = (time.perf_counter() - start_time) / runs
+            return embeddings.cpu().float(), elapsed / len(images)
+
+        variants = [(profile, False) for profile in profiles]
+        if compile_model:
+            variants += [(profile, True) for profile in profiles]
+
+        reference_model = self._load_model("fp32")
+        reference, reference_time = measure(reference_model)
+        del reference_model
+        gc.collect()
+        self._clear_cache()
+
+        results = []
+        for profile, compiled in variants:
+            if profile == "fp32" and not compiled:
+                embeddings, seconds_per_page = reference, reference_time
+            else:
+                model = self._load_model(profile, compiled)
+                embeddings, seconds_per_page = measure(model)
+                del model
+                gc.collect()
+                self._clear_cache()
+
+            # 토큰별 코사인 유사도 (패딩 토큰은 임베딩이 0이므로 제외)
+            cosine = torch.nn.functional.cosine_similarity(embeddings, reference, dim=-1)
+            valid = reference.norm(dim=-1) > 0
+            results.append({
+                "profile": profile,
+                "compile": compiled,
+                "seconds_per_page": round(seconds_per_page, 4),
+                "speedup": round(reference_time / seconds_per_page, 2),
+                "mean_cosine": round(cosine[valid].mean().item(), 6),
+                "min_cosine": round(cosine[valid].min().item(), 6)
+            })
+            logger.info(f"추론 프로파일 측정: {results[-1]}")
+
+        return {
+            "reference": "fp32",
+            "device": self.device,
+            "pages": len(images),
+            "runs": runs,
+            "profiles": results
+        }
+
+    def export_onnx(self, output_dir: Optional[str] = None, opset: int = ColPaliConfig.ONNX_OPSET) -> Dict[str, Any]:
+        """
+        ONNX 그래프 내보내기 (float32 모델을 새로 로드하여 이미지/쿼리 경로를 각각 내보냄)
+
+        Args:
+            output_dir: 출력 폴더 (기본값: settings.onnx_dir)
+            opset: ONNX opset 버전
+
+        Returns:
+            Dict: 내보내기 메타데이터
+        """
+        output_dir = output_dir or self.onnx_dir
+        processor = self._processor or ColPaliProcessor.from_pretrained(self.processor_name)
+        model = self._load_model("fp32")
+        try:
+            return export_onnx(model, processor, output_dir, self.model_name, self.processor_name, opset=opset)
+        finally:
+            del model
+            gc.collect()
+            self._clear_cache()
+
+    def check_onnx_parity(self, images: List[Any], queries: List[str],
+                          onnx_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        ONNX 백엔드와 PyTorch(fp32) 임베딩 정합성 검사
+
+        Args:
+            images: 검사에 사용할 페이지 이미지 목록 (PIL)
+            queries: 검사에 사용할 쿼리 목록
+            onnx_dir: ONNX 그래프 폴더 (기본값: settings.onnx_dir)
+
+        Returns:
+            Dict: 이미지/쿼리 경로별 오차와 통과 여부
+        """
+        processor = self._processor or ColPaliProcessor.from_pretrained(self.processor_name)
+        onnx_model = load_onnx_model(
+            onnx_dir or self.onnx_dir, self.model_name, device=self.device, num_threads=settings.onnx_threads
+        )
+        reference_model = self._load_model("fp32")
+        try:
+            return check_onnx_parity(reference_model, onnx_model, processor, images, queries)
+        finally:
+            del reference_model, onnx_model
+            gc.collect()
+            self._clear_cache()
+
     @contextmanager
     def inference_mode(self):
         """
@@ -173,7 +484,7 @@ class ColPaliModelManager:
         
         # 모델 메모리 사용량 계산 (대략적)
         model_memory = 0
-        if self._model is not None:
+        if isinstance(self._model, torch.nn.Module):
             for param in self._model.parameters():
                 model_memory += param.numel() * param.element_size()
         
@@ -184,12 +495,18 @@ class ColPaliModelManager:
             "device": self.device,
             "model_memory_mb": round(model_memory / (1024 * 1024), 2),
             "model_dtype": str(self.torch_dtype),
+            "inference_backend": self.inference_backend,
+            "inference_profile": self.inference_profile,
+            "torch_compile": self.torch_compile,
+            "embedding_workers": self.get_worker_stats(),
             "loading": self._loading
         }
     
     def _cleanup_models(self):
         """모델과 프로세서 메모리 해제"""
         if self._model is not None:
+            if isinstance(self._model, EmbeddingWorkerPool):
+                self._model.shutdown()
             del self._model
             self._model = None
             logger.info("ColPali 모델 메모리 해제")
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import logging
+from typing import Optional, Dict, Any, List
+
+import torch
+from PIL import Image
+
+from be.config import ColPaliConfig
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnxruntime은 ONNX 백엔드를 사용할 때만 필요
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_ENCODER = "image_encoder"
+QUERY_ENCODER = "query_encoder"
+METADATA_FILE = "metadata.json"
+
+
+class _ImageEncoder(torch.nn.Module):
+    """페이지 이미지 경로 (input_ids, attention_mask, pixel_values -> 멀티벡터)"""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, pixel_values):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, pixel_values=pixel_values)
+
+
+class _QueryEncoder(torch.nn.Module):
+    """쿼리 텍스트 경로 (input_ids, attention_mask -> 멀티벡터)"""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask)
+
+
+def get_graph_path(onnx_dir: str, name: str) -> str:
+    """그래프 파일 경로 반환 (그래프마다 폴더를 나누어 외부 가중치 파일이 섞이지 않도록 함)"""
+    return os.path.join(onnx_dir, name, "model.onnx")
+
+
+def export_onnx(model: torch.nn.Module, processor, output_dir: str, model_name: str, processor_name: str,
+                opset: int = ColPaliConfig.ONNX_OPSET) -> Dict[str, Any]:
+    """
+    ColPali 모델의 이미지/쿼리 경로를 각각 ONNX 그래프로 내보내기
+    배치 축과 시퀀스 축은 동적 축으로 지정하며, 2GB를 넘는 가중치는 외부 데이터 파일로 저장됨
+
+    Args:
+        model: float32로 로드한 ColPali 모델 (eval 모드)
+        processor: ColPali 프로세서 (예시 입력 생성에 사용)
+        output_dir: 출력 폴더
+        model_name: 모델명 (메타데이터에 기록)
+        processor_name: 프로세서명 (메타데이터에 기록)
+        opset: ONNX opset 버전
+
+    Returns:
+        Dict: 내보낸 그래프 경로와 소요 시간을 담은 메타데이터
+    """
+    image_inputs = processor.process_images([Image.new("RGB", (448, 448), "white")] * 2)
+    query_inputs = processor.process_queries(["sample query", "a longer sample query for export"])
+
+    graphs = {
+        IMAGE_ENCODER: (
+            _ImageEncoder(model),
+            image_inputs,
+            ["input_ids", "attention_mask", "pixel_values"],
+        ),
+        QUERY_ENCODER: (
+            _QueryEncoder(model),
+            query_inputs,
+            ["input_ids", "attention_mask"],
+        ),
+    }
+
+    metadata = {
+        "model_name": model_name,
+        "processor_name": processor_name,
+        "opset": opset,
+        "exported_at": time.time(),
+        "graphs": {}
+    }
+    for name, (encoder, inputs, input_names) in graphs.items():
+        path = get_graph_path(output_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        dynamic_axes = {input_name: {0: "batch"} for input_name in input_names}
+        dynamic_axes["input_ids"][1] = "sequence"
+        dynamic_axes["attention_mask"][1] = "sequence"
+        dynamic_axes["embeddings"] = {0: "batch", 1: "sequence"}
+
+        start_time = time.perf_counter()
+        with torch.no_grad():
+            torch.onnx.export(
+                encoder.eval(),
+                tuple(inputs[input_name] for input_name in input_names),
+                path,
+                input_names=input_names,
+                output_names=["embeddings"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+                do_constant_folding=True,
+                dynamo=False,
+            )
+        elapsed = time.perf_counter() - start_time
+        metadata["graphs"][name] = {
+            "path": os.path.relpath(path, output_dir),
+            "inputs": input_names,
+            "export_seconds": round(elapsed, 2)
+        }
+        logger.info(f"ONNX 그래프 내보내기 완료: {path} ({elapsed:.1f}초)")
+
+    with open(os.path.join(output_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    return metadata
+
+
+class OnnxColPaliModel:
+    """
+    ONNX Runtime으로 ColPali 임베딩을 계산하는 모델
+    ColPali 모델과 같은 방식(model(**inputs))으로 호출하며, pixel_values가 있으면 이미지 그래프,
+    없으면 쿼리 그래프를 사용하고 결과를 torch 텐서로 반환
+    """
+
+    # ColPali(nn.Module)와 같은 방식으로 사용할 수 있도록 맞춘 속성
+    training = False
+
+    def __init__(self, onnx_dir: str, device: str = "cpu", num_threads: int = 0):
+        if ort is None:
+            raise ImportError("onnxruntime이 설치되어 있지 않습니다. pip install onnxruntime")
+
+        metadata_path = os.path.join(onnx_dir, METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise FileNotFoundError(f"ONNX 메타데이터가 없습니다. 먼저 내보내기를 실행하세요: {metadata_path}")
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            self.metadata = json.load(f)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        providers = ["CPUExecutionProvider"]
+        if device.startswith("cuda") and "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+
+        self._sessions = {
+            name: ort.InferenceSession(get_graph_path(onnx_dir, name), sess_options=options, providers=providers)
+            for name in (IMAGE_ENCODER, QUERY_ENCODER)
+        }
+        self._input_names = {
+            name: [session_input.name for session_input in session.get_inputs()]
+            for name, session in self._sessions.items()
+        }
+        self.providers = providers
+        # 입력은 numpy로 변환하여 전달하므로 텐서는 CPU에 둠
+        self.device = torch.device("cpu")
+
+    def __call__(self, **inputs) -> torch.Tensor:
+        name = IMAGE_ENCODER if "pixel_values" in inputs else QUERY_ENCODER
+        feed = {}
+        for input_name in self._input_names[name]:
+            tensor = inputs[input_name].detach().cpu()
+            feed[input_name] = tensor.float().numpy() if tensor.is_floating_point() else tensor.long().numpy()
+        embeddings = self._sessions[name].run(["embeddings"], feed)[0]
+        return torch.from_numpy(embeddings)
+
+    def eval(self) -> "OnnxColPaliModel":
+        return self
+
+    def train(self, mode: bool = True) -> "OnnxColPaliModel":
+        return self
+
+
+def check_onnx_parity(reference_model: torch.nn.Module, onnx_model: OnnxColPaliModel, processor,
+                      images: List[Any], queries: List[str],
+                      min_cosine: float = ColPaliConfig.ONNX_PARITY_MIN_COSINE) -> Dict[str, Any]:
+    """
+    ONNX 임베딩과 PyTorch 임베딩 비교
+    이미지/쿼리 경로별로 토큰 단위 코사인 유사도와 최대 절대 오차, 배치당 추론 시간을 측정
+
+    Args:
+        reference_model: 기준 PyTorch 모델 (float32)
+        onnx_model: 비교할 ONNX 모델
+        processor: ColPali 프로세서
+        images: 페이지 이미지 목록 (PIL)
+        queries: 쿼리 텍스트 목록
+        min_cosine: 통과 기준 최소 코사인 유사도
+
+    Returns:
+        Dict: 경로별 비교 결과와 전체 통과 여부(passed)
+    """
+    results = {}
+    for name, inputs in (
+        (IMAGE_ENCODER, processor.process_images(images)),
+        (QUERY_ENCODER, processor.process_queries(queries)),
+    ):
+        with torch.no_grad():
+            start_time = time.perf_counter()
+            reference = reference_model(**inputs.to(reference_model.device)).cpu().float()
+            torch_seconds = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            embeddings = onnx_model(**inputs).float()
+            onnx_seconds = time.perf_counter() - start_time
+
+        # 패딩 토큰은 임베딩이 0이므로 제외
+        valid = reference.norm(dim=-1) > 0
+        cosine = torch.nn.functional.cosine_similarity(embeddings, reference, dim=-1)[valid]
+        results[name] = {
+            "inputs": len(images) if name == IMAGE_ENCODER else len(queries),
+            "max_abs_diff": round((embeddings - reference).abs().max().item(), 6),
+            "mean_cosine": round(cosine.mean().item(), 6),
+            "min_cosine": round(cosine.min().item(), 6),
+            "torch_seconds": round(torch_seconds, 4),
+            "onnx_seconds": round(onnx_seconds, 4),
+            "passed": cosine.min().item() >= min_cosine
+        }
+        logger.info(f"ONNX 정합성 검사: {name} {results[name]}")
+
+    return {
+        "min_cosine_threshold": min_cosine,
+        "passed": all(result["passed"] for result in results.values()),
+        **results
+    }
+
+
+def load_onnx_model(onnx_dir: str, model_name: str, device: str = "cpu",
+                    num_threads: int = 0) -> OnnxColPaliModel:
+    """
+    내보낸 ONNX 모델 로딩 (다른 모델에서 내보낸 그래프이면 예외 발생)
+
+    Raises:
+        ValueError: 메타데이터의 모델명이 설정과 다른 경우
+    """
+    model = OnnxColPaliModel(onnx_dir, device=device, num_threads=num_threads)
+    exported_name: Optional[str] = model.metadata.get("model_name")
+    if exported_name != model_name:
+        raise ValueError(f"ONNX 그래프의 모델이 설정과 다릅니다: {exported_name} (설정: {model_name})")
+    logger.info(f"ONNX 모델 로딩 완료: {onnx_dir} ({', '.join(model.providers)})")
+    return model
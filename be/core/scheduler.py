@@ -0,0 +1,132 @@
+import math
+import time
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceScheduler:
+    """
+    모델 추론 스케줄러
+    동시에 실행되는 forward 수를 제한하고, 대기 중인 요청은 레인 우선순위에 따라 실행
+    (앞선 레인이 우선, 예: 쿼리가 대기 중인 인덱싱 배치보다 먼저 실행됨. 이미 실행 중인 배치는 중단하지 않음)
+    레인별 동시 실행 수를 따로 제한할 수 있고, 레인별 대기 시간 통계를 기록
+    """
+
+    HISTORY_SIZE = 200  # 대기 시간 백분위 계산에 사용하는 최근 요청 수
+
+    def __init__(self, lanes: Sequence[str], max_concurrency: int = 1,
+                 lane_concurrency: Dict[str, int] = None):
+        """
+        Args:
+            lanes: 레인 목록 (우선순위 순)
+            max_concurrency: 전체 동시 실행 forward 수
+            lane_concurrency: 레인별 동시 실행 수 (지정하지 않으면 전체 제한만 적용)
+        """
+        self.lanes = list(lanes)
+        self.max_concurrency = max(1, max_concurrency)
+        lane_concurrency = lane_concurrency or {}
+        self.lane_concurrency = {
+            lane: max(1, lane_concurrency.get(lane) or self.max_concurrency) for lane in self.lanes
+        }
+
+        self._condition = threading.Condition()
+        self._waiting: Dict[str, deque] = {lane: deque() for lane in self.lanes}
+        self._running: Dict[str, int] = {lane: 0 for lane in self.lanes}
+        self._tickets = 0
+
+        self._stats = {
+            lane: {"completed": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "run_seconds": 0.0,
+                   "history": deque(maxlen=self.HISTORY_SIZE)}
+            for lane in self.lanes
+        }
+
+    def _next_lane(self):
+        """다음에 실행할 수 있는 레인 반환 (lock 보유 상태에서 호출, 없으면 None)"""
+        if sum(self._running.values()) >= self.max_concurrency:
+            return None
+        for lane in self.lanes:
+            if self._waiting[lane] and self._running[lane] < self.lane_concurrency[lane]:
+                return lane
+        return None
+
+    @contextmanager
+    def slot(self, lane: str):
+        """
+        실행 슬롯을 얻을 때까지 대기한 뒤 블록 실행
+
+        Args:
+            lane: 요청 레인
+
+        Raises:
+            ValueError: 알 수 없는 레인인 경우
+        """
+        if lane not in self._waiting:
+            raise ValueError(f"알 수 없는 추론 레인: {lane} (지원: {', '.join(self.lanes)})")
+
+        enqueued_at = time.perf_counter()
+        with self._condition:
+            self._tickets += 1
+            ticket = self._tickets
+            self._waiting[lane].append(ticket)
+            try:
+                while not (self._next_lane() == lane and self._waiting[lane][0] == ticket):
+                    self._condition.wait()
+            except BaseException:
+                # 대기 중 중단(KeyboardInterrupt 등)되면 남은 티켓이 레인 맨 앞을 막지 않도록 제거
+                self._waiting[lane].remove(ticket)
+                self._condition.notify_all()
+                raise
+            self._waiting[lane].popleft()
+            self._running[lane] += 1
+            # 남은 슬롯으로 다른 대기 요청도 실행할 수 있는지 다시 확인하도록 알림
+            self._condition.notify_all()
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished_at = time.perf_counter()
+            with self._condition:
+                self._running[lane] -= 1
+                stats = self._stats[lane]
+                wait_seconds = started_at - enqueued_at
+                stats["completed"] += 1
+                stats["wait_seconds"] += wait_seconds
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait_seconds)
+                stats["run_seconds"] += finished_at - started_at
+                stats["history"].append(wait_seconds)
+                self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        레인별 실행/대기 상태와 대기 시간 통계 반환
+
+        Returns:
+            Dict: 전체 동시 실행 제한과 레인별 running, waiting, completed,
+                  avg_wait_ms, p95_wait_ms, max_wait_ms, avg_run_ms
+        """
+        with self._condition:
+            lanes = {}
+            for lane in self.lanes:
+                stats = self._stats[lane]
+                completed = stats["completed"]
+                history = sorted(stats["history"])
+                lanes[lane] = {
+                    "concurrency": self.lane_concurrency[lane],
+                    "running": self._running[lane],
+                    "waiting": len(self._waiting[lane]),
+                    "completed": completed,
+                    "avg_wait_ms": round(stats["wait_seconds"] / completed * 1000, 2) if completed else 0.0,
+                    "p95_wait_ms": round(history[math.ceil(len(history) * 0.95) - 1] * 1000, 2) if history else 0.0,
+                    "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 2),
+                    "avg_run_ms": round(stats["run_seconds"] / completed * 1000, 2) if completed else 0.0
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "lanes": lanes
+            }
@@ -0,0 +1,256 @@
+import time
+import queue
+import threading
+import logging
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import psutil
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def is_out_of_memory_error(error: Exception) -> bool:
+    """메모리 할당 실패 오류인지 확인 (CUDA OOM, CPU 할당 실패, MemoryError)"""
+    if isinstance(error, MemoryError):
+        return True
+    if isinstance(error, RuntimeError):
+        message = str(error).lower()
+        return "out of memory" in message or "can't allocate memory" in message
+    return False
+
+
+def slice_batch(inputs, start: int, end: int):
+    """모델 입력 배치(BatchFeature/dict)의 일부 구간 반환"""
+    return type(inputs)({key: value[start:end] for key, value in inputs.items()})
+
+
+def get_batch_length(inputs) -> int:
+    """모델 입력 배치의 샘플 수 반환"""
+    return len(next(iter(inputs.values())))
+
+
+class AdaptiveBatchController:
+    """
+    임베딩 배치 크기 자동 조정기
+    처음 몇 배치에서 배치 크기를 두 배씩 키우며 처리량(pages/sec)을 측정하고,
+    처리량이 더 이상 늘지 않거나 메모리 사용률이 상한을 넘으면 그 이전 크기로 고정
+    메모리 할당 실패 시에는 최대 크기를 절반으로 낮춤
+    """
+
+    MIN_IMPROVEMENT = 0.05  # 배치 크기를 키울 때 요구되는 최소 처리량 향상 비율
+    WARMUP_BATCHES = 1  # 측정에서 제외할 첫 배치 수 (모델 워밍업)
+    HISTORY_SIZE = 50  # 통계로 보관하는 최근 측정 수
+
+    def __init__(self, initial_size: int, min_size: int = 1, max_size: int = 32,
+                 memory_ceiling: float = 0.85, device: str = "cpu", adaptive: bool = True):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.memory_ceiling = memory_ceiling
+        self.device = device
+        self.adaptive = adaptive
+
+        self._size = min(max(initial_size, self.min_size), self.max_size)
+        self._best_size = self._size
+        self._best_throughput = 0.0
+        self._probing = adaptive
+        self._warmup_remaining = self.WARMUP_BATCHES
+        self._lock = threading.Lock()
+
+        self.oom_count = 0
+        self.history: deque = deque(maxlen=self.HISTORY_SIZE)
+
+    @property
+    def batch_size(self) -> int:
+        """다음 배치에 사용할 크기"""
+        with self._lock:
+            return self._size
+
+    def get_memory_usage(self) -> float:
+        """추론 디바이스의 메모리 사용률(0~1) 반환"""
+        if self.device.startswith("cuda") and torch.cuda.is_available():
+            free, total = torch.cuda.mem_get_info(torch.device(self.device))
+            return 1 - free / total
+        return psutil.virtual_memory().percent / 100
+
+    def record(self, batch_size: int, elapsed: float):
+        """
+        배치 처리 결과를 기록하고 다음 배치 크기 결정
+
+        Args:
+            batch_size: 처리한 배치 크기
+            elapsed: 추론 소요 시간(초)
+        """
+        if not self.adaptive or elapsed <= 0:
+            return
+
+        throughput = batch_size / elapsed
+        memory_usage = self.get_memory_usage()
+
+        with self._lock:
+            self.history.append({
+                "batch_size": batch_size,
+                "pages_per_sec": round(throughput, 2),
+                "memory_usage": round(memory_usage, 3)
+            })
+
+            if memory_usage > self.memory_ceiling:
+                # 메모리 상한 초과: 배치 크기를 줄이고 더 이상 키우지 않음
+                self.max_size = max(self.min_size, min(self.max_size, batch_size // 2))
+                self._size = min(self._size, self.max_size)
+                self._best_size = min(self._best_size, self.max_size)
+                self._probing = False
+                logger.info(f"메모리 사용률 {memory_usage:.0%}로 상한 초과, 배치 크기 {self._size}로 조정")
+                return
+
+            if not self._probing or batch_size != self._size:
+                return
+
+            if self._warmup_remaining > 0:
+                self._warmup_remaining -= 1
+                return
+
+            if throughput > self._best_throughput * (1 + self.MIN_IMPROVEMENT):
+                self._best_throughput = throughput
+                self._best_size = batch_size
+                if batch_size < self.max_size:
+                    self._size = min(batch_size * 2, self.max_size)
+                    return
+
+            # 처리량이 더 이상 늘지 않으면 가장 좋았던 크기로 고정
+            self._size = self._best_size
+            self._probing = False
+            logger.info(f"배치 크기 {self._size}로 고정 ({self._best_throughput:.2f} pages/sec)")
+
+    def record_oom(self, batch_size: int):
+        """메모리 할당 실패 기록, 최대 배치 크기를 절반으로 낮춤"""
+        with self._lock:
+            self.oom_count += 1
+            self.max_size = max(self.min_size, min(self.max_size, batch_size // 2))
+            self._size = min(self._size, self.max_size)
+            self._best_size = min(self._best_size, self.max_size)
+            self._probing = False
+        logger.warning(f"배치 크기 {batch_size}에서 메모리 부족, 최대 배치 크기 {self.max_size}로 조정")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """배치 크기 조정 상태 반환"""
+        with self._lock:
+            return {
+                "adaptive": self.adaptive,
+                "batch_size": self._size,
+                "best_size": self._best_size,
+                "max_size": self.max_size,
+                "probing": self._probing,
+                "best_pages_per_sec": round(self._best_throughput, 2),
+                "oom_count": self.oom_count,
+                "history": list(self.history)
+            }
+
+
+class QueryBatcher:
+    """
+    쿼리 임베딩 마이크로 배처
+    동시에 들어온 쿼리를 최대 max_wait_ms 동안(또는 max_batch_size개까지) 모아 한 번의 forward로 임베딩하고
+    요청별 결과를 돌려줌. 배치 안에서 길이를 맞추기 위해 추가된 패딩 토큰은 결과에서 제외
+    """
+
+    HISTORY_SIZE = 100  # 통계로 보관하는 최근 배치 수
+
+    def __init__(self, model_manager, max_wait_ms: float = 5.0, max_batch_size: int = 16):
+        self.model_manager = model_manager
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._worker.start()
+
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_realized_batch_size = 0
+        self._queue_seconds = 0.0
+        self._encode_seconds = 0.0
+        self.history: deque = deque(maxlen=self.HISTORY_SIZE)
+
+    def encode(self, query_text: str) -> np.ndarray:
+        """
+        쿼리 멀티벡터 반환 (다른 요청과 함께 배치로 처리될 때까지 대기)
+
+        Returns:
+            np.ndarray: (토큰 수, 임베딩 차원) float32 배열
+        """
+        future = Future()
+        self._queue.put((query_text, future, time.perf_counter()))
+        return future.result()
+
+    def _run(self):
+        """첫 요청이 도착한 뒤 max_wait 동안 추가 요청을 모아 배치 처리"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0][2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[Tuple[str, Future, float]]):
+        """배치 임베딩 후 요청별 결과 전달"""
+        start_time = time.perf_counter()
+        try:
+            model = self.model_manager.get_model()
+            inputs = self.model_manager.get_processor().process_queries([text for text, _, _ in batch])
+            with self.model_manager.inference_slot("query"), torch.no_grad():
+                embeddings = model(**inputs.to(model.device)).cpu().float().numpy()
+            masks = inputs["attention_mask"].cpu().numpy().astype(bool)
+        except Exception as e:
+            with self._lock:
+                self.errors += len(batch)
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        encode_seconds = time.perf_counter() - start_time
+
+        queue_seconds = sum(start_time - enqueued_at for _, _, enqueued_at in batch)
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.max_realized_batch_size = max(self.max_realized_batch_size, len(batch))
+            self._queue_seconds += queue_seconds
+            self._encode_seconds += encode_seconds
+            self.history.append({
+                "batch_size": len(batch),
+                "queue_ms": round(queue_seconds / len(batch) * 1000, 2),
+                "encode_ms": round(encode_seconds * 1000, 2)
+            })
+
+        for (_, future, _), embedding, mask in zip(batch, embeddings, masks):
+            future.set_result(embedding[mask])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        마이크로 배치 통계 반환
+
+        Returns:
+            Dict: 평균 배치 크기, 요청당 평균 대기 시간(배치 시작까지), 배치당 평균 임베딩 시간 등
+        """
+        with self._lock:
+            return {
+                "max_wait_ms": self.max_wait * 1000,
+                "max_batch_size": self.max_batch_size,
+                "requests": self.requests,
+                "batches": self.batches,
+                "errors": self.errors,
+                "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_realized_batch_size": self.max_realized_batch_size,
+                "avg_queue_ms": round(self._queue_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+                "avg_encode_ms": round(self._encode_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "history": list(self.history)
+            }
@@ -1,21 +1,27 @@
 import os
-import torch
 import time
-import tempfile
 import glob
-import shutil
 import logging
 import base64
-from typing import List, Dict, Any, Callable, Optional
+import mimetypes
+import threading
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from PIL import Image
 from langchain_core.messages import HumanMessage
 
 from be.core.models import colpali_manager, azure_openai_manager
 from be.core.database import qdrant_manager
-from be.utils.pdf import convert_pdf_to_images
-from be.utils.qdrant import upsert_to_qdrant
+from be.utils.pdf import has_text_layer, get_pdf_hash, iter_pdf_pages
+from be.utils.image import image_content_hash
+from be.utils.manifest import index_manifest, get_point_ids
+from be.utils.cache import render_cache, query_cache, normalize_query
+from be.utils.qdrant import get_query_kwargs, vector_transport_stats
+from be.utils.documents import (
+    document_registry, render_document_page, render_thumbnail, get_document_page_text
+)
+from be.services.indexing_pipeline import IndexingPipeline, IndexingCancelledError, get_embed_render_size
+from be.services.batching import AdaptiveBatchController, QueryBatcher
 from be.config import ColPaliConfig, settings
 
 logger = logging.getLogger(__name__)
@@ -24,9 +30,22 @@ class ColPaliRAGService:
     def __init__(self):
         self.collection_name = ColPaliConfig.COLLECTION_NAME
         self.batch_size = settings.batch_size
+        self.batch_controller = AdaptiveBatchController(
+            initial_size=settings.batch_size,
+            min_size=ColPaliConfig.MIN_BATCH_SIZE,
+            max_size=settings.max_batch_size,
+            memory_ceiling=settings.batch_memory_ceiling,
+            device=settings.device,
+            adaptive=settings.adaptive_batch
+        )
         self.model_manager = colpali_manager
         self.db_manager = qdrant_manager
         self.llm_manager = azure_openai_manager
+        self.query_batcher = QueryBatcher(
+            self.model_manager,
+            max_wait_ms=settings.query_batch_max_wait_ms,
+            max_batch_size=settings.query_batch_max_size
+        )
         if not self.model_manager.is_initialized:
             self.model_manager.initialize() 
         if not self.db_manager.is_initialized:
@@ -53,115 +72,68 @@ class ColPaliRAGService:
         """Azure OpenAI LLM 반환"""
         return self.llm_manager.get_llm()
     
-    def process_pdf(self, pdf_file_path: str, progress_callback: Optional[Callable] = None, output_dir: str = None) -> Dict[str, Any]:
-        """PDF 파일을 처리하고 인덱싱"""
+    def process_pdf(self, pdf_file_path: str, progress_callback: Optional[Callable] = None,
+                    force: bool = False, cancel_event: Optional[threading.Event] = None,
+                    resume_pages: Optional[Dict[int, Dict[str, Any]]] = None,
+                    checkpoint_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        PDF 파일을 처리하고 인덱싱 (render → preprocess → embed → upsert 파이프라인)
+        이미 인덱싱된 문서는 변경된 페이지만 다시 인덱싱하고, 변경이 없으면 건너뜀
+
+        Args:
+            pdf_file_path: PDF 파일 경로
+            progress_callback: 진행 상황 콜백
+            force: True이면 인덱싱 기록과 관계없이 모든 페이지를 다시 인덱싱
+            cancel_event: 설정되면 진행 중인 인덱싱을 중단
+            resume_pages: 중단된 작업에서 이미 저장한 페이지 (페이지 번호 -> {"point_id", "image_hash"})
+            checkpoint_callback: 배치 저장에 성공할 때마다 저장한 페이지 목록으로 호출
+        """
         try:
-            if output_dir is None:
-                output_dir = settings.output_dir
-            
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            pdf_name = os.path.basename(pdf_file_path).replace('.pdf', '')
-            pdf_image_dir = os.path.join(output_dir, pdf_name)
-            if not os.path.exists(pdf_image_dir):
-                os.makedirs(pdf_image_dir)
+            previous_entry = index_manifest.get_document(pdf_file_path)
+            status = self._get_index_status(pdf_file_path, previous_entry)
             
-            image_files = convert_pdf_to_images(pdf_file_path, pdf_image_dir)
-            total_pages = len(image_files)
-            
-            if progress_callback:
-                progress_callback({
-                    "status": "started",
-                    "message": f"PDF 변환 완료. {total_pages}페이지 인덱싱 시작...",
-                    "current_page": 0,
-                    "total_pages": total_pages,
-                    "percentage": 0
-                })
-            
-            total_indexed = 0
-            
-            for i in range(0, len(image_files), self.batch_size):
-                batch_files = image_files[i : i + self.batch_size]
-                images = [Image.open(img_path) for img_path in batch_files]
-                
-                if progress_callback:
-                    progress_callback({
-                        "status": "processing",
-                        "message": f"페이지 {i+1}-{min(i+len(batch_files), total_pages)} 임베딩 생성 중...",
-                        "current_page": i,
-                        "total_pages": total_pages,
-                        "percentage": int((i / total_pages) * 100)
-                    })
-                
-                with torch.no_grad():
-                    batch_images = self.colpali_processor.process_images(images).to(
-                        self.colpali_model.device
-                    )
-                    image_embeddings = self.colpali_model(**batch_images)
-                
-                points = []
-                for j, embedding in enumerate(image_embeddings):
-                    multivector = embedding.cpu().float().numpy().tolist()
-                    points.append(models.PointStruct(
-                        id=total_indexed + j,
-                        vector=multivector,
-                        payload={
-                            "source": "pdf_image", 
-                            "file_path": batch_files[j],
-                            "page_number": i + j + 1,
-                            "pdf_name": os.path.basename(pdf_file_path)
-                        },
-                    ))
-                
+            if status == "unchanged" and not force:
                 if progress_callback:
                     progress_callback({
-                        "status": "storing",
-                        "message": f"페이지 {i+1}-{min(i+len(batch_files), total_pages)} 벡터 저장 중...",
-                        "current_page": i,
-                        "total_pages": total_pages,
-                        "percentage": int((i / total_pages) * 100)
+                        "status": "completed",
+                        "message": "변경 사항이 없어 인덱싱을 생략했습니다",
+                        "current_page": previous_entry["page_count"],
+                        "total_pages": previous_entry["page_count"],
+                        "percentage": 100
                     })
-                
-                try:
-                    upsert_to_qdrant(points, self.qdrant_client, self.collection_name)
-                    total_indexed += len(points)
-                    
-                    current_page = min(i + len(batch_files), total_pages)
-                    if progress_callback:
-                        progress_callback({
-                            "status": "progress",
-                            "message": f"{current_page}/{total_pages} 페이지 완료",
-                            "current_page": current_page,
-                            "total_pages": total_pages,
-                            "percentage": int((current_page / total_pages) * 100)
-                        })
-                        
-                except Exception as e:
-                    if progress_callback:
-                        progress_callback({
-                            "status": "error",
-                            "message": f"페이지 {i+1}-{min(i+len(batch_files), total_pages)} 저장 중 오류: {e}",
-                            "current_page": i,
-                            "total_pages": total_pages,
-                            "percentage": int((i / total_pages) * 100)
-                        })
-                    continue
+                return {
+                    "success": True,
+                    "message": "변경 사항이 없어 인덱싱을 생략했습니다",
+                    "unchanged": True,
+                    "total_pages": previous_entry["page_count"],
+                    "indexed_pages": 0,
+                    "unchanged_pages": previous_entry["page_count"]
+                }
             
+            # 문서 내용만 바뀌었거나 저장하지 못한 페이지가 있으면 페이지 단위로 비교하고,
+            # 모델이 바뀌었거나 포인트가 없으면 전체 인덱싱
+            return IndexingPipeline(
+                self, pdf_file_path, progress_callback,
+                previous_entry=previous_entry,
+                incremental=(status in ("modified", "incomplete") and not force),
+                cancel_event=cancel_event,
+                resume_pages=resume_pages,
+                checkpoint_callback=checkpoint_callback
+            ).run()
+        
+        except IndexingCancelledError as e:
             if progress_callback:
                 progress_callback({
-                    "status": "completed",
-                    "message": f"인덱싱 완료! 총 {total_indexed}페이지 처리됨",
-                    "current_page": total_pages,
-                    "total_pages": total_pages,
-                    "percentage": 100
+                    "status": "cancelled",
+                    "message": str(e),
+                    "current_page": 0,
+                    "total_pages": 0,
+                    "percentage": 0
                 })
-            
             return {
-                "success": True,
-                "message": f"PDF 인덱싱 완료",
-                "total_pages": len(image_files),
-                "indexed_pages": total_indexed
+                "success": False,
+                "cancelled": True,
+                "message": str(e)
             }
         
         except Exception as e:
@@ -178,33 +150,25 @@ class ColPaliRAGService:
                 "message": f"PDF 처리 중 오류: {str(e)}"
             }
     
-    def query(self, query_text: str, limit: int = None) -> Dict[str, Any]:
-        """텍스트 쿼리로 검색 수행"""
+    def query(self, query_text: str, limit: int = None, with_text: bool = False) -> Dict[str, Any]:
+        """텍스트 쿼리로 검색 수행 (with_text=True이면 인덱싱 시 저장된 페이지 텍스트 포함)"""
         try:
             start_time = time.time()
             
-            with torch.no_grad():
-                batch_query = self.colpali_processor.process_queries([query_text]).to(
-                    self.colpali_model.device
-                )
-                query_embeddings = self.colpali_model(**batch_query)
-            
-            multivector_query = query_embeddings[0].cpu().float().numpy().tolist()
+            # 쿼리 멀티벡터(numpy 배열)는 클라이언트가 변환 (쿼리 토큰 수십 개 분량이므로 변환 비용은 작음)
+            multivector_query = self._encode_query(query_text)
             
             if limit is None:
                 limit = ColPaliConfig.DEFAULT_SEARCH_LIMIT
             
+            # 요약 벡터가 있으면 후보를 먼저 찾고 후보만 전체 멀티벡터 MaxSim으로 재정렬
             search_result = self.qdrant_client.query_points(
                 collection_name=self.collection_name,
-                query=multivector_query,
-                limit=limit,
                 timeout=ColPaliConfig.SEARCH_TIMEOUT,
-                search_params=models.SearchParams(
-                    quantization=models.QuantizationSearchParams(
-                        ignore=False,
-                        rescore=True,
-                        oversampling=2.0,
-                    )
+                **get_query_kwargs(
+                    multivector_query, limit,
+                    prefetch_limit=settings.prefetch_limit,
+                    summary_vectors=self.db_manager.has_summary_vectors
                 )
             )
             
@@ -212,12 +176,19 @@ class ColPaliRAGService:
             
             results = []
             for point in search_result.points:
-                results.append({
+                doc_id = point.payload.get("doc_id", "")
+                page_number = point.payload.get("page_number", 0)
+                result = {
                     "score": float(point.score),
-                    "page_number": point.payload.get("page_number", 0),
+                    "page_number": page_number,
                     "pdf_name": point.payload.get("pdf_name", ""),
-                    "image_path": point.payload.get("file_path", "")
-                })
+                    "doc_id": doc_id,
+                    # 페이지 이미지는 이 URL이 처음 요청될 때 렌더링됨
+                    "image_url": f"/documents/{doc_id}/pages/{page_number}/image" if doc_id else None
+                }
+                if with_text:
+                    result["page_text"] = point.payload.get("page_text")
+                results.append(result)
             
             return {
                 "success": True,
@@ -233,6 +204,37 @@ class ColPaliRAGService:
                 "message": f"검색 중 오류: {str(e)}"
             }
     
+    def get_index_id(self) -> str:
+        """
+        인덱스 내용을 결정하는 식별자 반환 (매니페스트에 기록하여 변경 시 다시 인덱싱)
+
+        Returns:
+            str: 모델 식별자 (토큰 풀링 배율, 요약 벡터 수 포함)
+        """
+        index_id = self.model_manager.get_model_id()
+        if settings.token_pool_factor > 1:
+            index_id += f"|pool={settings.token_pool_factor}"
+        if self.db_manager.has_summary_vectors:
+            index_id += f"|summary={settings.summary_vectors}"
+        return index_id
+
+    def _encode_query(self, query_text: str):
+        """
+        쿼리 멀티벡터 반환
+        정규화한 쿼리로 캐시를 먼저 조회하고, 없으면 동시에 들어온 쿼리와 함께 배치로 임베딩 (패딩 토큰 제외)
+        """
+        query_text = normalize_query(query_text)
+        if not settings.query_cache:
+            return self.query_batcher.encode(query_text)
+
+        model_id = self.model_manager.get_model_id()
+        embedding = query_cache.get(query_text, model_id)
+        if embedding is None:
+            start_time = time.perf_counter()
+            embedding = self.query_batcher.encode(query_text)
+            query_cache.put(query_text, model_id, embedding, time.perf_counter() - start_time)
+        return embedding
+
     def get_status(self) -> Dict[str, Any]:
         """서비스 상태 정보 반환"""
         try:
@@ -241,7 +243,20 @@ class ColPaliRAGService:
                 "success": True,
                 "model_loaded": True,
                 "collection_name": self.collection_name,
-                "total_documents": collection_info.points_count
+                "total_documents": collection_info.points_count,
+                "batching": self.batch_controller.get_stats(),
+                "embedding_workers": self.model_manager.get_worker_stats(),
+                "query_batching": self.query_batcher.get_stats(),
+                "inference_scheduler": self.model_manager.scheduler.get_stats(),
+                "retrieval": {
+                    "two_stage": self.db_manager.has_summary_vectors and settings.prefetch_limit > 0,
+                    "summary_vectors": settings.summary_vectors if self.db_manager.has_summary_vectors else 0,
+                    "prefetch_limit": settings.prefetch_limit
+                },
+                "vector_transport": {
+                    "grpc": self.db_manager.uses_grpc,
+                    **vector_transport_stats.get_stats()
+                }
             }
         except Exception as e:
             return {
@@ -249,6 +264,203 @@ class ColPaliRAGService:
                 "message": f"상태 확인 중 오류: {str(e)}"
             }
     
+    def _get_index_status(self, pdf_path: str, entry: Optional[Dict[str, Any]]) -> str:
+        """
+        인덱싱 기록 대비 문서 상태 반환
+
+        Returns:
+            str: new(기록 없음), unchanged(변경 없음), modified(내용 변경),
+                 model_changed(임베딩 모델 또는 토큰 풀링 배율 변경), missing_points(컬렉션에 없는 포인트가 있음),
+                 incomplete(지난 인덱싱에서 저장하지 못한 페이지가 있음)
+        """
+        if entry is None:
+            return "new"
+        if entry.get("model_id") != self.get_index_id():
+            return "model_changed"
+        
+        # 메모리 DB 재시작이나 컬렉션 초기화로 포인트가 사라진 경우 기록을 신뢰하지 않음
+        point_ids = get_point_ids(entry)
+        if point_ids:
+            points = self.qdrant_client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=False,
+                with_vectors=False
+            )
+            if len(points) < len(set(point_ids)):
+                return "missing_points"
+        
+        if entry.get("doc_id") != get_pdf_hash(pdf_path):
+            return "modified"
+        if entry.get("incomplete"):
+            return "incomplete"
+        return "unchanged"
+    
+    def _diff_pages(self, pdf_path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """인덱싱 기록과 현재 페이지 이미지 해시를 비교하여 페이지 단위 변경 사항 반환"""
+        previous_hashes = [page.get("hash") for page in entry.get("pages", [])]
+        added, changed, unchanged = [], [], 0
+        for page_number, image in iter_pdf_pages(
+            pdf_path,
+            workers=settings.render_workers,
+            target_size=get_embed_render_size(self.model_manager)
+        ):
+            if page_number > len(previous_hashes):
+                added.append(page_number)
+            elif previous_hashes[page_number - 1] != image_content_hash(image):
+                changed.append(page_number)
+            else:
+                unchanged += 1
+        page_count = unchanged + len(added) + len(changed)
+        return {
+            "added_pages": added,
+            "changed_pages": changed,
+            "removed_pages": list(range(page_count + 1, len(previous_hashes) + 1)),
+            "unchanged_pages": unchanged
+        }
+    
+    def diff_index(self, data_dir: str = None, page_diff: bool = True) -> Dict[str, Any]:
+        """
+        데이터 폴더를 다시 인덱싱할 때 바뀌는 내용 반환 (dry-run, 인덱스는 변경하지 않음)
+
+        Args:
+            data_dir: 데이터 폴더 (기본값: 설정의 data_dir)
+            page_diff: 내용이 바뀐 문서의 페이지 단위 변경 사항 포함 여부 (페이지 렌더링 필요)
+        """
+        try:
+            if data_dir is None:
+                data_dir = settings.data_dir
+            
+            if not os.path.exists(data_dir):
+                return {
+                    "success": False,
+                    "message": f"데이터 폴더가 존재하지 않습니다: {data_dir}"
+                }
+            
+            documents = []
+            pdf_files = sorted(glob.glob(os.path.join(data_dir, "*.pdf")))
+            for pdf_path in pdf_files:
+                entry = index_manifest.get_document(pdf_path)
+                status = self._get_index_status(pdf_path, entry)
+                document = {
+                    "pdf_name": os.path.basename(pdf_path),
+                    "pdf_path": pdf_path,
+                    "status": status
+                }
+                if status == "modified" and page_diff:
+                    document.update(self._diff_pages(pdf_path, entry))
+                documents.append(document)
+            
+            # 폴더에서 사라진 문서는 포인트 삭제 대상
+            current_keys = {index_manifest.get_key(pdf_path) for pdf_path in pdf_files}
+            for key, entry in index_manifest.list_documents(data_dir).items():
+                if key not in current_keys:
+                    documents.append({
+                        "pdf_name": entry["pdf_name"],
+                        "pdf_path": entry["pdf_path"],
+                        "status": "removed",
+                        "deleted_points": len(get_point_ids(entry))
+                    })
+            
+            summary = {}
+            for document in documents:
+                summary[document["status"]] = summary.get(document["status"], 0) + 1
+            
+            return {
+                "success": True,
+                "data_dir": data_dir,
+                "documents": documents,
+                "summary": summary
+            }
+        
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"인덱스 변경 사항 확인 중 오류: {str(e)}"
+            }
+    
+    def remove_document(self, pdf_path: str) -> Dict[str, Any]:
+        """인덱싱 기록과 컬렉션에서 문서 삭제"""
+        entry = index_manifest.get_document(pdf_path)
+        if entry is None:
+            return {
+                "success": False,
+                "message": f"인덱싱 기록이 없는 문서입니다: {pdf_path}"
+            }
+        
+        point_ids = get_point_ids(entry)
+        if point_ids:
+            self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=point_ids),
+            )
+        index_manifest.remove_document(pdf_path)
+        return {
+            "success": True,
+            "message": f"문서 삭제 완료: {entry['pdf_name']}",
+            "deleted_points": len(point_ids)
+        }
+    
+    def remove_missing_documents(self, data_dir: str) -> List[Dict[str, Any]]:
+        """
+        인덱싱 기록은 있지만 데이터 폴더에서 사라진 문서를 컬렉션에서 삭제
+
+        Returns:
+            List[Dict]: 문서별 삭제 결과
+        """
+        current_keys = {
+            index_manifest.get_key(pdf_path)
+            for pdf_path in glob.glob(os.path.join(data_dir, "*.pdf"))
+        }
+        removed = []
+        for key, entry in index_manifest.list_documents(data_dir).items():
+            if key not in current_keys:
+                result = self.remove_document(key)
+                result["pdf_path"] = entry["pdf_path"]
+                removed.append(result)
+        return removed
+    
+    def reindex_directory(self, data_dir: str = None, force: bool = False,
+                          progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        데이터 폴더 다시 인덱싱
+        새 문서와 변경된 문서만 인덱싱하고, 폴더에서 사라진 문서의 포인트는 삭제
+        """
+        try:
+            if data_dir is None:
+                data_dir = settings.data_dir
+            
+            if not os.path.exists(data_dir):
+                return {
+                    "success": False,
+                    "message": f"데이터 폴더가 존재하지 않습니다: {data_dir}"
+                }
+            
+            pdf_files = sorted(glob.glob(os.path.join(data_dir, "*.pdf")))
+            results = []
+            for pdf_path in pdf_files:
+                result = self.process_pdf(pdf_path, progress_callback, force=force)
+                result["pdf_path"] = pdf_path
+                results.append(result)
+            
+            removed = self.remove_missing_documents(data_dir)
+            
+            return {
+                "success": all(result["success"] for result in results + removed),
+                "message": "폴더 인덱싱 완료",
+                "indexed_documents": sum(1 for result in results if result["success"] and not result.get("unchanged")),
+                "unchanged_documents": sum(1 for result in results if result.get("unchanged")),
+                "removed_documents": len(removed),
+                "documents": results,
+                "removed": removed
+            }
+        
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"폴더 인덱싱 중 오류: {str(e)}"
+            }
+    
     def get_pdf_list(self, data_dir: str = None) -> Dict[str, Any]:
         """데이터 폴더에서 PDF 파일 목록 반환"""
         try:
@@ -269,6 +481,7 @@ class ColPaliRAGService:
                 pdf_size = os.path.getsize(pdf_path)
                 
                 pdf_list.append({
+                    "doc_id": document_registry.register(pdf_path),
                     "name": pdf_name,
                     "path": pdf_path,
                     "size": pdf_size,
@@ -287,60 +500,43 @@ class ColPaliRAGService:
                 "message": f"PDF 목록 조회 중 오류: {str(e)}"
             }
     
-    def get_pdf_preview(self, pdf_path: str, output_dir: str = None) -> Dict[str, Any]:
-        """PDF의 첫 페이지 미리보기 이미지 생성"""
+    def get_pdf_preview(self, pdf_path: str) -> Dict[str, Any]:
+        """PDF의 첫 페이지 미리보기 썸네일 생성 (렌더 캐시 사용)"""
         try:
             if not os.path.exists(pdf_path):
                 return {
                     "success": False,
+                    "pdf_path": pdf_path,
                     "message": "PDF 파일이 존재하지 않습니다."
                 }
             
-            # 출력 디렉토리 설정 및 생성
-            if output_dir is None:
-                output_dir = settings.output_dir
-                
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # PDF 파일명을 기반으로 미리보기 파일명 생성
-            pdf_name_without_ext = os.path.basename(pdf_path).replace('.pdf', '')
-            preview_filename = f"preview_{pdf_name_without_ext}.png"
-            preview_path = os.path.join(output_dir, preview_filename)
-            
-            # 이미 미리보기가 존재하면 재사용
-            if os.path.exists(preview_path):
-                return {
-                    "success": True,
-                    "preview_path": preview_path,
-                    "pdf_name": os.path.basename(pdf_path)
-                }
-            
-            with tempfile.TemporaryDirectory() as temp_dir:
-                image_files = convert_pdf_to_images(pdf_path, temp_dir, max_pages=1)
-                
-                if not image_files:
-                    return {
-                        "success": False,
-                        "message": "PDF에서 이미지를 생성할 수 없습니다."
-                    }
-                
-                # 첫 번째 페이지 이미지를 temp_images로 복사
-                first_page_temp = image_files[0]
-                shutil.copy2(first_page_temp, preview_path)
-                
-                return {
-                    "success": True,
-                    "preview_path": preview_path,
-                    "pdf_name": os.path.basename(pdf_path)
-                }
+            preview_path = render_thumbnail(pdf_path)
+            image_name = os.path.relpath(preview_path, render_cache.root_dir)
+            return {
+                "success": True,
+                "pdf_path": pdf_path,
+                "preview_path": preview_path,
+                "image_name": image_name,
+                "image_url": f"/images/{image_name}",
+                "pdf_name": os.path.basename(pdf_path)
+            }
         
         except Exception as e:
             return {
                 "success": False,
+                "pdf_path": pdf_path,
                 "message": f"미리보기 생성 중 오류: {str(e)}"
             }
     
+    def get_pdf_previews(self, pdf_paths: List[str]) -> Dict[str, Any]:
+        """여러 PDF의 미리보기 썸네일을 한 번에 생성"""
+        previews = [self.get_pdf_preview(pdf_path) for pdf_path in pdf_paths]
+        return {
+            "success": True,
+            "previews": previews,
+            "total": len(previews)
+        }
+    
     def _encode_image_to_base64(self, image_path: str) -> str:
         """이미지를 base64로 인코딩"""
         try:
@@ -360,6 +556,7 @@ class ColPaliRAGService:
             base64_image = self._encode_image_to_base64(image_path)
             if not base64_image:
                 return ""
+            mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
             
             # Azure OpenAI Vision을 사용하여 텍스트 추출
             llm = self.azure_llm
@@ -373,7 +570,7 @@ class ColPaliRAGService:
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{base64_image}"
+                            "url": f"data:{mime_type};base64,{base64_image}"
                         }
                     }
                 ]
@@ -386,13 +583,45 @@ class ColPaliRAGService:
             logger.error(f"이미지에서 텍스트 추출 실패: {e}")
             return ""
     
+    def _get_page_context(self, result: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        검색된 페이지의 컨텍스트 텍스트 반환
+        텍스트 레이어(인덱싱 시 저장 또는 PDF에서 바로 추출)를 우선 사용하고,
+        사용할 수 있는 텍스트가 없는 페이지만 Vision OCR로 추출
+        
+        Returns:
+            Tuple[str, Optional[str]]: (텍스트, 추출 방식: "text_layer" | "vision" | None)
+        """
+        doc_id = result.get("doc_id")
+        if not doc_id:
+            return "", None
+        
+        if settings.text_extraction == "auto":
+            page_text = result.get("page_text")
+            if page_text is None:
+                # 텍스트를 저장하기 전에 인덱싱된 포인트
+                try:
+                    page_text = get_document_page_text(doc_id, result["page_number"])
+                except Exception as e:
+                    logger.error(f"페이지 텍스트 추출 실패: {e}")
+                    page_text = ""
+            if has_text_layer(page_text, ColPaliConfig.MIN_TEXT_LAYER_CHARS):
+                return page_text, "text_layer"
+        
+        try:
+            image_path = render_document_page(doc_id, result["page_number"], profile="llm")
+        except Exception as e:
+            logger.error(f"페이지 이미지 렌더링 실패: {e}")
+            return "", None
+        return self._extract_text_from_image(image_path), "vision"
+    
     def chat_query(self, query_text: str, limit: int = None, use_context: bool = True) -> Dict[str, Any]:
         """텍스트 쿼리로 검색하고 Azure LLM으로 답변 생성"""
         try:
             start_time = time.time()
             
             # 1. 기존 검색 기능으로 관련 페이지들 찾기
-            search_result = self.query(query_text, limit)
+            search_result = self.query(query_text, limit, with_text=True)
             
             if not search_result["success"]:
                 return search_result
@@ -403,16 +632,18 @@ class ColPaliRAGService:
             
             if use_context and search_result["results"]:
                 for result in search_result["results"][:5]:  # 상위 5개 페이지만 사용
-                    image_path = result["image_path"]
-                    if os.path.exists(image_path):
-                        extracted_text = self._extract_text_from_image(image_path)
-                        if extracted_text:
-                            context_texts.append(extracted_text)
-                            page_info.append({
-                                "page_number": result["page_number"],
-                                "pdf_name": result["pdf_name"],
-                                "score": result["score"]
-                            })
+                    extracted_text, text_source = self._get_page_context(result)
+                    if extracted_text:
+                        context_texts.append(extracted_text)
+                        page_info.append({
+                            "page_number": result["page_number"],
+                            "pdf_name": result["pdf_name"],
+                            "score": result["score"],
+                            "text_source": text_source
+                        })
+            
+            for result in search_result["results"]:
+                result.pop("page_text", None)
             
             # 3. 컨텍스트와 함께 프롬프트 구성
             if context_texts:
@@ -0,0 +1,687 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from qdrant_client.http import models
+
+from be.config import ColPaliConfig, settings
+from be.utils.pdf import get_page_count, iter_pdf_pages, iter_page_texts, has_text_layer
+from be.utils.image import is_blank_image, perceptual_hash, find_duplicate, image_content_hash
+from be.utils.cache import embedding_cache
+from be.utils.manifest import index_manifest, get_point_ids
+from be.utils.documents import document_registry, render_document_page
+from be.utils.qdrant import upsert_vectors, get_point_id
+from be.utils.pooling import pool_embeddings, summarize_embedding
+from be.services.batching import is_out_of_memory_error, slice_batch, get_batch_length
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 신호
+_STOP = object()
+
+
+class IndexingCancelledError(Exception):
+    """인덱싱이 취소되었을 때 발생하는 예외"""
+    pass
+
+
+def get_embed_render_size(model_manager) -> int:
+    """임베딩용 렌더링 크기(짧은 변, px) 반환"""
+    if ColPaliConfig.EMBED_RENDER_SIZE:
+        return ColPaliConfig.EMBED_RENDER_SIZE
+    return int(model_manager.get_image_size() * ColPaliConfig.EMBED_RENDER_SCALE)
+
+
+class PipelineStage:
+    """
+    인덱싱 파이프라인의 단계 하나 (워커 수, 입력 큐, 처리량 통계)
+    """
+
+    def __init__(self, name: str, workers: int, input_queue: Optional[queue.Queue] = None):
+        self.name = name
+        self.workers = max(1, workers)
+        self.input_queue = input_queue
+
+        self.pages = 0
+        self.batches = 0
+        self.busy_time = 0.0
+        self._active_workers = self.workers
+        self._lock = threading.Lock()
+
+    def record(self, pages: int, elapsed: float):
+        """배치 하나의 처리 결과 기록"""
+        with self._lock:
+            self.pages += pages
+            self.batches += 1
+            self.busy_time += elapsed
+
+    def worker_finished(self) -> bool:
+        """워커 종료 기록, 마지막 워커이면 True 반환"""
+        with self._lock:
+            self._active_workers -= 1
+            return self._active_workers == 0
+
+    def get_stats(self, elapsed: float) -> Dict[str, Any]:
+        """단계별 처리량과 큐 적체량 반환"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pages": self.pages,
+                "batches": self.batches,
+                "pages_per_sec": round(self.pages / elapsed, 2) if elapsed > 0 else 0.0,
+                "busy_seconds": round(self.busy_time, 2),
+                "utilization": round(self.busy_time / (elapsed * self.workers), 2) if elapsed > 0 else 0.0,
+                "queue_depth": self.input_queue.qsize() if self.input_queue is not None else 0
+            }
+
+
+class IndexingPipeline:
+    """
+    PDF 인덱싱 파이프라인
+    render → preprocess → embed → upsert 단계를 크기가 제한된 큐로 연결하여
+    모델 추론 중에도 렌더링/전처리/저장이 동시에 진행되도록 함
+
+    이전 인덱싱 기록(매니페스트 항목)이 주어지면 페이지 이미지 해시가 같은 페이지는 기존 포인트를 유지하고,
+    더 이상 쓰이지 않는 포인트는 삭제
+    중단된 작업을 재개할 때는 체크포인트(resume_pages)에 기록된 페이지를 건너뛰고,
+    저장에 성공한 배치마다 checkpoint_callback으로 페이지 목록을 전달
+    """
+
+    def __init__(self, service, pdf_file_path: str, progress_callback: Optional[Callable] = None,
+                 previous_entry: Optional[Dict[str, Any]] = None, incremental: bool = False,
+                 cancel_event: Optional[threading.Event] = None,
+                 resume_pages: Optional[Dict[int, Dict[str, Any]]] = None,
+                 checkpoint_callback: Optional[Callable] = None):
+        self.service = service
+        self.pdf_file_path = pdf_file_path
+        self.pdf_name = os.path.basename(pdf_file_path)
+        self.progress_callback = progress_callback
+        self.batch_controller = service.batch_controller
+        self.embedding_cache = embedding_cache if settings.embedding_cache else None
+        self.model_id = service.model_manager.get_model_id()
+        self.index_id = service.get_index_id()
+        self.pool_factor = settings.token_pool_factor
+        # 요약 벡터가 없는 기존 컬렉션에는 멀티벡터만 저장
+        self.summary_vectors = settings.summary_vectors if service.db_manager.has_summary_vectors else 0
+
+        self.total_pages = get_page_count(pdf_file_path)
+        self.doc_id = document_registry.register(pdf_file_path)
+        self.document_key = index_manifest.get_key(pdf_file_path)
+
+        # 이전 인덱싱 기록 (incremental=True이면 변경되지 않은 페이지를 건너뜀)
+        self.previous_entry = previous_entry
+        self.previous_pages: Dict[int, Dict[str, Any]] = {
+            page_number: page for page_number, page in enumerate(previous_entry["pages"], start=1)
+        } if previous_entry else {}
+        self.incremental = incremental
+        self.cancel_event = cancel_event
+        # 페이지 번호 -> {"point_id", "image_hash"} (컬렉션에 포인트가 남아 있는 체크포인트만 사용)
+        self.resume_pages = self._verify_checkpoints(resume_pages or {})
+        self.checkpoint_callback = checkpoint_callback
+
+        queue_size = settings.pipeline_queue_size
+        self.stages = {
+            "render": PipelineStage("render", settings.render_workers),
+            "preprocess": PipelineStage("preprocess", settings.preprocess_workers, queue.Queue(maxsize=queue_size)),
+            # 임베딩 워커 프로세스를 사용하면 워커 수만큼 배치를 동시에 보냄
+            "embed": PipelineStage(
+                "embed", max(settings.embed_workers, settings.embedding_workers), queue.Queue(maxsize=queue_size)
+            ),
+            "upsert": PipelineStage("upsert", settings.upsert_workers, queue.Queue(maxsize=queue_size)),
+        }
+
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._error: Optional[Exception] = None
+        self._start_time = 0.0
+
+        self.page_texts: Dict[int, str] = {}
+        self.raw_page_texts: Dict[int, str] = {}  # 텍스트 레이어 원문 (거의 같은 페이지 판단용)
+        self.indexed_pages = 0
+        self.failed_pages: List[int] = []  # 저장에 실패한 페이지 번호 (매니페스트에 미완료로 기록)
+        self.completed_pages = 0
+        self.skipped_blank_pages = 0
+        self.cached_pages = 0
+        self.vector_count = 0  # 풀링 전 저장 대상 벡터 수
+        self.pooled_vector_count = 0  # 실제로 저장한 벡터 수
+        self.unchanged_pages = 0
+        self.resumed_pages = 0
+        self.page_point_ids: Dict[int, str] = {}  # 페이지 번호 -> 포인트 ID
+        self.page_image_hashes: Dict[int, str] = {}  # 페이지 번호 -> 페이지 이미지 해시
+        self._unchanged_point_ids: List[str] = []
+        self.page_hashes: List[Tuple[int, int]] = []  # (페이지 번호, perceptual hash)
+        self.content_hashes: Dict[str, int] = {}  # 페이지 이미지 해시 -> 처음 나온 페이지 번호
+        self.duplicate_pages: Dict[int, List[int]] = {}  # 원본 페이지 번호 -> 중복 페이지 번호 목록
+
+        # 표시용 이미지 사전 렌더링은 임베딩 경로와 분리하여 백그라운드 스레드에서 수행
+        self._image_saver = ThreadPoolExecutor(max_workers=1) if settings.save_page_images else None
+
+    def run(self) -> Dict[str, Any]:
+        """
+        파이프라인 실행
+
+        Returns:
+            Dict: 인덱싱 결과
+
+        Raises:
+            IndexingCancelledError: cancel_event로 취소된 경우
+            Exception: 단계 실행 중 발생한 첫 번째 오류
+        """
+        self._start_time = time.time()
+
+        # 텍스트 레이어는 수 ms 내에 추출되므로 인덱싱 시 함께 저장하여 질의 시 OCR을 생략
+        if settings.text_extraction == "auto" or ColPaliConfig.NEAR_DUPLICATE_PAGES:
+            self.raw_page_texts = dict(iter_page_texts(self.pdf_file_path))
+        if settings.text_extraction == "auto":
+            self.page_texts = {
+                page_number: text
+                for page_number, text in self.raw_page_texts.items()
+                if has_text_layer(text, ColPaliConfig.MIN_TEXT_LAYER_CHARS)
+            }
+
+        self._emit("started", f"PDF 로드 완료. {self.total_pages}페이지 인덱싱 시작...", 0)
+
+        threads = [threading.Thread(target=self._render_stage, name="indexing-render")]
+        for name, fn, next_name in [
+            ("preprocess", self._preprocess, "embed"),
+            ("embed", self._embed, "upsert"),
+            ("upsert", self._upsert, None),
+        ]:
+            stage = self.stages[name]
+            next_stage = self.stages[next_name] if next_name else None
+            for index in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, fn, next_stage),
+                    name=f"indexing-{name}-{index}"
+                ))
+
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if self._image_saver is not None:
+                self._image_saver.shutdown(wait=True)
+
+        if self._error is not None:
+            raise self._error
+
+        # 중복 페이지는 별도 포인트 없이 원본 페이지 포인트에서 참조
+        original_point_ids = set()
+        for original_page, pages in self.duplicate_pages.items():
+            if original_page in self.page_point_ids:
+                original_point_ids.add(self.page_point_ids[original_page])
+                self.service.qdrant_client.set_payload(
+                    collection_name=self.service.collection_name,
+                    payload={"duplicate_pages": pages},
+                    points=[self.page_point_ids[original_page]],
+                )
+        # 다시 저장하지 않은 포인트에 남아 있는, 더 이상 중복이 없는 duplicate_pages 정보 삭제
+        stale_duplicate_point_ids = [
+            point_id for point_id in self._unchanged_point_ids if point_id not in original_point_ids
+        ]
+        if stale_duplicate_point_ids:
+            self.service.qdrant_client.delete_payload(
+                collection_name=self.service.collection_name,
+                keys=["duplicate_pages"],
+                points=stale_duplicate_point_ids,
+            )
+        duplicate_count = sum(len(pages) for pages in self.duplicate_pages.values())
+
+        deleted_points = self._update_manifest()
+
+        if self.failed_pages:
+            self._emit(
+                "error",
+                f"페이지 {len(self.failed_pages)}개 저장 실패 (다음 인덱싱 때 다시 시도)",
+                self.total_pages
+            )
+        else:
+            self._emit(
+                "completed",
+                f"인덱싱 완료! 총 {self.indexed_pages}페이지 처리됨 "
+                f"(빈 페이지 {self.skipped_blank_pages}개, 중복 페이지 {duplicate_count}개 생략)",
+                self.total_pages
+            )
+
+        return {
+            "success": not self.failed_pages,
+            "message": f"페이지 {len(self.failed_pages)}개 저장 실패" if self.failed_pages else f"PDF 인덱싱 완료",
+            "total_pages": self.total_pages,
+            "indexed_pages": self.indexed_pages,
+            "failed_pages": sorted(self.failed_pages),
+            "skipped_blank_pages": self.skipped_blank_pages,
+            "duplicate_pages": duplicate_count,
+            "skipped_pages": self.skipped_blank_pages + duplicate_count,
+            "cached_pages": self.cached_pages,
+            "unchanged_pages": self.unchanged_pages,
+            "resumed_pages": self.resumed_pages,
+            "deleted_points": deleted_points,
+            "elapsed": round(time.time() - self._start_time, 2),
+            "pipeline": self.get_pipeline_stats(),
+            "batching": self.batch_controller.get_stats(),
+            "pooling": {
+                "pool_factor": self.pool_factor,
+                "vectors": self.vector_count,
+                "stored_vectors": self.pooled_vector_count,
+                "summary_vectors": self.summary_vectors
+            }
+        }
+
+    def _update_manifest(self) -> int:
+        """
+        매니페스트 항목을 갱신하고 더 이상 쓰이지 않는 이전 포인트 삭제
+
+        Returns:
+            int: 삭제한 포인트 수
+        """
+        client = self.service.qdrant_client
+        collection_name = self.service.collection_name
+
+        # 유지한 포인트는 PDF 내용 해시가 바뀌었을 수 있으므로 문서 ID 갱신
+        if self._unchanged_point_ids and self.previous_entry["doc_id"] != self.doc_id:
+            client.set_payload(
+                collection_name=collection_name,
+                payload={"doc_id": self.doc_id},
+                points=self._unchanged_point_ids,
+            )
+
+        stale_point_ids = []
+        if self.previous_entry:
+            current_point_ids = set(self.page_point_ids.values())
+            stale_point_ids = [
+                point_id for point_id in get_point_ids(self.previous_entry)
+                if point_id not in current_point_ids
+            ]
+        if stale_point_ids:
+            client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=stale_point_ids),
+            )
+
+        index_manifest.set_document(self.pdf_file_path, {
+            "doc_id": self.doc_id,
+            "pdf_name": self.pdf_name,
+            "pdf_path": self.pdf_file_path,
+            "page_count": self.total_pages,
+            "model_id": self.index_id,
+            "indexed_at": time.time(),
+            # 저장에 실패한 페이지가 있으면 다음 인덱싱 때 해당 페이지만 다시 시도
+            "incomplete": bool(self.failed_pages),
+            "pages": [
+                {
+                    "hash": self.page_image_hashes.get(page_number),
+                    "point_id": self.page_point_ids.get(page_number)
+                }
+                for page_number in range(1, self.total_pages + 1)
+            ]
+        })
+        return len(stale_point_ids)
+
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """단계별 처리량과 큐 적체량 반환"""
+        elapsed = time.time() - self._start_time
+        return {name: stage.get_stats(elapsed) for name, stage in self.stages.items()}
+
+    def _emit(self, status: str, message: str, current_page: int):
+        """진행 상황 콜백 호출 (파이프라인 통계 포함)"""
+        if not self.progress_callback:
+            return
+        self.progress_callback({
+            "status": status,
+            "message": message,
+            "current_page": current_page,
+            "total_pages": self.total_pages,
+            "percentage": int((current_page / self.total_pages) * 100) if self.total_pages else 100,
+            "pipeline": self.get_pipeline_stats()
+        })
+
+    def _fail(self, error: Exception):
+        """첫 번째 오류를 기록하고 모든 단계에 중단 요청"""
+        if isinstance(error, IndexingCancelledError):
+            logger.info(f"인덱싱 취소: {self.pdf_file_path}")
+        else:
+            logger.error(f"인덱싱 파이프라인 오류: {error}")
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._abort.set()
+
+    def _complete_pages(self, count: int) -> int:
+        """처리가 끝난 페이지 수 누적 후 현재 값 반환"""
+        with self._lock:
+            self.completed_pages += count
+            return self.completed_pages
+
+    def _render_stage(self):
+        """
+        render 단계: 모델 입력 해상도로 페이지를 렌더링하고 빈/중복 페이지를 걸러 배치 구성
+        이미 저장된 페이지(체크포인트, 변경되지 않은 페이지)는 기존 포인트를 유지하고,
+        임베딩 캐시에 있는 페이지는 preprocess/embed 단계를 건너뛰고 바로 upsert 단계로 전달
+        """
+        stage = self.stages["render"]
+        next_stage = self.stages["preprocess"]
+        page_images = None
+        try:
+            # 임베딩은 모델 입력 해상도로 렌더링하고, 표시용 고해상도 이미지는 요청 시 별도로 렌더링
+            page_images = iter_pdf_pages(
+                self.pdf_file_path,
+                workers=settings.render_workers,
+                target_size=get_embed_render_size(self.service.model_manager)
+            )
+            while not self._abort.is_set():
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    self._fail(IndexingCancelledError("인덱싱이 취소되었습니다"))
+                    break
+
+                start_time = time.perf_counter()
+                batch = list(itertools.islice(page_images, self.batch_controller.batch_size))
+                if not batch:
+                    break
+
+                embed_pages = self._filter_pages(batch)
+                if self.incremental or self.resume_pages:
+                    embed_pages = self._skip_indexed_pages(embed_pages)
+                skipped = len(batch) - len(embed_pages)
+                if skipped:
+                    self._complete_pages(skipped)
+
+                if self.embedding_cache is not None:
+                    embed_pages = self._send_cached_pages(embed_pages)
+                stage.record(len(batch), time.perf_counter() - start_time)
+
+                if self._image_saver is not None:
+                    for page_number, _ in batch:
+                        self._image_saver.submit(render_document_page, self.doc_id, page_number)
+
+                if embed_pages:
+                    next_stage.input_queue.put({
+                        "pages": [page["page_number"] for page in embed_pages],
+                        "point_ids": [self._assign_point_id(page["page_number"]) for page in embed_pages],
+                        "image_hashes": [page["image_hash"] for page in embed_pages],
+                        "images": [page["image"] for page in embed_pages]
+                    })
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if page_images is not None:
+                page_images.close()
+            stage.worker_finished()
+            for _ in range(next_stage.workers):
+                next_stage.input_queue.put(_STOP)
+
+    def _skip_indexed_pages(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        페이지 이미지가 같은 포인트가 이미 저장된 페이지는 기존 포인트를 그대로 사용
+        (중단된 작업의 체크포인트, 또는 incremental=True일 때 이전 인덱싱 기록)
+
+        Returns:
+            List[Dict]: 인덱싱해야 하는 페이지 목록
+        """
+        changed = []
+        for page in pages:
+            page_number = page["page_number"]
+            checkpoint = self.resume_pages.get(page_number)
+            previous = self.previous_pages.get(page_number) if self.incremental else None
+            if checkpoint and checkpoint.get("image_hash") == page["image_hash"]:
+                with self._lock:
+                    self.page_point_ids[page_number] = checkpoint["point_id"]
+                    self.resumed_pages += 1
+            elif previous and previous.get("point_id") is not None and previous.get("hash") == page["image_hash"]:
+                with self._lock:
+                    self.page_point_ids[page_number] = previous["point_id"]
+                    self.unchanged_pages += 1
+                self._unchanged_point_ids.append(previous["point_id"])
+            else:
+                changed.append(page)
+        return changed
+
+    def _send_cached_pages(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        임베딩 캐시에 있는 페이지를 upsert 단계로 바로 전달
+
+        Returns:
+            List[Dict]: 임베딩이 필요한 페이지 목록 (image_hash 추가)
+        """
+        cached = []
+        embed_pages = []
+        for page in pages:
+            embedding = self.embedding_cache.get(page["image_hash"], self.model_id)
+            if embedding is None:
+                embed_pages.append(page)
+            else:
+                cached.append((page, embedding))
+
+        if cached:
+            with self._lock:
+                self.cached_pages += len(cached)
+            self.stages["upsert"].input_queue.put({
+                "pages": [page["page_number"] for page, _ in cached],
+                "point_ids": [self._assign_point_id(page["page_number"]) for page, _ in cached],
+                "image_hashes": [page["image_hash"] for page, _ in cached],
+                "embeddings": [embedding for _, embedding in cached],
+                "cached": True
+            })
+        return embed_pages
+
+    def _run_worker(self, stage: PipelineStage, fn: Callable, next_stage: Optional[PipelineStage]):
+        """
+        단계 워커 루프
+        중단 요청 후에도 종료 신호까지 입력 큐를 비워서 앞 단계가 막히지 않도록 함
+        """
+        try:
+            while True:
+                item = stage.input_queue.get()
+                if item is _STOP:
+                    break
+                if self._abort.is_set():
+                    continue
+
+                start_time = time.perf_counter()
+                try:
+                    result = fn(item)
+                except Exception as e:
+                    self._fail(e)
+                    continue
+                stage.record(len(item["pages"]), time.perf_counter() - start_time)
+
+                if next_stage is not None and result is not None:
+                    next_stage.input_queue.put(result)
+        finally:
+            if stage.worker_finished() and next_stage is not None:
+                for _ in range(next_stage.workers):
+                    next_stage.input_queue.put(_STOP)
+
+    def _preprocess(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """preprocess 단계: 이미지를 모델 입력 텐서로 변환"""
+        item["inputs"] = self.service.colpali_processor.process_images(item.pop("images"))
+        return item
+
+    def _embed(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """embed 단계: 모델 추론"""
+        pages = item["pages"]
+        self._emit(
+            "processing",
+            f"페이지 {pages[0]}-{pages[-1]} 임베딩 생성 중...",
+            self.completed_pages
+        )
+
+        # 쿼리가 대기 중이면 쿼리를 먼저 실행하고, 처리량 측정에는 슬롯을 얻은 뒤의 시간만 사용
+        with self.service.model_manager.inference_slot("indexing"):
+            start_time = time.perf_counter()
+            item["embeddings"] = self._embed_inputs(item.pop("inputs"))
+            self.batch_controller.record(len(pages), time.perf_counter() - start_time)
+        return item
+
+    def _embed_inputs(self, inputs) -> List[np.ndarray]:
+        """
+        모델 추론 후 페이지별 임베딩 목록 반환
+        메모리 할당에 실패하면 배치를 절반으로 나누어 다시 시도
+        """
+        model = self.service.colpali_model
+        try:
+            with torch.no_grad():
+                image_embeddings = model(**inputs.to(model.device))
+            return list(image_embeddings.cpu().float().numpy())
+        except Exception as e:
+            batch_length = get_batch_length(inputs)
+            if not is_out_of_memory_error(e) or batch_length <= 1:
+                raise
+            self.batch_controller.record_oom(batch_length)
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        half = batch_length // 2
+        return (self._embed_inputs(slice_batch(inputs, 0, half))
+                + self._embed_inputs(slice_batch(inputs, half, batch_length)))
+
+    def _upsert(self, item: Dict[str, Any]) -> None:
+        """upsert 단계: 포인트 생성 후 Qdrant에 저장"""
+        pages = item["pages"]
+        self._emit(
+            "storing",
+            f"페이지 {pages[0]}-{pages[-1]} 벡터 저장 중...",
+            self.completed_pages
+        )
+
+        if self.embedding_cache is not None and not item.get("cached"):
+            for image_hash, embedding in zip(item["image_hashes"], item["embeddings"]):
+                try:
+                    self.embedding_cache.put(image_hash, self.model_id, embedding)
+                except OSError as e:
+                    logger.warning(f"임베딩 캐시 저장 실패: {e}")
+
+        vectors = []
+        payloads = []
+        vector_count = pooled_vector_count = 0
+        for page_number, embedding in zip(pages, item["embeddings"]):
+            # 임베딩 캐시에는 풀링 전 임베딩을 저장하고, Qdrant에는 풀링한 임베딩을 저장
+            page_vectors = pool_embeddings(embedding, self.pool_factor)
+            vector_count += len(embedding)
+            pooled_vector_count += len(page_vectors)
+            if self.summary_vectors:
+                # 2단계 검색용 요약 벡터는 저장하는 (풀링한) 임베딩으로 계산
+                vectors.append({
+                    ColPaliConfig.MULTIVECTOR_NAME: page_vectors,
+                    ColPaliConfig.SUMMARY_VECTOR_NAME: summarize_embedding(page_vectors, self.summary_vectors)
+                })
+            else:
+                vectors.append(page_vectors)
+            payloads.append({
+                "source": "pdf_image",
+                "page_number": page_number,
+                "pdf_name": self.pdf_name,
+                "pdf_path": self.pdf_file_path,
+                "doc_id": self.doc_id,
+                "page_text": self.page_texts.get(page_number, "")
+            })
+
+        # 체크포인트는 저장이 끝난 배치만 기록해야 하므로 작업으로 실행할 때는 저장 완료까지 대기
+        if upsert_vectors(self.service.qdrant_client, self.service.collection_name, item["point_ids"],
+                          vectors, payloads, use_grpc=self.service.db_manager.uses_grpc,
+                          wait=self.checkpoint_callback is not None):
+            with self._lock:
+                self.indexed_pages += len(pages)
+                self.vector_count += vector_count
+                self.pooled_vector_count += pooled_vector_count
+                for page_number, point_id in zip(pages, item["point_ids"]):
+                    self.page_point_ids[page_number] = point_id
+            if self.checkpoint_callback:
+                self.checkpoint_callback([
+                    {"page_number": page_number, "point_id": point_id, "image_hash": image_hash}
+                    for page_number, point_id, image_hash in zip(pages, item["point_ids"], item["image_hashes"])
+                ])
+            current_page = self._complete_pages(len(pages))
+            self._emit("progress", f"{current_page}/{self.total_pages} 페이지 완료", current_page)
+        else:
+            with self._lock:
+                self.failed_pages.extend(pages)
+            current_page = self._complete_pages(len(pages))
+            self._emit("error", f"페이지 {pages[0]}-{pages[-1]} 저장 중 오류", current_page)
+        return None
+
+    def _verify_checkpoints(self, resume_pages: Dict[int, Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        체크포인트 중 컬렉션에 포인트가 남아 있는 페이지만 반환
+        (메모리 DB 재시작이나 컬렉션 초기화로 사라진 포인트는 다시 인덱싱)
+        """
+        if not resume_pages:
+            return resume_pages
+        points = self.service.qdrant_client.retrieve(
+            collection_name=self.service.collection_name,
+            ids=[checkpoint["point_id"] for checkpoint in resume_pages.values()],
+            with_payload=False,
+            with_vectors=False
+        )
+        existing_ids = {str(point.id) for point in points}
+        verified = {
+            page_number: checkpoint for page_number, checkpoint in resume_pages.items()
+            if str(checkpoint["point_id"]) in existing_ids
+        }
+        if len(verified) < len(resume_pages):
+            logger.warning(
+                f"체크포인트 {len(resume_pages) - len(verified)}개의 포인트가 컬렉션에 없어 다시 인덱싱합니다: "
+                f"{self.pdf_file_path}"
+            )
+        return verified
+
+    def _assign_point_id(self, page_number: int) -> str:
+        """임베딩할 페이지의 포인트 ID 반환 (문서 키와 페이지 번호로 결정)"""
+        return get_point_id(self.document_key, page_number)
+
+    def _filter_pages(self, batch: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+        """임베딩 전에 빈 페이지와 중복 페이지를 걸러냄 (모든 페이지의 이미지 해시 기록)"""
+        embed_pages = []
+        for page_number, image in batch:
+            image_hash = image_content_hash(image)
+            self.page_image_hashes[page_number] = image_hash
+            if ColPaliConfig.SKIP_BLANK_PAGES and is_blank_image(image, ColPaliConfig.BLANK_PAGE_MAX_STDDEV):
+                self.skipped_blank_pages += 1
+                continue
+            if ColPaliConfig.DEDUPLICATE_PAGES:
+                original_page = self._find_duplicate_page(image, image_hash, page_number)
+                if original_page is not None:
+                    self.duplicate_pages.setdefault(original_page, []).append(page_number)
+                    continue
+            embed_pages.append({"page_number": page_number, "image": image, "image_hash": image_hash})
+        return embed_pages
+
+    def _find_duplicate_page(self, image, image_hash: str, page_number: int) -> Optional[int]:
+        """
+        앞서 처리한 페이지 중 같은 페이지 번호 반환 (없으면 현재 페이지 해시를 기록하고 None)
+        기본은 픽셀까지 같은 페이지(이미지 해시 일치)만 중복으로 판단하고,
+        NEAR_DUPLICATE_PAGES이면 perceptual hash가 가깝고 텍스트 레이어 원문이 같은 페이지도 중복으로 판단
+        (텍스트 레이어가 없는 페이지는 몇 글자만 달라도 해시가 가까울 수 있어 거의 같은 페이지로 보지 않음)
+        같은 문서 안에서만 찾음 (다른 문서의 같은 표지/고지 페이지는 각 문서에 따로 저장하며,
+        문서를 지우거나 다시 인덱싱해도 다른 문서가 참조하는 포인트가 사라지지 않도록 하기 위함.
+        픽셀까지 같은 페이지는 임베딩 캐시(이미지 해시 기준)에서 가져오므로 forward는 다시 하지 않음)
+        """
+        original_page = self.content_hashes.get(image_hash)
+        if original_page is not None:
+            return original_page
+        self.content_hashes[image_hash] = page_number
+
+        text = self.raw_page_texts.get(page_number, "").strip()
+        if not ColPaliConfig.NEAR_DUPLICATE_PAGES or not text:
+            return None
+        page_hash = perceptual_hash(image)
+        candidates = [
+            (seen_page, seen_hash) for seen_page, seen_hash in self.page_hashes
+            if self.raw_page_texts.get(seen_page, "").strip() == text
+        ]
+        original_page = find_duplicate(page_hash, candidates, ColPaliConfig.DUPLICATE_HASH_DISTANCE)
+        if original_page is None:
+            self.page_hashes.append((page_number, page_hash))
+        else:
+            # 이 페이지와 픽셀까지 같은 페이지도 저장된 원본 페이지를 참조하도록 기록
+            self.content_hashes[image_hash] = original_page
+        return original_page
@@ -0,0 +1,358 @@
+import os
+import glob
+import time
+import uuid
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from be.config import settings
+from be.utils.pdf import get_page_count, get_pdf_hash
+from be.utils.job_store import job_store
+from be.services.service_manager import service_manager
+
+logger = logging.getLogger(__name__)
+
+
+class JobNotFoundError(Exception):
+    """작업 ID를 찾을 수 없을 때 발생하는 예외"""
+    pass
+
+
+class IndexingJob:
+    """
+    일괄 인덱싱 작업
+    문서 단위 진행 상황을 모아 처리량(docs/sec, pages/sec)과 남은 시간을 계산
+    """
+
+    def __init__(self, pdf_paths: List[str], force: bool = False, data_dir: Optional[str] = None,
+                 progress_callback: Optional[Callable] = None, job_id: Optional[str] = None,
+                 created_at: Optional[float] = None, page_counts: Optional[Dict[str, int]] = None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.pdf_paths = pdf_paths
+        self.force = force
+        self.data_dir = data_dir
+        self.progress_callback = progress_callback
+        self.cancel_event = threading.Event()
+        self.finished_event = threading.Event()
+
+        self.status = "queued"
+        self.created_at = created_at or time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.page_counts: Dict[str, int] = page_counts or {}
+        for pdf_path in pdf_paths:
+            if pdf_path in self.page_counts:
+                continue
+            try:
+                self.page_counts[pdf_path] = get_page_count(pdf_path)
+            except Exception:
+                self.page_counts[pdf_path] = 0
+
+        self.results: Dict[str, Dict[str, Any]] = {}  # PDF 경로 -> 인덱싱 결과
+        self.removed: List[Dict[str, Any]] = []
+        self._current_pages: Dict[str, int] = {}  # 진행 중인 PDF 경로 -> 처리한 페이지 수
+        self._baseline_documents = 0  # 재시작 전에 끝난 문서 수 (처리량 계산에서 제외)
+        self._baseline_pages = 0
+        self._lock = threading.Lock()
+
+    def restore_results(self, results: Dict[str, Dict[str, Any]]):
+        """재시작 전에 끝난 문서 결과 복원"""
+        with self._lock:
+            self.results.update(results)
+            self._baseline_documents = len(self.results)
+            self._baseline_pages = sum(self.page_counts.get(pdf_path, 0) for pdf_path in self.results)
+
+    @property
+    def total_pages(self) -> int:
+        return sum(self.page_counts.values())
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def start_document(self, pdf_path: str) -> bool:
+        """
+        문서 처리 시작 기록
+
+        Returns:
+            bool: 작업의 첫 문서이면 True
+        """
+        with self._lock:
+            self._current_pages[pdf_path] = 0
+            if self.started_at is None:
+                self.started_at = time.time()
+                self.status = "running"
+                return True
+            return False
+
+    def update_document(self, pdf_path: str, data: Dict[str, Any]):
+        """문서 인덱싱 진행 상황 기록 (process_pdf 진행 콜백에서 호출)"""
+        with self._lock:
+            if pdf_path in self._current_pages and "current_page" in data:
+                self._current_pages[pdf_path] = data["current_page"]
+        if self.progress_callback:
+            self.progress_callback({**data, "job_id": self.job_id, "pdf_path": pdf_path})
+
+    def finish_document(self, pdf_path: str, result: Dict[str, Any]) -> bool:
+        """
+        문서 처리 결과 기록
+
+        Returns:
+            bool: 작업의 마지막 문서이면 True
+        """
+        with self._lock:
+            self._current_pages.pop(pdf_path, None)
+            self.results[pdf_path] = result
+            return len(self.results) == len(self.pdf_paths)
+
+    def finish(self):
+        """작업 종료 상태 기록"""
+        with self._lock:
+            self.finished_at = time.time()
+            if self.cancel_event.is_set():
+                self.status = "cancelled"
+            elif any(not result.get("success") for result in self.results.values()):
+                self.status = "failed"
+            else:
+                self.status = "completed"
+        self.finished_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        작업 종료 대기 (블로킹, 이벤트 루프에서는 스레드로 실행)
+
+        Returns:
+            bool: 시간 내에 작업이 끝나면 True
+        """
+        return self.finished_event.wait(timeout)
+
+    def get_status(self, with_results: bool = False) -> Dict[str, Any]:
+        """작업 상태와 처리량, 남은 시간 반환"""
+        with self._lock:
+            completed_documents = len(self.results)
+            failed_documents = sum(
+                1 for result in self.results.values()
+                if not result.get("success") and not result.get("cancelled")
+            )
+            completed_pages = sum(self.page_counts[pdf_path] for pdf_path in self.results)
+            processed_pages = completed_pages + sum(self._current_pages.values())
+
+            elapsed = 0.0
+            if self.started_at is not None:
+                elapsed = (self.finished_at or time.time()) - self.started_at
+            docs_per_sec = (completed_documents - self._baseline_documents) / elapsed if elapsed > 0 else 0.0
+            pages_per_sec = (processed_pages - self._baseline_pages) / elapsed if elapsed > 0 else 0.0
+            remaining_pages = max(self.total_pages - processed_pages, 0)
+
+            status = {
+                "job_id": self.job_id,
+                "status": self.status,
+                "data_dir": self.data_dir,
+                "force": self.force,
+                "total_documents": len(self.pdf_paths),
+                "completed_documents": completed_documents,
+                "failed_documents": failed_documents,
+                "running_documents": list(self._current_pages),
+                "total_pages": self.total_pages,
+                "processed_pages": processed_pages,
+                "percentage": int(processed_pages / self.total_pages * 100) if self.total_pages else 100,
+                "elapsed": round(elapsed, 2),
+                "docs_per_sec": round(docs_per_sec, 3),
+                "pages_per_sec": round(pages_per_sec, 2),
+                "eta_seconds": round(remaining_pages / pages_per_sec, 1) if pages_per_sec > 0 and not self.is_finished else None,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at
+            }
+            if with_results:
+                status["results"] = [
+                    {"pdf_path": pdf_path, **result} for pdf_path, result in self.results.items()
+                ]
+                status["removed"] = list(self.removed)
+            return status
+
+
+class IndexingJobManager:
+    """
+    일괄 인덱싱 작업 관리 (싱글톤)
+    모든 작업의 문서가 하나의 제한된 워커 풀을 공유하므로 동시에 실행되는 인덱싱 수가 제한됨
+    작업 상태와 배치별 체크포인트는 job_store에 기록되며, 재시작 시 resume_unfinished()로 이어서 진행
+    """
+
+    MAX_FINISHED_JOBS = 100  # 보관하는 종료된 작업 수
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="indexing-job")
+        self._jobs: "OrderedDict[str, IndexingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_paths: Optional[List[str]] = None, data_dir: Optional[str] = None,
+               force: bool = False, progress_callback: Optional[Callable] = None) -> IndexingJob:
+        """
+        인덱싱 작업 등록
+
+        Args:
+            pdf_paths: 인덱싱할 PDF 경로 목록
+            data_dir: 인덱싱할 폴더 (pdf_paths가 없을 때 사용, 폴더에서 사라진 문서는 작업 종료 시 삭제)
+            force: True이면 변경되지 않은 문서/페이지도 다시 인덱싱
+            progress_callback: 문서별 진행 상황 콜백
+
+        Raises:
+            ValueError: 인덱싱할 PDF가 없거나 폴더가 존재하지 않는 경우
+        """
+        if not pdf_paths:
+            if data_dir is None:
+                data_dir = settings.data_dir
+            if not os.path.isdir(data_dir):
+                raise ValueError(f"데이터 폴더가 존재하지 않습니다: {data_dir}")
+            pdf_paths = sorted(glob.glob(os.path.join(data_dir, "*.pdf")))
+        else:
+            data_dir = None
+
+        missing = [pdf_path for pdf_path in pdf_paths if not os.path.exists(pdf_path)]
+        if missing:
+            raise ValueError(f"PDF 파일이 존재하지 않습니다: {', '.join(missing)}")
+
+        job = IndexingJob(list(dict.fromkeys(pdf_paths)), force=force, data_dir=data_dir,
+                          progress_callback=progress_callback)
+        job_store.create_job(job.job_id, job.pdf_paths, job.page_counts, job.data_dir, job.force, job.created_at)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        if not job.pdf_paths:
+            self._finish_job(job)
+        for pdf_path in job.pdf_paths:
+            self._executor.submit(self._run_document, job, pdf_path)
+        logger.info(f"인덱싱 작업 등록: {job.job_id} (문서 {len(job.pdf_paths)}개)")
+        return job
+
+    def _run_document(self, job: IndexingJob, pdf_path: str):
+        """워커 스레드에서 문서 하나 인덱싱"""
+        if job.cancel_event.is_set():
+            result = {"success": False, "cancelled": True, "message": "인덱싱이 취소되었습니다"}
+        else:
+            if job.start_document(pdf_path):
+                job_store.update_job(job.job_id, status="running", started_at=job.started_at)
+            job_store.update_document(job.job_id, pdf_path, "running")
+            try:
+                # 중단된 작업이면 이전 실행에서 저장한 페이지부터 이어서 진행
+                doc_id = get_pdf_hash(pdf_path)
+                resume_pages = job_store.get_checkpoints(job.job_id, pdf_path, doc_id)
+                result = service_manager.rag_service.process_pdf(
+                    pdf_path,
+                    lambda data: job.update_document(pdf_path, data),
+                    force=job.force,
+                    cancel_event=job.cancel_event,
+                    resume_pages=resume_pages,
+                    checkpoint_callback=lambda pages: job_store.add_checkpoints(job.job_id, pdf_path, doc_id, pages)
+                )
+            except Exception as e:
+                logger.error(f"인덱싱 작업 오류: {pdf_path}: {e}")
+                result = {"success": False, "message": f"PDF 처리 중 오류: {str(e)}"}
+
+        if result.get("success"):
+            status = "done"
+        elif result.get("cancelled"):
+            status = "cancelled"
+        else:
+            status = "failed"
+        job_store.update_document(job.job_id, pdf_path, status, result)
+
+        if job.finish_document(pdf_path, result):
+            self._finish_job(job)
+
+    def _finish_job(self, job: IndexingJob):
+        """마지막 문서 처리 후 폴더에서 사라진 문서를 정리하고 작업 종료"""
+        if job.data_dir is not None and not job.cancel_event.is_set():
+            try:
+                job.removed = service_manager.rag_service.remove_missing_documents(job.data_dir)
+            except Exception as e:
+                logger.error(f"삭제된 문서 정리 중 오류: {e}")
+        job.finish()
+        job_store.update_job(job.job_id, status=job.status, finished_at=job.finished_at)
+        logger.info(f"인덱싱 작업 종료: {job.job_id} ({job.status})")
+
+    def resume_unfinished(self):
+        """
+        저장소에서 작업 기록을 불러오고, 끝나지 않은 작업은 마지막 체크포인트부터 다시 실행
+        서버 시작 시 한 번 호출
+        """
+        for record in job_store.load_jobs(self.MAX_FINISHED_JOBS):
+            documents = record["documents"]
+            job = IndexingJob(
+                [document["pdf_path"] for document in documents],
+                force=bool(record["force"]),
+                data_dir=record["data_dir"],
+                job_id=record["job_id"],
+                created_at=record["created_at"],
+                page_counts={document["pdf_path"]: document["page_count"] for document in documents}
+            )
+            job.restore_results({
+                document["pdf_path"]: document["result"]
+                for document in documents if document["result"] is not None
+            })
+            with self._lock:
+                self._jobs[job.job_id] = job
+
+            if record["status"] not in ("queued", "running"):
+                job.status = record["status"]
+                job.started_at = record["started_at"]
+                job.finished_at = record["finished_at"]
+                job.finished_event.set()
+                continue
+
+            if record["cancel_requested"]:
+                job.cancel_event.set()
+            pending = [document["pdf_path"] for document in documents if document["result"] is None]
+            logger.info(f"인덱싱 작업 재개: {job.job_id} (남은 문서 {len(pending)}개)")
+            if not pending:
+                self._finish_job(job)
+            for pdf_path in pending:
+                self._executor.submit(self._run_document, job, pdf_path)
+
+    def _prune(self):
+        """보관 한도를 넘은 오래된 종료 작업 삭제 (lock 보유 상태에서 호출)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(len(finished) - self.MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+            job_store.delete_job(job_id)
+
+    def get(self, job_id: str) -> IndexingJob:
+        """
+        작업 조회
+
+        Raises:
+            JobNotFoundError: 작업이 없는 경우
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"작업을 찾을 수 없습니다: {job_id}")
+        return job
+
+    def list_jobs(self) -> List[IndexingJob]:
+        """등록된 작업 목록 반환 (최신순)"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> IndexingJob:
+        """
+        작업 취소 (대기 중인 문서는 건너뛰고, 진행 중인 문서는 다음 배치에서 중단)
+
+        Raises:
+            JobNotFoundError: 작업이 없는 경우
+        """
+        job = self.get(job_id)
+        if not job.is_finished:
+            job.cancel_event.set()
+            job_store.update_job(job_id, cancel_requested=1)
+            logger.info(f"인덱싱 작업 취소 요청: {job_id}")
+        return job
+
+
+job_manager = IndexingJobManager(settings.indexing_job_workers)
@@ -0,0 +1,118 @@
+"""
+토큰 풀링 벤치마크
+풀링 배율별로 벡터 수/인덱스 크기, 쿼리 지연 시간, 풀링하지 않은 결과 대비 검색 품질을 비교
+
+사용 예:
+    python -m be.tools.benchmark_pooling --pdf ./data/manual.pdf --pages 50 \
+        --queries-file ./queries.txt --pool-factors 1 2 3 4
+    (--qdrant-url을 지정하면 해당 서버에 임시 컬렉션을 만들어 측정, 기본값은 메모리 모드)
+"""
+import json
+import time
+import argparse
+import logging
+
+from qdrant_client import QdrantClient
+
+from be.config import ColPaliConfig
+from be.core.database import QdrantManager
+from be.utils.pooling import pool_embeddings
+from be.utils.qdrant import get_search_params, build_points
+from be.tools.retrieval_benchmark import (
+    load_queries, embed_pages, embed_queries, measure_queries, compare_results
+)
+
+COLLECTION_PREFIX = "pooling-benchmark"
+
+
+def benchmark_pool_factor(client: QdrantClient, pool_factor: int, pages, query_embeddings,
+                          limit: int, runs: int):
+    """풀링 배율 하나에 대해 컬렉션을 만들어 인덱스 크기와 검색 결과/지연 시간 측정"""
+    collection_name = f"{COLLECTION_PREFIX}-{pool_factor}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name, vectors_config=QdrantManager.get_vectors_config())
+
+    try:
+        start_time = time.perf_counter()
+        pooled = [(point_id, page_number, pool_embeddings(embedding, pool_factor))
+                  for point_id, page_number, embedding in pages]
+        pooling_seconds = time.perf_counter() - start_time
+
+        points, _ = build_points(
+            [point_id for point_id, _, _ in pooled],
+            [vectors for _, _, vectors in pooled],
+            [{"page_number": page_number} for _, page_number, _ in pooled],
+        )
+        client.upsert(collection_name=collection_name, points=points, wait=True)
+
+        def search(query_embedding):
+            response = client.query_points(
+                collection_name=collection_name,
+                query=query_embedding,
+                limit=limit,
+                search_params=get_search_params(),
+            )
+            return [str(point.id) for point in response.points]
+
+        results, latency = measure_queries(search, query_embeddings, runs=runs)
+    finally:
+        client.delete_collection(collection_name)
+
+    vectors = sum(len(vectors) for _, _, vectors in pooled)
+    return results, {
+        "pool_factor": pool_factor,
+        "vectors": vectors,
+        "vectors_per_page": round(vectors / len(pooled), 1),
+        # 원본 벡터(float32)와 이진 양자화 벡터(1bit/차원) 크기
+        "vector_mb": round(vectors * ColPaliConfig.EMBEDDING_DIM * 4 / (1024 * 1024), 2),
+        "quantized_mb": round(vectors * ColPaliConfig.EMBEDDING_DIM / 8 / (1024 * 1024), 2),
+        "pooling_ms_per_page": round(pooling_seconds / len(pooled) * 1000, 2),
+        "query_latency": latency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="토큰 풀링 배율별 인덱스 크기, 쿼리 지연 시간, 검색 품질 비교")
+    parser.add_argument("--pdf", nargs="+", required=True, help="인덱싱할 PDF 파일")
+    parser.add_argument("--pages", type=int, help="PDF별 최대 페이지 수")
+    parser.add_argument("--queries", nargs="*", default=[], help="검색 쿼리")
+    parser.add_argument("--queries-file", help="검색 쿼리 파일 (한 줄에 하나)")
+    parser.add_argument("--pool-factors", nargs="+", type=int, default=[1, 2, 3, 4], help="비교할 풀링 배율")
+    parser.add_argument("--limit", type=int, default=ColPaliConfig.DEFAULT_SEARCH_LIMIT, help="검색 결과 수(k)")
+    parser.add_argument("--runs", type=int, default=3, help="쿼리별 지연 시간 측정 반복 횟수")
+    parser.add_argument("--qdrant-url", default=":memory:", help="측정에 사용할 Qdrant (기본값: 메모리 모드)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    queries = load_queries(args.queries, args.queries_file)
+    pages = embed_pages(args.pdf, max_pages=args.pages)
+    query_embeddings = embed_queries(queries)
+    client = QdrantClient(args.qdrant_url)
+
+    # 풀링하지 않은 결과를 기준으로 비교
+    pool_factors = [1] + [factor for factor in args.pool_factors if factor > 1]
+    baseline = None
+    reports = []
+    for pool_factor in pool_factors:
+        results, report = benchmark_pool_factor(
+            client, pool_factor, pages, query_embeddings, args.limit, args.runs
+        )
+        if baseline is None:
+            baseline = results
+            base_vectors = report["vectors"]
+        report["compression"] = round(base_vectors / report["vectors"], 2)
+        report.update(compare_results(results, baseline, args.limit))
+        reports.append(report)
+
+    print(json.dumps({
+        "pages": len(pages),
+        "queries": len(queries),
+        "qdrant_url": args.qdrant_url,
+        "results": reports
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
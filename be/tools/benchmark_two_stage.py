@@ -0,0 +1,143 @@
+"""
+2단계 검색 벤치마크
+요약 벡터 수와 후보 수(prefetch)별로 쿼리 지연 시간과 정확한 전체 MaxSim 결과 대비 검색 품질을 비교
+(prefetch_limit 0은 현재 방식인 전체 멀티벡터 검색: 이진 양자화 + rescore)
+
+사용 예:
+    python -m be.tools.benchmark_two_stage --pdf ./data/manual.pdf --pages 50 \
+        --queries-file ./queries.txt --summary-vectors 1 4 8 --prefetch-limits 20 50 100
+    (--qdrant-url을 지정하면 해당 서버에 임시 컬렉션을 만들어 측정, 기본값은 메모리 모드)
+"""
+import json
+import time
+import argparse
+import logging
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from be.config import ColPaliConfig, settings
+from be.core.database import QdrantManager
+from be.utils.pooling import pool_embeddings, summarize_embedding
+from be.utils.qdrant import get_query_kwargs, build_points
+from be.tools.retrieval_benchmark import (
+    load_queries, embed_pages, embed_queries, measure_queries, compare_results
+)
+
+COLLECTION_PREFIX = "two-stage-benchmark"
+
+# 기준 결과: 양자화 없이 모든 페이지의 전체 멀티벡터로 계산한 정확한 MaxSim
+EXACT_SEARCH_PARAMS = models.SearchParams(
+    exact=True,
+    quantization=models.QuantizationSearchParams(ignore=True)
+)
+
+
+def benchmark_summary_vectors(client: QdrantClient, summary_vectors: int, pages, query_embeddings,
+                              prefetch_limits, limit: int, runs: int, pool_factor: int = 1):
+    """
+    요약 벡터 수 하나에 대해 컬렉션을 만들어 후보 수별 검색 결과/지연 시간 측정
+
+    Returns:
+        List[Dict]: 후보 수별 보고서 (정확한 전체 MaxSim 결과 대비 recall, 1위 일치율 포함)
+    """
+    collection_name = f"{COLLECTION_PREFIX}-{summary_vectors}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name, vectors_config=QdrantManager.get_named_vectors_config())
+
+    try:
+        start_time = time.perf_counter()
+        vectors = []
+        for _, _, embedding in pages:
+            page_vectors = pool_embeddings(embedding, pool_factor)
+            vectors.append({
+                ColPaliConfig.MULTIVECTOR_NAME: page_vectors,
+                ColPaliConfig.SUMMARY_VECTOR_NAME: summarize_embedding(page_vectors, summary_vectors)
+            })
+        summary_seconds = time.perf_counter() - start_time
+
+        points, _ = build_points(
+            [point_id for point_id, _, _ in pages],
+            vectors,
+            [{"page_number": page_number} for _, page_number, _ in pages],
+        )
+        client.upsert(collection_name=collection_name, points=points, wait=True)
+
+        def exact_search(query_embedding):
+            response = client.query_points(
+                collection_name=collection_name,
+                query=query_embedding,
+                using=ColPaliConfig.MULTIVECTOR_NAME,
+                limit=limit,
+                search_params=EXACT_SEARCH_PARAMS,
+            )
+            return [str(point.id) for point in response.points]
+
+        baseline, baseline_latency = measure_queries(exact_search, query_embeddings, runs=runs)
+
+        reports = []
+        for prefetch_limit in prefetch_limits:
+            def search(query_embedding):
+                response = client.query_points(
+                    collection_name=collection_name,
+                    **get_query_kwargs(query_embedding, limit, prefetch_limit=prefetch_limit)
+                )
+                return [str(point.id) for point in response.points]
+
+            results, latency = measure_queries(search, query_embeddings, runs=runs)
+            reports.append({
+                "summary_vectors": summary_vectors,
+                "prefetch_limit": prefetch_limit,
+                "summary_ms_per_page": round(summary_seconds / len(pages) * 1000, 2),
+                "query_latency": latency,
+                "exact_latency": baseline_latency,
+                **compare_results(results, baseline, limit)
+            })
+    finally:
+        client.delete_collection(collection_name)
+
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="2단계 검색(요약 벡터 prefetch + MaxSim 재정렬)의 지연 시간과 검색 품질 비교")
+    parser.add_argument("--pdf", nargs="+", required=True, help="인덱싱할 PDF 파일")
+    parser.add_argument("--pages", type=int, help="PDF별 최대 페이지 수")
+    parser.add_argument("--queries", nargs="*", default=[], help="검색 쿼리")
+    parser.add_argument("--queries-file", help="검색 쿼리 파일 (한 줄에 하나)")
+    parser.add_argument("--summary-vectors", nargs="+", type=int, default=[1, settings.summary_vectors],
+                        help="비교할 페이지당 요약 벡터 수")
+    parser.add_argument("--prefetch-limits", nargs="+", type=int, default=[0, 20, 50, settings.prefetch_limit],
+                        help="비교할 1단계 후보 수 (0은 전체 멀티벡터 검색)")
+    parser.add_argument("--pool-factor", type=int, default=settings.token_pool_factor, help="토큰 풀링 배율")
+    parser.add_argument("--limit", type=int, default=ColPaliConfig.DEFAULT_SEARCH_LIMIT, help="검색 결과 수(k)")
+    parser.add_argument("--runs", type=int, default=3, help="쿼리별 지연 시간 측정 반복 횟수")
+    parser.add_argument("--qdrant-url", default=":memory:", help="측정에 사용할 Qdrant (기본값: 메모리 모드)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    queries = load_queries(args.queries, args.queries_file)
+    pages = embed_pages(args.pdf, max_pages=args.pages)
+    query_embeddings = embed_queries(queries)
+    client = QdrantClient(args.qdrant_url)
+
+    reports = []
+    for summary_vectors in sorted(set(max(1, count) for count in args.summary_vectors)):
+        reports.extend(benchmark_summary_vectors(
+            client, summary_vectors, pages, query_embeddings, sorted(set(args.prefetch_limits)),
+            args.limit, args.runs, pool_factor=args.pool_factor
+        ))
+
+    print(json.dumps({
+        "pages": len(pages),
+        "queries": len(queries),
+        "pool_factor": args.pool_factor,
+        "qdrant_url": args.qdrant_url,
+        "results": reports
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+추론 프로파일 보정 도구
+PDF 페이지로 추론 프로파일(bf16, fp32, int8, torch.compile)별 임베딩 오차와 속도를 측정
+
+사용 예:
+    python -m be.tools.calibrate_inference --pdf ./data/sample.pdf --pages 4 --compile
+"""
+import json
+import argparse
+import logging
+
+from be.config import ColPaliConfig
+from be.core.models import colpali_manager
+from be.utils.pdf import iter_pdf_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ColPali 추론 프로파일별 임베딩 오차와 속도 측정")
+    parser.add_argument("--pdf", required=True, help="측정에 사용할 PDF 파일")
+    parser.add_argument("--pages", type=int, default=4, help="측정에 사용할 페이지 수")
+    parser.add_argument("--profiles", nargs="+", default=list(ColPaliConfig.INFERENCE_PROFILES),
+                        choices=ColPaliConfig.INFERENCE_PROFILES, help="측정할 추론 프로파일")
+    parser.add_argument("--compile", action="store_true", help="torch.compile 적용 결과도 측정")
+    parser.add_argument("--runs", type=int, default=2, help="프로파일별 측정 반복 횟수")
+    parser.add_argument("--image-size", type=int, default=448, help="페이지 렌더링 크기(짧은 변, px)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    images = [
+        image for _, image in iter_pdf_pages(args.pdf, max_pages=args.pages, target_size=args.image_size)
+    ]
+    report = colpali_manager.calibrate_profiles(
+        images, profiles=args.profiles, compile_model=args.compile, runs=args.runs
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+ONNX 내보내기 도구
+ColPali 모델의 이미지/쿼리 경로를 ONNX 그래프로 내보내고, PyTorch(fp32) 임베딩과 정합성을 검사
+내보낸 그래프는 COLPALI_INFERENCE_BACKEND=onnx 설정 시 ColPaliModelManager가 사용
+
+사용 예:
+    python -m be.tools.export_onnx --output ./onnx
+    python -m be.tools.export_onnx --verify-only --pdf ./data/sample.pdf --pages 2
+"""
+import sys
+import json
+import argparse
+import logging
+
+from PIL import Image
+
+from be.config import ColPaliConfig, settings
+from be.core.models import colpali_manager
+from be.utils.pdf import iter_pdf_pages
+
+DEFAULT_QUERIES = [
+    "What is the maximum operating temperature?",
+    "설치 절차를 알려줘",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ColPali 모델 ONNX 내보내기 및 정합성 검사")
+    parser.add_argument("--output", default=settings.onnx_dir, help="ONNX 그래프 출력 폴더")
+    parser.add_argument("--opset", type=int, default=ColPaliConfig.ONNX_OPSET, help="ONNX opset 버전")
+    parser.add_argument("--verify", action="store_true", help="내보낸 뒤 PyTorch 임베딩과 정합성 검사")
+    parser.add_argument("--verify-only", action="store_true", help="내보내기 없이 정합성 검사만 실행")
+    parser.add_argument("--pdf", help="정합성 검사에 사용할 PDF 파일 (없으면 빈 페이지 사용)")
+    parser.add_argument("--pages", type=int, default=2, help="정합성 검사에 사용할 페이지 수")
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES, help="정합성 검사에 사용할 쿼리")
+    parser.add_argument("--image-size", type=int, default=448, help="페이지 렌더링 크기(짧은 변, px)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    report = {}
+    if not args.verify_only:
+        report["export"] = colpali_manager.export_onnx(args.output, opset=args.opset)
+
+    if args.verify or args.verify_only:
+        if args.pdf:
+            images = [
+                image for _, image in iter_pdf_pages(args.pdf, max_pages=args.pages, target_size=args.image_size)
+            ]
+        else:
+            images = [Image.new("RGB", (args.image_size, args.image_size), "white")] * args.pages
+        report["parity"] = colpali_manager.check_onnx_parity(images, args.queries, onnx_dir=args.output)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if "parity" in report and not report["parity"]["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
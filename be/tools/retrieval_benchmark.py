@@ -0,0 +1,112 @@
+"""
+검색 벤치마크 공통 함수
+PDF 페이지/쿼리 임베딩, 쿼리 지연 시간 측정, 기준 결과 대비 검색 품질 계산
+"""
+import time
+import math
+from typing import List, Dict, Any, Callable, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from be.core.models import colpali_manager
+from be.utils.pdf import iter_pdf_pages
+from be.utils.qdrant import get_point_id
+from be.services.indexing_pipeline import get_embed_render_size
+
+
+def load_queries(queries: Sequence[str], queries_file: str = None) -> List[str]:
+    """명령행 쿼리와 쿼리 파일(한 줄에 하나)을 합쳐 반환"""
+    result = list(queries or [])
+    if queries_file:
+        with open(queries_file, "r", encoding="utf-8") as f:
+            result += [line.strip() for line in f if line.strip()]
+    if not result:
+        raise ValueError("쿼리가 없습니다. --queries 또는 --queries-file을 지정하세요.")
+    return result
+
+
+def embed_pages(pdf_paths: Sequence[str], max_pages: int = None,
+                batch_size: int = 4) -> List[Tuple[str, int, np.ndarray]]:
+    """
+    PDF 페이지 임베딩
+
+    Returns:
+        List[Tuple]: (포인트 ID, 페이지 번호, (토큰 수, 차원) 임베딩) 목록
+    """
+    colpali_manager.initialize()
+    model = colpali_manager.get_model()
+    processor = colpali_manager.get_processor()
+    target_size = get_embed_render_size(colpali_manager)
+
+    pages = []
+    for pdf_path in pdf_paths:
+        rendered = list(iter_pdf_pages(pdf_path, max_pages=max_pages, target_size=target_size))
+        for start in range(0, len(rendered), batch_size):
+            batch = rendered[start:start + batch_size]
+            inputs = processor.process_images([image for _, image in batch])
+            with torch.no_grad():
+                embeddings = model(**inputs.to(model.device)).cpu().float().numpy()
+            for (page_number, _), embedding in zip(batch, embeddings):
+                pages.append((get_point_id(pdf_path, page_number), page_number, embedding))
+    return pages
+
+
+def embed_queries(queries: Sequence[str]) -> List[np.ndarray]:
+    """쿼리 임베딩 (쿼리마다 따로 처리하여 패딩 토큰이 없도록 함)"""
+    colpali_manager.initialize()
+    model = colpali_manager.get_model()
+    processor = colpali_manager.get_processor()
+
+    embeddings = []
+    for query in queries:
+        inputs = processor.process_queries([query])
+        with torch.no_grad():
+            embeddings.append(model(**inputs.to(model.device))[0].cpu().float().numpy())
+    return embeddings
+
+
+def measure_queries(search: Callable[[np.ndarray], List[str]], query_embeddings: Sequence[np.ndarray],
+                    runs: int = 3) -> Tuple[List[List[str]], Dict[str, float]]:
+    """
+    쿼리별 검색 결과와 지연 시간 측정 (쿼리마다 워밍업 1회 후 runs회 반복)
+
+    Args:
+        search: 쿼리 임베딩을 받아 결과 포인트 ID 목록을 반환하는 함수
+
+    Returns:
+        Tuple: (쿼리별 결과 ID 목록, {"avg_ms", "p95_ms"})
+    """
+    results = []
+    latencies = []
+    for embedding in query_embeddings:
+        results.append(search(embedding))
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            search(embedding)
+            latencies.append(time.perf_counter() - start_time)
+
+    latencies.sort()
+    return results, {
+        "avg_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        "p95_ms": round(latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000, 2)
+    }
+
+
+def compare_results(results: List[List[str]], baseline: List[List[str]], k: int) -> Dict[str, float]:
+    """
+    기준 결과 대비 검색 품질
+
+    Returns:
+        Dict: recall_at_k(기준 상위 k개 중 포함된 비율), top1_agreement(1위 일치 비율)
+    """
+    recalls = []
+    top1 = []
+    for result, expected in zip(results, baseline):
+        expected_top = set(expected[:k])
+        recalls.append(len(set(result[:k]) & expected_top) / len(expected_top) if expected_top else 1.0)
+        top1.append(bool(result) and bool(expected) and result[0] == expected[0])
+    return {
+        f"recall_at_{k}": round(sum(recalls) / len(recalls), 4),
+        "top1_agreement": round(sum(top1) / len(top1), 4)
+    }
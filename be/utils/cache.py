@@ -0,0 +1,314 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+import numpy as np
+
+from be.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DiskLRUCache:
+    """
+    디스크 용량 제한이 있는 LRU 파일 캐시
+    키는 캐시 루트 기준 상대 경로이며, 용량을 초과하면 가장 오래 사용되지 않은 파일부터 삭제
+    """
+
+    TEMP_SUFFIX = ".tmp"
+    TEMP_MAX_AGE = 3600  # 이 시간(초)보다 오래된 임시 파일만 중단된 것으로 보고 삭제
+
+    def __init__(self, root_dir: str, max_bytes: int):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> 파일 크기
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+
+    def _load_index(self):
+        """기존 캐시 파일을 스캔하여 수정 시각 순으로 LRU 인덱스 복원"""
+        if not os.path.exists(self.root_dir):
+            os.makedirs(self.root_dir)
+
+        files = []
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith(self.TEMP_SUFFIX):
+                    # 이전 실행에서 중단된 임시 파일 정리
+                    # (다른 프로세스가 작성 중인 파일을 지우지 않도록 오래된 파일만 삭제)
+                    try:
+                        if time.time() - os.path.getmtime(path) > self.TEMP_MAX_AGE:
+                            os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, os.path.relpath(path, self.root_dir), stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        logger.info(f"캐시 인덱스 로드 완료 ({self.root_dir}): {len(self._entries)}개, {self._total_bytes} bytes")
+        self._evict()
+
+    def path_for(self, key: str) -> str:
+        """키에 해당하는 캐시 파일 경로 반환"""
+        return os.path.join(self.root_dir, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시 조회
+
+        Returns:
+            Optional[str]: 캐시 파일 경로 (없으면 None)
+        """
+        path = self.path_for(key)
+        with self._lock:
+            if key in self._entries and os.path.exists(path):
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                if key in self._entries:
+                    self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+
+        try:
+            # 재시작 후에도 사용 순서가 유지되도록 수정 시각 갱신
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def temp_path(self, key: str) -> str:
+        """캐시에 기록할 파일을 작성할 임시 경로 반환 (commit()으로 확정)"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        root, ext = os.path.splitext(path)
+        return f"{root}.{os.getpid()}.{threading.get_ident()}{ext}{self.TEMP_SUFFIX}"
+
+    def commit(self, key: str, temp_path: str) -> str:
+        """
+        임시 파일을 캐시에 등록하고 용량 초과 시 오래된 항목 삭제
+
+        Returns:
+            str: 캐시 파일 경로
+        """
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        """용량 제한을 넘는 동안 가장 오래 사용되지 않은 항목 삭제 (lock 보유 상태에서 호출)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "root_dir": self.root_dir,
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class EmbeddingCache:
+    """
+    페이지 임베딩 디스크 캐시
+    페이지 이미지 픽셀 해시와 모델/프로세서 식별자를 키로 .npy 파일에 저장하고,
+    조회 시 memory-map으로 로드하여 필요한 부분만 읽음
+    """
+
+    def __init__(self, cache: DiskLRUCache):
+        self.cache = cache
+
+    @staticmethod
+    def get_key(image_hash: str, model_id: str) -> str:
+        """캐시 키 반환 (모델별 디렉터리 / 이미지 해시 앞 2자리 / 이미지 해시.npy)"""
+        model_key = hashlib.sha256(model_id.encode()).hexdigest()[:16]
+        return f"{model_key}/{image_hash[:2]}/{image_hash}.npy"
+
+    def get(self, image_hash: str, model_id: str) -> Optional[np.ndarray]:
+        """
+        캐시된 임베딩 조회
+
+        Returns:
+            Optional[np.ndarray]: (토큰 수, 차원) 임베딩 (없거나 손상된 경우 None)
+        """
+        path = self.cache.get(self.get_key(image_hash, model_id))
+        if path is None:
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"임베딩 캐시 파일 로드 실패: {path} ({e})")
+            return None
+
+    def put(self, image_hash: str, model_id: str, embedding: np.ndarray) -> str:
+        """
+        임베딩 저장
+
+        Returns:
+            str: 캐시 파일 경로
+        """
+        key = self.get_key(image_hash, model_id)
+        temp_path = self.cache.temp_path(key)
+        with open(temp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(embedding, dtype=np.float32))
+        return self.cache.commit(key, temp_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        return self.cache.get_stats()
+
+
+def normalize_query(query_text: str) -> str:
+    """
+    쿼리 정규화 (유니코드 NFKC, 앞뒤 공백 제거, 연속 공백을 하나로)
+    토크나이저가 대소문자를 구분하므로 대소문자는 유지
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query_text)).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    쿼리 임베딩 메모리 캐시 (LRU + TTL)
+    정규화한 쿼리와 모델 식별자를 키로 쿼리 멀티벡터를 보관하며, 전체 크기가 바이트 예산을 넘으면
+    가장 오래 사용되지 않은 항목부터 삭제. 적중 시 절약한 인코딩 시간을 함께 기록
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # (model_id, 정규화된 쿼리) -> (임베딩, 만료 시각, 인코딩 소요 시간)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    def get(self, query_text: str, model_id: str) -> Optional[np.ndarray]:
+        """
+        캐시된 쿼리 임베딩 조회 (만료된 항목은 삭제 후 None)
+
+        Args:
+            query_text: 정규화된 쿼리
+            model_id: 임베딩 모델 식별자
+        """
+        key = (model_id, query_text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[2]
+            return entry[0]
+
+    def put(self, query_text: str, model_id: str, embedding: np.ndarray, encode_seconds: float = 0.0):
+        """
+        쿼리 임베딩 저장 (바이트 예산보다 큰 임베딩은 저장하지 않음)
+
+        Args:
+            query_text: 정규화된 쿼리
+            model_id: 임베딩 모델 식별자
+            embedding: (토큰 수, 차원) 임베딩
+            encode_seconds: 인코딩 소요 시간 (적중 시 절약 시간으로 집계)
+        """
+        if embedding.nbytes > self.max_bytes:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        key = (model_id, query_text)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (embedding, time.monotonic() + self.ttl_seconds, encode_seconds)
+            self._total_bytes += embedding.nbytes
+            while self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]):
+        """항목 삭제 (lock 보유 상태에서 호출)"""
+        embedding, _, _ = self._entries.pop(key)
+        self._total_bytes -= embedding.nbytes
+
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "saved_encode_seconds": round(self.saved_seconds, 3)
+            }
+
+
+render_cache = DiskLRUCache(settings.output_dir, settings.render_cache_max_mb * 1024 * 1024)
+embedding_cache = EmbeddingCache(
+    DiskLRUCache(settings.embedding_cache_dir, settings.embedding_cache_max_mb * 1024 * 1024)
+)
+query_cache = QueryEmbeddingCache(settings.query_cache_max_mb * 1024 * 1024, settings.query_cache_ttl)
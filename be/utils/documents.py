@@ -0,0 +1,201 @@
+import os
+import glob
+import threading
+import time
+import logging
+from typing import Optional, Dict, Any, Union
+
+from be.config import ColPaliConfig, settings
+from be.utils.cache import render_cache
+from be.utils.pdf import (
+    DocumentPool, get_pdf_hash, get_cached_page_image, compare_image_formats, extract_page_text
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentNotFoundError(Exception):
+    """문서 ID 또는 페이지를 찾을 수 없을 때 발생하는 예외"""
+    pass
+
+
+class DocumentRegistry:
+    """
+    문서 ID(PDF 내용 해시)와 PDF 파일 경로의 매핑 관리
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._paths: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, pdf_path: str) -> str:
+        """
+        PDF 파일 등록 후 문서 ID 반환
+
+        Returns:
+            str: 문서 ID
+        """
+        doc_id = get_pdf_hash(pdf_path)
+        with self._lock:
+            self._paths[doc_id] = pdf_path
+        return doc_id
+
+    def scan(self):
+        """데이터 폴더의 모든 PDF 등록"""
+        for pdf_path in glob.glob(os.path.join(self.data_dir, "*.pdf")):
+            try:
+                self.register(pdf_path)
+            except OSError as e:
+                logger.error(f"문서 등록 실패: {pdf_path}: {e}")
+
+    def get_path(self, doc_id: str) -> Optional[str]:
+        """
+        문서 ID에 해당하는 PDF 경로 반환
+        등록되지 않았거나 파일이 바뀐 경우 데이터 폴더를 다시 스캔
+
+        Returns:
+            Optional[str]: PDF 경로 (없으면 None)
+        """
+        with self._lock:
+            pdf_path = self._paths.get(doc_id)
+        if pdf_path and os.path.exists(pdf_path) and get_pdf_hash(pdf_path) == doc_id:
+            return pdf_path
+
+        self.scan()
+        with self._lock:
+            return self._paths.get(doc_id)
+
+
+document_registry = DocumentRegistry(settings.data_dir)
+document_pool = DocumentPool(settings.document_pool_size)
+
+
+def render_document_page(doc_id: str, page_number: int, size: Union[str, int] = "display",
+                         profile: Optional[str] = None) -> str:
+    """
+    문서 페이지 이미지를 렌더 캐시에서 반환 (없으면 렌더링 후 캐시에 저장)
+
+    Args:
+        doc_id: 문서 ID
+        page_number: 페이지 번호 (1부터 시작)
+        size: "display", "thumbnail" 또는 픽셀 너비
+        profile: ColPaliConfig.IMAGE_PROFILES의 프로파일 이름 (None이면 크기에 맞는 기본값)
+
+    Returns:
+        str: 캐시된 이미지 경로
+
+    Raises:
+        DocumentNotFoundError: 문서나 페이지가 없는 경우
+        ValueError: 지원하지 않는 크기/프로파일인 경우
+    """
+    if profile is None:
+        profile = "thumbnail" if size == "thumbnail" else "display"
+    if profile not in ColPaliConfig.IMAGE_PROFILES:
+        raise ValueError(f"지원하지 않는 이미지 프로파일입니다: {profile}")
+    image_profile = ColPaliConfig.IMAGE_PROFILES[profile]
+
+    pdf_path = document_registry.get_path(doc_id)
+    if pdf_path is None:
+        raise DocumentNotFoundError(f"문서를 찾을 수 없습니다: {doc_id}")
+
+    with document_pool.open(pdf_path) as pdf_document:
+        page_count = pdf_document.page_count
+    if not 1 <= page_number <= page_count:
+        raise DocumentNotFoundError(f"페이지 번호가 범위를 벗어났습니다: {page_number} (총 {page_count}페이지)")
+
+    width = None
+    if size == "thumbnail":
+        width = ColPaliConfig.THUMBNAIL_WIDTH
+    elif size != "display":
+        width = int(size)
+        if not 0 < width <= ColPaliConfig.MAX_PAGE_IMAGE_WIDTH:
+            raise ValueError(f"지원하지 않는 이미지 크기입니다: {size}")
+
+    return get_cached_page_image(
+        render_cache,
+        pdf_path,
+        page_number,
+        dpi=ColPaliConfig.DISPLAY_DPI,
+        pdf_hash=doc_id,
+        width=width,
+        pool=document_pool,
+        fmt=image_profile["format"],
+        quality=image_profile.get("quality")
+    )
+
+
+def get_document_page_text(doc_id: str, page_number: int) -> str:
+    """
+    문서 페이지의 텍스트 레이어 반환 (열린 문서 풀 사용)
+
+    Raises:
+        DocumentNotFoundError: 문서나 페이지가 없는 경우
+    """
+    pdf_path = document_registry.get_path(doc_id)
+    if pdf_path is None:
+        raise DocumentNotFoundError(f"문서를 찾을 수 없습니다: {doc_id}")
+
+    with document_pool.open(pdf_path) as pdf_document:
+        if not 1 <= page_number <= pdf_document.page_count:
+            raise DocumentNotFoundError(f"페이지 번호가 범위를 벗어났습니다: {page_number}")
+        return extract_page_text(pdf_document[page_number - 1])
+
+
+def compare_document_page_formats(doc_id: str, page_number: int) -> Dict[str, Any]:
+    """
+    표시 해상도 페이지를 PNG와 각 이미지 프로파일로 인코딩하여 크기 비교
+
+    Raises:
+        DocumentNotFoundError: 문서가 없는 경우
+    """
+    pdf_path = document_registry.get_path(doc_id)
+    if pdf_path is None:
+        raise DocumentNotFoundError(f"문서를 찾을 수 없습니다: {doc_id}")
+    return compare_image_formats(
+        pdf_path,
+        page_number,
+        ColPaliConfig.IMAGE_PROFILES,
+        dpi=ColPaliConfig.DISPLAY_DPI,
+        pool=document_pool
+    )
+
+
+def render_thumbnail(pdf_path: str) -> str:
+    """
+    PDF 첫 페이지 썸네일을 렌더 캐시에서 반환 (없으면 썸네일 크기로 바로 렌더링)
+
+    Returns:
+        str: 캐시된 썸네일 경로
+    """
+    doc_id = document_registry.register(pdf_path)
+    return render_document_page(doc_id, 1, "thumbnail")
+
+
+def prewarm_thumbnails(data_dir: str = None) -> Dict[str, Any]:
+    """
+    데이터 폴더의 모든 PDF 썸네일을 미리 렌더링 (서버 시작 시 백그라운드에서 실행)
+
+    Returns:
+        Dict: 처리 결과 요약
+    """
+    if data_dir is None:
+        data_dir = settings.data_dir
+
+    start_time = time.time()
+    rendered, failed = 0, 0
+    for pdf_path in glob.glob(os.path.join(data_dir, "*.pdf")):
+        try:
+            render_thumbnail(pdf_path)
+            rendered += 1
+        except Exception as e:
+            failed += 1
+            logger.error(f"썸네일 사전 렌더링 실패: {pdf_path}: {e}")
+
+    elapsed = time.time() - start_time
+    logger.info(f"썸네일 사전 렌더링 완료: {rendered}개 성공, {failed}개 실패 ({elapsed:.2f}초)")
+    return {
+        "rendered": rendered,
+        "failed": failed,
+        "elapsed": elapsed
+    }
@@ -0,0 +1,64 @@
+import hashlib
+
+from PIL import Image, ImageStat
+
+
+def is_blank_image(image, max_stddev):
+    """
+    Detect near-blank pages.
+    A page is blank when its grayscale pixel values barely vary (white or uniformly filled pages).
+    Args:
+        image (PIL.Image.Image): Rendered page.
+        max_stddev (float): Largest grayscale standard deviation still considered blank.
+    """
+    return ImageStat.Stat(image.convert("L")).stddev[0] <= max_stddev
+
+
+def perceptual_hash(image, hash_size=16):
+    """
+    Compute a difference hash (dHash) of a page.
+    Visually identical pages map to hashes within a few bits of each other,
+    regardless of small rendering or compression differences.
+    Args:
+        image (PIL.Image.Image): Rendered page.
+        hash_size (int, optional): Hash grid size; the hash has hash_size ** 2 bits.
+    Returns:
+        int: The hash as an integer bit field.
+    """
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = gray.tobytes()
+    page_hash = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            page_hash = (page_hash << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return page_hash
+
+
+def find_duplicate(page_hash, seen_hashes, max_distance):
+    """
+    Return the key of the first previously seen hash within max_distance bits, or None.
+    Args:
+        page_hash (int): Hash of the current page.
+        seen_hashes (list[tuple[object, int]]): (key, hash) pairs of earlier pages.
+        max_distance (int): Largest Hamming distance still considered a duplicate.
+    """
+    for key, seen_hash in seen_hashes:
+        if (page_hash ^ seen_hash).bit_count() <= max_distance:
+            return key
+    return None
+
+
+def image_content_hash(image):
+    """
+    Compute an exact content hash of a page image.
+    Two images share a hash only when mode, size and every pixel match,
+    so the hash can key deterministic per-image results such as embeddings.
+    Args:
+        image (PIL.Image.Image): Rendered page.
+    Returns:
+        str: Hex-encoded SHA-256 digest.
+    """
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,180 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+from typing import Optional, Dict, Any, List
+
+from be.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """
+    인덱싱 작업 저장소 (SQLite)
+    작업/문서 상태와 배치별 체크포인트를 기록하여 서버 재시작 후에도 작업을 이어서 진행할 수 있도록 함
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            data_dir TEXT,
+            force INTEGER NOT NULL DEFAULT 0,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS job_documents (
+            job_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            pdf_path TEXT NOT NULL,
+            page_count INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            result TEXT,
+            PRIMARY KEY (job_id, pdf_path)
+        );
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            job_id TEXT NOT NULL,
+            pdf_path TEXT NOT NULL,
+            page_number INTEGER NOT NULL,
+            doc_id TEXT NOT NULL,
+            point_id TEXT NOT NULL,
+            image_hash TEXT NOT NULL,
+            PRIMARY KEY (job_id, pdf_path, page_number)
+        );
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def create_job(self, job_id: str, pdf_paths: List[str], page_counts: Dict[str, int],
+                   data_dir: Optional[str], force: bool, created_at: float):
+        """작업과 문서 목록 등록"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, data_dir, force, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, data_dir, int(force), created_at)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_documents (job_id, position, pdf_path, page_count, status) "
+                "VALUES (?, ?, ?, ?, 'pending')",
+                [
+                    (job_id, position, pdf_path, page_counts.get(pdf_path, 0))
+                    for position, pdf_path in enumerate(pdf_paths)
+                ]
+            )
+
+    def update_job(self, job_id: str, **fields):
+        """작업 필드 갱신 (status, started_at, finished_at, cancel_requested)"""
+        allowed = {"status", "started_at", "finished_at", "cancel_requested"}
+        columns = [column for column in fields if column in allowed]
+        if not columns:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE job_id = ?",
+                [fields[column] for column in columns] + [job_id]
+            )
+
+    def update_document(self, job_id: str, pdf_path: str, status: str,
+                        result: Optional[Dict[str, Any]] = None):
+        """
+        문서 상태 갱신
+        문서 처리가 끝나면(결과가 주어지면) 해당 문서의 체크포인트 삭제 (이후에는 매니페스트가 기록을 대신함)
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_documents SET status = ?, result = ? WHERE job_id = ? AND pdf_path = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, job_id, pdf_path)
+            )
+            if result is not None:
+                self._conn.execute(
+                    "DELETE FROM job_checkpoints WHERE job_id = ? AND pdf_path = ?",
+                    (job_id, pdf_path)
+                )
+
+    def add_checkpoints(self, job_id: str, pdf_path: str, doc_id: str, pages: List[Dict[str, Any]]):
+        """저장에 성공한 배치의 페이지 기록 (한 트랜잭션으로 커밋)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_checkpoints "
+                "(job_id, pdf_path, page_number, doc_id, point_id, image_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, pdf_path, page["page_number"], doc_id, str(page["point_id"]), page["image_hash"])
+                    for page in pages
+                ]
+            )
+
+    def get_checkpoints(self, job_id: str, pdf_path: str, doc_id: str) -> Dict[int, Dict[str, Any]]:
+        """
+        문서의 체크포인트 반환 (PDF 내용이 바뀐 경우 기록은 무시)
+
+        Returns:
+            Dict[int, Dict]: 페이지 번호 -> {"point_id", "image_hash"}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_number, point_id, image_hash FROM job_checkpoints "
+                "WHERE job_id = ? AND pdf_path = ? AND doc_id = ?",
+                (job_id, pdf_path, doc_id)
+            ).fetchall()
+        return {
+            row["page_number"]: {"point_id": row["point_id"], "image_hash": row["image_hash"]}
+            for row in rows
+        }
+
+    def load_jobs(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        최근 작업 목록과 작업별 문서 상태 반환 (오래된 순)
+
+        Args:
+            limit: 불러올 종료된 작업 수 (진행 중인 작업은 모두 포함)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') "
+                "UNION SELECT * FROM (SELECT * FROM jobs WHERE status NOT IN ('queued', 'running') "
+                "ORDER BY created_at DESC LIMIT ?) ORDER BY created_at",
+                (limit,)
+            ).fetchall()
+            jobs = []
+            for row in rows:
+                documents = self._conn.execute(
+                    "SELECT pdf_path, page_count, status, result FROM job_documents "
+                    "WHERE job_id = ? ORDER BY position",
+                    (row["job_id"],)
+                ).fetchall()
+                jobs.append({
+                    **dict(row),
+                    "documents": [
+                        {
+                            "pdf_path": document["pdf_path"],
+                            "page_count": document["page_count"],
+                            "status": document["status"],
+                            "result": json.loads(document["result"]) if document["result"] else None
+                        }
+                        for document in documents
+                    ]
+                })
+        return jobs
+
+    def delete_job(self, job_id: str):
+        """작업 기록 삭제"""
+        with self._lock, self._conn:
+            for table in ("job_checkpoints", "job_documents", "jobs"):
+                self._conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+
+job_store = JobStore(settings.job_store_path)
@@ -0,0 +1,118 @@
+import os
+import json
+import copy
+import threading
+import logging
+from typing import Optional, Dict, Any, List, Union
+
+from be.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IndexManifest:
+    """
+    인덱스 매니페스트
+    문서별 내용 해시, 페이지 수, 모델 식별자, 페이지별 이미지 해시와 포인트 ID를 JSON 파일에 기록하여
+    다시 인덱싱할 때 변경된 문서와 페이지만 처리하도록 함
+
+    문서 항목 형식:
+        {
+            "doc_id": PDF 내용 해시,
+            "pdf_name": 파일 이름,
+            "pdf_path": 인덱싱 시 사용한 경로,
+            "page_count": 페이지 수,
+            "model_id": 인덱스 식별자 (임베딩 모델 식별자, 토큰 풀링 시 풀링 배율 포함),
+            "indexed_at": 인덱싱 시각 (epoch),
+            "pages": [{"hash": 페이지 이미지 해시, "point_id": 포인트 ID (빈/중복 페이지는 None)}, ...]
+        }
+    포인트 ID는 문서 키와 페이지 번호로 결정되며(be.utils.qdrant.get_point_id), 이전 기록의 ID는 삭제 대상 판단에 사용
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def get_key(pdf_path: str) -> str:
+        """문서 키(절대 경로) 반환"""
+        return os.path.abspath(pdf_path)
+
+    def _load(self):
+        """매니페스트 파일 로드"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"매니페스트 로드 실패, 빈 매니페스트로 시작: {self.path} ({e})")
+            return
+
+        if data.get("version") != self.VERSION:
+            logger.warning(f"매니페스트 버전 불일치, 빈 매니페스트로 시작: {data.get('version')}")
+            return
+        self._documents = data.get("documents", {})
+        logger.info(f"매니페스트 로드 완료: 문서 {len(self._documents)}개")
+
+    def _save(self):
+        """매니페스트 파일 저장 (lock 보유 상태에서 호출, 임시 파일에 쓴 뒤 교체)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": self.VERSION,
+                "documents": self._documents
+            }, f, ensure_ascii=False)
+            # 교체 전에 디스크에 기록하여 중단되어도 빈/잘린 매니페스트가 남지 않도록 함
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def get_document(self, pdf_path: str) -> Optional[Dict[str, Any]]:
+        """문서 항목 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._documents.get(self.get_key(pdf_path))
+            return copy.deepcopy(entry) if entry is not None else None
+
+    def set_document(self, pdf_path: str, entry: Dict[str, Any]):
+        """문서 항목 저장"""
+        with self._lock:
+            self._documents[self.get_key(pdf_path)] = entry
+            self._save()
+
+    def remove_document(self, pdf_path: str) -> Optional[Dict[str, Any]]:
+        """문서 항목 삭제 후 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._documents.pop(self.get_key(pdf_path), None)
+            if entry is not None:
+                self._save()
+            return entry
+
+    def list_documents(self, data_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        문서 항목 목록 반환
+
+        Args:
+            data_dir: 지정하면 해당 폴더에 있는 문서만 반환 (하위 폴더 제외)
+        """
+        directory = os.path.abspath(data_dir) if data_dir else None
+        with self._lock:
+            return {
+                key: copy.deepcopy(entry)
+                for key, entry in self._documents.items()
+                if directory is None or os.path.dirname(key) == directory
+            }
+
+
+def get_point_ids(entry: Dict[str, Any]) -> List[Union[str, int]]:
+    """문서 항목에 기록된 포인트 ID 목록 반환"""
+    return [page["point_id"] for page in entry.get("pages", []) if page.get("point_id") is not None]
+
+
+index_manifest = IndexManifest(settings.manifest_path)
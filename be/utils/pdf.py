@@ -1,33 +1,533 @@
 import pymupdf
 import os
+import io
+import time
+import hashlib
+import multiprocessing
+import threading
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
 
 # Constants
 DPI = 350  # Can be modified as needed
+PAGES_PER_TASK = 8  # Pages handed to a worker at once in parallel mode
+IMAGE_FORMATS = ("png", "jpeg", "webp")
 
-def convert_pdf_to_images(pdf_path, output_dir, max_pages=None):
+_pdf_hash_memo = {}
+_pdf_hash_lock = threading.Lock()
+
+_encoding_stats = {}  # format -> {"images", "raw_bytes", "encoded_bytes"}
+_encoding_stats_lock = threading.Lock()
+
+_render_pool = None
+_render_pool_workers = 0
+_render_pool_lock = threading.Lock()
+
+
+def _render_pixmap(page, dpi=DPI, target_size=None, width=None):
+    """
+    Render a page to an RGB pixmap.
+    With target_size, the page is scaled so that its shorter side is target_size pixels
+    instead of using a fixed DPI. This matches model inputs that are resized to a fixed square.
+    With width, the page is scaled to exactly that many pixels wide.
+    """
+    if target_size:
+        zoom = target_size / min(page.rect.width, page.rect.height)
+        return page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    if width:
+        zoom = width / page.rect.width
+        return page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+    return page.get_pixmap(dpi=dpi, alpha=False)
+
+
+class DocumentPool:
+    """
+    Small LRU pool of open pymupdf documents for on-demand page renders.
+    pymupdf is not thread-safe, so every use of a pooled document holds the pool lock.
+    """
+
+    def __init__(self, max_open=8):
+        self.max_open = max_open
+        self._documents = OrderedDict()  # absolute path -> (mtime_ns, document)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def open(self, pdf_path):
+        """Yield an open document for pdf_path, reusing a pooled handle when possible."""
+        with self._lock:
+            yield self._get(pdf_path)
+
+    def _get(self, pdf_path):
+        key = os.path.abspath(pdf_path)
+        mtime = os.stat(pdf_path).st_mtime_ns
+        entry = self._documents.pop(key, None)
+        if entry is not None and entry[0] != mtime:
+            # The file changed on disk; drop the stale handle
+            entry[1].close()
+            entry = None
+        if entry is None:
+            entry = (mtime, pymupdf.open(pdf_path))
+        self._documents[key] = entry
+
+        while len(self._documents) > self.max_open:
+            _, (_, document) = self._documents.popitem(last=False)
+            document.close()
+        return entry[1]
+
+    def close_all(self):
+        """Close every pooled document."""
+        with self._lock:
+            for _, document in self._documents.values():
+                document.close()
+            self._documents.clear()
+
+
+def _render_page_range(pdf_path, page_files, dpi):
+    """
+    Render a contiguous range of pages in a worker process.
+    Each worker opens its own pymupdf document; handles are not shared across processes.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        page_files (list[tuple[int, str]]): Zero-based page numbers and their output file paths.
+        dpi (int): Render resolution.
+    """
+    pdf_document = pymupdf.open(pdf_path)
+    image_files = []
+    try:
+        for page_number, output_file in page_files:
+            page = pdf_document[page_number]
+            pix = page.get_pixmap(dpi=dpi)
+            pix.save(output_file, output="png")
+            image_files.append(output_file)
+    finally:
+        pdf_document.close()
+    return image_files
+
+
+def _render_page_buffers(pdf_path, page_numbers, dpi, target_size=None):
+    """
+    Render pages to raw RGB sample buffers in a worker process.
+    Returns (page_number, width, height, stride, samples) tuples; no image encoding happens.
+    """
+    pdf_document = pymupdf.open(pdf_path)
+    buffers = []
+    try:
+        for page_number in page_numbers:
+            pix = _render_pixmap(pdf_document[page_number], dpi, target_size)
+            buffers.append((page_number, pix.width, pix.height, pix.stride, pix.samples))
+    finally:
+        pdf_document.close()
+    return buffers
+
+
+def _buffer_to_image(width, height, stride, samples):
+    """Wrap a raw RGB sample buffer as a PIL image without copying it."""
+    return Image.frombuffer("RGB", (width, height), samples, "raw", "RGB", stride, 1)
+
+
+def _split_page_ranges(items, workers):
+    """
+    Split a list of pages into contiguous chunks.
+    Chunks are small enough that every worker gets several of them, which keeps
+    the load balanced when page complexity varies across the document.
+    """
+    chunk_size = max(1, min(PAGES_PER_TASK, -(-len(items) // (workers * 4))))
+    return [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+
+def get_render_pool(workers):
+    """
+    Return the shared render process pool, creating it on first use.
+    The pool lives for the whole process so worker start-up (a fresh interpreter
+    importing pymupdf) is paid once, not per document. It is recreated when a
+    caller needs more workers than it has, or after a worker died.
+    """
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is not None and _render_pool_workers < workers:
+            # Already submitted work still completes; new work goes to the larger pool
+            _render_pool.shutdown(wait=False)
+            _render_pool = None
+        if _render_pool is None:
+            # spawn: the API process holds torch/uvicorn threads, which are unsafe to fork
+            context = multiprocessing.get_context("spawn")
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _render_pool_workers = workers
+        return _render_pool
+
+
+def _discard_render_pool(pool):
+    """Drop a broken pool so the next get_render_pool() call starts a new one."""
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+            _render_pool_workers = 0
+    pool.shutdown(wait=False)
+
+
+def shutdown_render_pool():
+    """Stop the shared render pool's worker processes."""
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        pool, _render_pool, _render_pool_workers = _render_pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _render_page_files(pdf_path, page_files, dpi, workers):
+    """Render (page_number, output_file) pairs, in parallel when workers > 1."""
+    pool_workers = max(1, workers or 1)
+    workers = min(pool_workers, len(page_files))
+    if workers <= 1:
+        return _render_page_range(pdf_path, page_files, dpi)
+
+    page_ranges = _split_page_ranges(page_files, workers)
+    # Size the shared pool by the configured worker count, not this document's page count
+    pool = get_render_pool(pool_workers)
+    try:
+        # map() returns results in submission order, so page order stays deterministic
+        results = pool.map(
+            _render_page_range,
+            [pdf_path] * len(page_ranges),
+            page_ranges,
+            [dpi] * len(page_ranges),
+        )
+        return [image_file for chunk in results for image_file in chunk]
+    except BrokenProcessPool:
+        _discard_render_pool(pool)
+        raise
+
+
+def get_pdf_hash(pdf_path):
+    """
+    Return the SHA-256 of a PDF's content.
+    Results are memoized per (path, size, mtime) so repeated lookups do not re-read the file.
+    """
+    stat = os.stat(pdf_path)
+    memo_key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+    with _pdf_hash_lock:
+        if memo_key in _pdf_hash_memo:
+            return _pdf_hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    pdf_hash = digest.hexdigest()
+
+    with _pdf_hash_lock:
+        _pdf_hash_memo[memo_key] = pdf_hash
+    return pdf_hash
+
+
+def get_render_key(pdf_hash, page_number, dpi=DPI, fmt="png", width=None, quality=None):
+    """
+    Build the content-addressed cache key for a rendered page.
+    Args:
+        pdf_hash (str): Content hash of the PDF (see get_pdf_hash).
+        page_number (int): 1-based page number.
+        dpi (int, optional): Render resolution.
+        fmt (str, optional): Image format / file extension.
+        width (int, optional): Pixel width; takes precedence over dpi.
+        quality (int, optional): Encoder quality for lossy formats.
+    """
+    resolution = f"w{width}" if width else f"{dpi}dpi"
+    if quality and fmt != "png":
+        resolution += f"_q{quality}"
+    return os.path.join(pdf_hash[:2], pdf_hash, f"page_{page_number:04}_{resolution}.{fmt}")
+
+
+def convert_pdf_to_images(pdf_path, output_dir=None, max_pages=None, workers=1, cache=None, dpi=DPI):
     """
     Convert PDF pages to images.
     Args:
         pdf_path (str): Path to the PDF file.
-        output_dir (str): Directory to save images.
+        output_dir (str, optional): Directory to save images. Ignored when cache is given.
         max_pages (int, optional): Maximum number of pages to convert. None for all pages.
+        workers (int, optional): Number of render processes. 1 renders in the current process.
+        cache (DiskLRUCache, optional): Render cache. Pages already cached are not rendered again.
+        dpi (int, optional): Render resolution.
+    Returns:
+        list[str]: Image file paths in page order.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    pages_to_convert = get_page_count(pdf_path, max_pages)
 
-    pdf_document = pymupdf.open(pdf_path)
+    if cache is not None:
+        pdf_hash = get_pdf_hash(pdf_path)
+        keys = [get_render_key(pdf_hash, page_number + 1, dpi) for page_number in range(pages_to_convert)]
+        image_files = [cache.get(key) for key in keys]
+        page_files = [
+            (page_number, cache.temp_path(keys[page_number]))
+            for page_number, image_file in enumerate(image_files) if image_file is None
+        ]
+    else:
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        image_files = [
+            os.path.join(output_dir, f'page_{page_number + 1:02}.png')
+            for page_number in range(pages_to_convert)
+        ]
+        page_files = list(enumerate(image_files))
 
-    image_files = []
-    
-    total_pages = pdf_document.page_count
-    pages_to_convert = min(total_pages, max_pages) if max_pages else total_pages
+    if page_files:
+        _render_page_files(pdf_path, page_files, dpi, workers)
 
-    for page_number in range(pages_to_convert):
-        page = pdf_document[page_number]
-        pix = page.get_pixmap(dpi=DPI)
-        output_file = os.path.join(output_dir, f'page_{page_number + 1:02}.png')
-        pix.save(output_file)
-        image_files.append(output_file)
+    if cache is not None:
+        for page_number, temp_path in page_files:
+            image_files[page_number] = cache.commit(keys[page_number], temp_path)
 
-    pdf_document.close()
     return image_files
+
+
+def get_page_count(pdf_path, max_pages=None):
+    """
+    Return the number of pages that would be rendered for a PDF.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        max_pages (int, optional): Upper bound on the page count. None for all pages.
+    """
+    pdf_document = pymupdf.open(pdf_path)
+    total_pages = pdf_document.page_count
+    pdf_document.close()
+    return min(total_pages, max_pages) if max_pages else total_pages
+
+
+def extract_page_text(page):
+    """Return the text layer of a pymupdf page."""
+    return page.get_text("text").strip()
+
+
+def has_text_layer(text, min_chars):
+    """
+    Decide whether extracted page text is usable in place of OCR.
+    Scanned pages usually have no text at all; broken font encodings show up
+    as replacement characters, so those pages are rejected as well.
+    Args:
+        text (str): Extracted page text.
+        min_chars (int): Minimum number of letters/digits required.
+    """
+    alnum_chars = sum(ch.isalnum() for ch in text)
+    if alnum_chars < min_chars:
+        return False
+    return text.count('\ufffd') / max(len(text), 1) < 0.05
+
+
+def iter_page_texts(pdf_path, max_pages=None):
+    """
+    Extract the text layer of each page.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        max_pages (int, optional): Maximum number of pages. None for all pages.
+    Yields:
+        tuple[int, str]: 1-based page number and the page text, in page order.
+    """
+    pdf_document = pymupdf.open(pdf_path)
+    try:
+        pages_to_extract = min(pdf_document.page_count, max_pages) if max_pages else pdf_document.page_count
+        for page_number in range(pages_to_extract):
+            yield page_number + 1, extract_page_text(pdf_document[page_number])
+    finally:
+        pdf_document.close()
+
+
+def iter_pdf_pages(pdf_path, max_pages=None, dpi=DPI, workers=1, target_size=None):
+    """
+    Render PDF pages in memory and yield them one by one.
+    Pages never touch the disk; pixmap samples are wrapped directly as PIL images.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        max_pages (int, optional): Maximum number of pages to render. None for all pages.
+        dpi (int, optional): Render resolution.
+        workers (int, optional): Number of render processes. 1 renders in the current process.
+        target_size (int, optional): Render the shorter page side at this many pixels, overriding dpi.
+    Yields:
+        tuple[int, PIL.Image.Image]: 1-based page number and the rendered page, in page order.
+    """
+    pages_to_convert = get_page_count(pdf_path, max_pages)
+    pool_workers = max(1, workers or 1)
+    workers = min(pool_workers, pages_to_convert)
+
+    if workers <= 1:
+        pdf_document = pymupdf.open(pdf_path)
+        try:
+            for page_number in range(pages_to_convert):
+                pix = _render_pixmap(pdf_document[page_number], dpi, target_size)
+                yield page_number + 1, _buffer_to_image(pix.width, pix.height, pix.stride, pix.samples)
+        finally:
+            pdf_document.close()
+        return
+
+    page_ranges = deque(_split_page_ranges(list(range(pages_to_convert)), workers))
+    pool = get_render_pool(pool_workers)
+    # Keep only a bounded number of chunks in flight so a slow consumer
+    # (the embedding loop) does not let rendered pages pile up in memory.
+    pending = deque()
+    try:
+        while page_ranges or pending:
+            while page_ranges and len(pending) < workers * 2:
+                pending.append(pool.submit(
+                    _render_page_buffers, pdf_path, page_ranges.popleft(), dpi, target_size
+                ))
+            for page_number, width, height, stride, samples in pending.popleft().result():
+                yield page_number + 1, _buffer_to_image(width, height, stride, samples)
+    except BrokenProcessPool:
+        _discard_render_pool(pool)
+        raise
+    finally:
+        # The pool outlives this generator; drop chunks nobody will consume
+        for future in pending:
+            future.cancel()
+
+
+def _encode_image(image, fmt="png", quality=None):
+    """
+    Encode a PIL image.
+    Args:
+        image (PIL.Image.Image): Image to encode.
+        fmt (str, optional): One of IMAGE_FORMATS.
+        quality (int, optional): Encoder quality for jpeg/webp.
+    Returns:
+        bytes: Encoded image.
+    """
+    buffer = io.BytesIO()
+    if fmt == "png":
+        image.save(buffer, format="PNG")
+    elif fmt == "jpeg":
+        image.save(buffer, format="JPEG", quality=quality or 85, optimize=True)
+    elif fmt == "webp":
+        image.save(buffer, format="WEBP", quality=quality or 80, method=4)
+    else:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    return buffer.getvalue()
+
+
+def _record_encoding(fmt, image, encoded_bytes):
+    """Accumulate raw vs encoded sizes per format for get_encoding_stats()."""
+    raw_bytes = image.width * image.height * len(image.getbands())
+    with _encoding_stats_lock:
+        stats = _encoding_stats.setdefault(fmt, {"images": 0, "raw_bytes": 0, "encoded_bytes": 0})
+        stats["images"] += 1
+        stats["raw_bytes"] += raw_bytes
+        stats["encoded_bytes"] += encoded_bytes
+
+
+def get_encoding_stats():
+    """
+    Return per-format encoding totals for pages rendered in this process.
+    saved_bytes and compression_ratio are measured against uncompressed RGB pixels.
+    """
+    with _encoding_stats_lock:
+        report = {}
+        for fmt, stats in _encoding_stats.items():
+            report[fmt] = dict(
+                stats,
+                saved_bytes=stats["raw_bytes"] - stats["encoded_bytes"],
+                compression_ratio=round(stats["raw_bytes"] / stats["encoded_bytes"], 2) if stats["encoded_bytes"] else 0.0,
+            )
+        return report
+
+
+def _render_page(pdf_path, page_number, dpi=DPI, width=None, pool=None):
+    """Render a 1-based page to a PIL image, using a pooled document when given."""
+    if pool is not None:
+        with pool.open(pdf_path) as pdf_document:
+            pix = _render_pixmap(pdf_document[page_number - 1], dpi, width=width)
+            return _buffer_to_image(pix.width, pix.height, pix.stride, pix.samples)
+
+    pdf_document = pymupdf.open(pdf_path)
+    try:
+        pix = _render_pixmap(pdf_document[page_number - 1], dpi, width=width)
+        return _buffer_to_image(pix.width, pix.height, pix.stride, pix.samples)
+    finally:
+        pdf_document.close()
+
+
+def render_page_image(pdf_path, page_number, output_path, dpi=DPI, width=None, pool=None, fmt="png", quality=None):
+    """
+    Render a single page to an image file.
+    Encoding happens after the pooled document is released, so slow encoders
+    (webp) do not hold up other renders.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        page_number (int): 1-based page number.
+        output_path (str): Destination image path.
+        dpi (int, optional): Render resolution.
+        width (int, optional): Pixel width; takes precedence over dpi.
+        pool (DocumentPool, optional): Pool of open documents to render from.
+        fmt (str, optional): One of IMAGE_FORMATS.
+        quality (int, optional): Encoder quality for jpeg/webp.
+    Returns:
+        str: output_path
+    """
+    image = _render_page(pdf_path, page_number, dpi, width, pool)
+    data = _encode_image(image, fmt, quality)
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    _record_encoding(fmt, image, len(data))
+    return output_path
+
+
+def get_cached_page_image(cache, pdf_path, page_number, dpi=DPI, pdf_hash=None, width=None, pool=None,
+                          fmt="png", quality=None):
+    """
+    Return a rendered page from the render cache, rendering it on a miss.
+    Args:
+        cache (DiskLRUCache): Render cache.
+        pdf_path (str): Path to the PDF file.
+        page_number (int): 1-based page number.
+        dpi (int, optional): Render resolution.
+        pdf_hash (str, optional): Known content hash of the PDF, to skip hashing.
+        width (int, optional): Pixel width; takes precedence over dpi.
+        pool (DocumentPool, optional): Pool of open documents to render from.
+        fmt (str, optional): One of IMAGE_FORMATS.
+        quality (int, optional): Encoder quality for jpeg/webp.
+    Returns:
+        str: Cached image path.
+    """
+    key = get_render_key(pdf_hash or get_pdf_hash(pdf_path), page_number, dpi, fmt, width, quality)
+    image_path = cache.get(key)
+    if image_path is None:
+        temp_path = cache.temp_path(key)
+        render_page_image(pdf_path, page_number, temp_path, dpi, width, pool, fmt, quality)
+        image_path = cache.commit(key, temp_path)
+    return image_path
+
+
+def compare_image_formats(pdf_path, page_number, profiles, dpi=DPI, width=None, pool=None):
+    """
+    Encode one page losslessly and with each profile, and report the sizes.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        page_number (int): 1-based page number.
+        profiles (dict): Profile name -> {"format": ..., "quality": ...}.
+        dpi (int, optional): Render resolution.
+        width (int, optional): Pixel width; takes precedence over dpi.
+        pool (DocumentPool, optional): Pool of open documents to render from.
+    Returns:
+        dict: PNG baseline size and, per profile, encoded size, savings and encode time.
+    """
+    image = _render_page(pdf_path, page_number, dpi, width, pool)
+    png_bytes = len(_encode_image(image, "png"))
+
+    report = {
+        "width": image.width,
+        "height": image.height,
+        "png_bytes": png_bytes,
+        "profiles": {}
+    }
+    for name, profile in profiles.items():
+        start_time = time.perf_counter()
+        encoded_bytes = len(_encode_image(image, profile["format"], profile.get("quality")))
+        report["profiles"][name] = {
+            "format": profile["format"],
+            "quality": profile.get("quality"),
+            "bytes": encoded_bytes,
+            "saved_bytes": png_bytes - encoded_bytes,
+            "ratio_vs_png": round(png_bytes / encoded_bytes, 2) if encoded_bytes else 0.0,
+            "encode_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        }
+    return report
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy.cluster.hierarchy import linkage, fcluster
+from scipy.spatial.distance import squareform
+
+
+def _cluster_means(vectors: np.ndarray, n_clusters: int) -> np.ndarray:
+    """코사인 거리로 벡터를 계층적 군집화(ward)하여 군집별 평균 벡터를 정규화하여 반환"""
+    distances = np.clip(1.0 - vectors @ vectors.T, 0.0, None)
+    np.fill_diagonal(distances, 0.0)
+    clusters = linkage(squareform(distances, checks=False), method="ward")
+    labels = fcluster(clusters, t=n_clusters, criterion="maxclust")
+
+    pooled = np.stack([vectors[labels == label].mean(axis=0) for label in np.unique(labels)])
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.maximum(norms, 1e-12)
+
+
+def pool_embeddings(embedding: np.ndarray, pool_factor: int) -> np.ndarray:
+    """
+    페이지 멀티벡터 토큰 풀링
+    코사인 거리로 패치 임베딩을 계층적 군집화(ward)하여 토큰 수를 약 1/pool_factor로 줄이고,
+    군집별 평균 벡터를 다시 정규화하여 반환 (패딩 토큰처럼 norm이 0인 벡터는 제외)
+
+    Args:
+        embedding: (토큰 수, 차원) 페이지 임베딩
+        pool_factor: 풀링 배율 (1 이하이면 풀링하지 않음)
+
+    Returns:
+        np.ndarray: (군집 수, 차원) float32 임베딩
+    """
+    if pool_factor <= 1:
+        return embedding
+
+    vectors = np.asarray(embedding, dtype=np.float32)
+    vectors = vectors[np.linalg.norm(vectors, axis=1) > 0]
+    n_clusters = max(1, len(vectors) // pool_factor)
+    if len(vectors) <= n_clusters or len(vectors) < 2:
+        return vectors
+    return _cluster_means(vectors, n_clusters)
+
+
+def summarize_embedding(embedding: np.ndarray, n_vectors: int) -> np.ndarray:
+    """
+    2단계 검색의 후보 검색용 페이지 요약 벡터
+    n_vectors가 1이면 정규화한 평균 벡터, 2 이상이면 토큰 임베딩의 군집 중심 n_vectors개
+
+    Args:
+        embedding: (토큰 수, 차원) 페이지 임베딩 (풀링한 임베딩도 가능)
+        n_vectors: 요약 벡터 수
+
+    Returns:
+        np.ndarray: (요약 벡터 수, 차원) float32 임베딩
+    """
+    vectors = np.asarray(embedding, dtype=np.float32)
+    vectors = vectors[np.linalg.norm(vectors, axis=1) > 0]
+    if len(vectors) == 0:
+        return np.zeros((1, embedding.shape[-1]), dtype=np.float32)
+    if n_vectors <= 1:
+        mean = vectors.mean(axis=0, keepdims=True)
+        return mean / max(float(np.linalg.norm(mean)), 1e-12)
+    if len(vectors) <= n_vectors:
+        return vectors
+    return _cluster_means(vectors, n_vectors)
@@ -1,9 +1,257 @@
-def upsert_to_qdrant(points, qdrant_client, collection_name):
+import json
+import time
+import uuid
+import threading
+from collections import deque
+
+import numpy as np
+from qdrant_client import grpc
+from qdrant_client.http import models
+from qdrant_client.conversions.conversion import RestToGrpc
+
+from be.config import ColPaliConfig
+
+# 포인트 ID 생성용 UUID 네임스페이스
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "colpali-documents")
+
+
+def get_point_id(document_key, page_number):
+    """
+    문서 식별자와 페이지 번호로 결정적인 포인트 ID(UUIDv5) 생성
+    같은 문서의 같은 페이지는 항상 같은 ID를 가지므로 여러 문서가 컬렉션을 공유할 수 있고,
+    업서트를 다시 실행해도 기존 포인트를 덮어씀
+    
+    Args:
+        document_key: 문서 식별자 (매니페스트 키, PDF 절대 경로)
+        page_number: 페이지 번호 (1부터 시작)
+        
+    Returns:
+        str: 포인트 ID
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{document_key}#page={page_number}"))
+
+
+def get_search_params():
+    """
+    멀티벡터 검색 파라미터 반환
+    이진 양자화 벡터로 후보를 찾고(oversampling), 원본 벡터로 다시 점수를 계산(rescore)
+    """
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            ignore=False,
+            rescore=True,
+            oversampling=2.0,
+        )
+    )
+
+
+def get_query_kwargs(query_vector, limit, prefetch_limit=0, summary_vectors=True):
+    """
+    멀티벡터 검색의 query_points 인자 반환
+    요약 벡터가 있는 컬렉션이면 요약 벡터(HNSW)로 후보 prefetch_limit개를 먼저 찾고(prefetch),
+    후보만 전체 멀티벡터 MaxSim으로 다시 정렬
+
+    Args:
+        query_vector: (쿼리 토큰 수, 차원) 쿼리 멀티벡터
+        limit: 결과 개수
+        prefetch_limit: 1단계 후보 수 (0이면 전체 멀티벡터로 바로 검색)
+        summary_vectors: 컬렉션에 요약 벡터가 있는지 여부 (없으면 이름 없는 멀티벡터로 검색)
+
+    Returns:
+        Dict: query_points 키워드 인자 (query, using, prefetch, limit, search_params)
+    """
+    kwargs = {"query": query_vector, "limit": limit, "search_params": get_search_params()}
+    if not summary_vectors:
+        return kwargs
+
+    kwargs["using"] = ColPaliConfig.MULTIVECTOR_NAME
+    if prefetch_limit > 0:
+        kwargs["prefetch"] = models.Prefetch(
+            query=np.asarray(query_vector, dtype=np.float32).tolist(),
+            using=ColPaliConfig.SUMMARY_VECTOR_NAME,
+            limit=max(prefetch_limit, limit),
+        )
+    return kwargs
+
+
+class VectorTransportStats:
+    """
+    벡터 업서트 전송 통계
+    배치별 포인트 생성 시간, 요청 시간, 전송 크기와 JSON(REST) 대비 절약한 크기를 기록
+    전송 크기는 gRPC이면 직렬화한 protobuf 크기(측정값), REST이면 JSON 크기 추정값이며,
+    JSON 크기는 첫 행의 숫자당 글자 수로 추정한 값
+    요청 시간은 wait=False이면 서버가 요청을 받기까지의 시간 (저장 완료 시간이 아님)
+    """
+
+    HISTORY_SIZE = 50  # 통계로 보관하는 최근 배치 수
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.points = 0
+        self.vectors = 0
+        self.build_seconds = 0.0
+        self.request_seconds = 0.0
+        self.payload_bytes = 0
+        self.json_bytes = 0
+        self.history: deque = deque(maxlen=self.HISTORY_SIZE)
+
+    def record(self, transport, points, vectors, build_seconds, request_seconds, payload_bytes, json_bytes,
+               wait=False):
+        """배치 하나의 전송 결과 기록"""
+        with self._lock:
+            self.batches += 1
+            self.points += points
+            self.vectors += vectors
+            self.build_seconds += build_seconds
+            self.request_seconds += request_seconds
+            self.payload_bytes += payload_bytes
+            self.json_bytes += json_bytes
+            self.history.append({
+                "transport": transport,
+                "wait": wait,
+                "points": points,
+                "vectors": vectors,
+                "build_ms": round(build_seconds * 1000, 2),
+                "request_ms": round(request_seconds * 1000, 2),
+                "payload_kb": round(payload_bytes / 1024, 1),
+                "estimated_saved_kb": round((json_bytes - payload_bytes) / 1024, 1)
+            })
+
+    def get_stats(self):
+        """전송 통계 반환"""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "points": self.points,
+                "vectors": self.vectors,
+                "avg_build_ms": round(self.build_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "avg_request_ms": round(self.request_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+                "payload_mb": round(self.payload_bytes / (1024 * 1024), 2),
+                "estimated_json_mb": round(self.json_bytes / (1024 * 1024), 2),
+                "estimated_saved_mb": round((self.json_bytes - self.payload_bytes) / (1024 * 1024), 2),
+                "history": list(self.history)
+            }
+
+
+vector_transport_stats = VectorTransportStats()
+
+
+def _estimate_json_bytes(arrays):
+    """벡터를 JSON으로 보낼 때의 크기 추정 (첫 행의 숫자당 글자 수 기준)"""
+    sample = arrays[0][0] if arrays[0].ndim == 2 else arrays[0]
+    chars_per_value = len(json.dumps(sample.tolist())) / max(sample.size, 1)
+    return int(sum(array.size for array in arrays) * chars_per_value)
+
+
+def _varint(value):
+    """protobuf varint 인코딩"""
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _to_grpc_vector(array):
+    """
+    float32 배열을 gRPC Vector로 변환
+    DenseVector/MultiDenseVector의 wire format 바이트를 numpy로 만든 뒤 파싱하므로
+    벡터 값마다 Python float 객체를 만들지 않음
+    """
+    rows = np.ascontiguousarray(array, dtype="<f4")
+    if rows.ndim == 1:
+        data = rows.tobytes()
+        return grpc.Vector(dense=grpc.DenseVector.FromString(b"\x0a" + _varint(len(data)) + data))
+
+    # MultiDenseVector: 행마다 field 1(DenseVector) = [tag, 길이, field 1(data) tag, 길이, float32 바이트]
+    count, dim = rows.shape
+    dense_prefix = b"\x0a" + _varint(dim * 4)
+    prefix = b"\x0a" + _varint(len(dense_prefix) + dim * 4) + dense_prefix
+    message = np.empty((count, len(prefix) + dim * 4), dtype=np.uint8)
+    message[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    message[:, len(prefix):] = rows.view(np.uint8).reshape(count, dim * 4)
+    return grpc.Vector(multi_dense=grpc.MultiDenseVector.FromString(message.tobytes()))
+
+
+def build_points(point_ids, vectors, payloads, use_grpc=False):
+    """
+    numpy 임베딩으로 업서트할 포인트 생성
+    gRPC이면 numpy 바이트로 protobuf 포인트를 직접 만들어 float 목록 변환 없이 전송하고,
+    REST이면 JSON으로 보내야 하므로 float 목록으로 변환하되 pydantic 검증은 생략
+
+    Args:
+        point_ids: 포인트 ID 목록
+        vectors: 포인트별 벡터 (numpy 배열, 2차원이면 멀티벡터) 또는 {벡터 이름: numpy 배열}
+        payloads: 포인트별 페이로드
+        use_grpc: 클라이언트가 gRPC를 사용하는지 여부
+
+    Returns:
+        Tuple: (포인트 목록, 전송 정보 {"transport", "vectors", "build_seconds", "payload_bytes", "json_bytes"})
+    """
+    start_time = time.perf_counter()
+    points = []
+    arrays = []
+    for point_id, vector, payload in zip(point_ids, vectors, payloads):
+        named = vector if isinstance(vector, dict) else {None: vector}
+        named = {name: np.asarray(array, dtype=np.float32) for name, array in named.items()}
+        arrays.extend(named.values())
+        if use_grpc:
+            if None in named:
+                grpc_vectors = grpc.Vectors(vector=_to_grpc_vector(named[None]))
+            else:
+                grpc_vectors = grpc.Vectors(vectors=grpc.NamedVectors(
+                    vectors={name: _to_grpc_vector(array) for name, array in named.items()}
+                ))
+            points.append(grpc.PointStruct(
+                id=RestToGrpc.convert_extended_point_id(point_id),
+                vectors=grpc_vectors,
+                payload=RestToGrpc.convert_payload(payload),
+            ))
+        else:
+            rest_vector = named[None].tolist() if None in named else {
+                name: array.tolist() for name, array in named.items()
+            }
+            points.append(models.PointStruct.model_construct(id=point_id, vector=rest_vector, payload=payload))
+    build_seconds = time.perf_counter() - start_time
+
+    json_bytes = _estimate_json_bytes(arrays) if arrays else 0
+    return points, {
+        "transport": "grpc" if use_grpc else "rest",
+        "vectors": sum(len(array) if array.ndim == 2 else 1 for array in arrays),
+        "build_seconds": build_seconds,
+        # gRPC는 직렬화 크기를 측정하고, REST는 JSON 크기 추정값 사용
+        "payload_bytes": sum(point.ByteSize() for point in points) if use_grpc else json_bytes,
+        "json_bytes": json_bytes
+    }
+
+
+def upsert_vectors(qdrant_client, collection_name, point_ids, vectors, payloads, use_grpc=False, wait=False):
+    """
+    numpy 임베딩을 포인트로 변환하여 업서트하고 전송 통계 기록
+
+    Returns:
+        bool: 업서트 성공 여부
+    """
+    points, transport = build_points(point_ids, vectors, payloads, use_grpc=use_grpc)
+    start_time = time.perf_counter()
+    if not upsert_to_qdrant(points, qdrant_client, collection_name, wait=wait):
+        return False
+    vector_transport_stats.record(
+        transport["transport"], len(points), transport["vectors"], transport["build_seconds"],
+        time.perf_counter() - start_time, transport["payload_bytes"], transport["json_bytes"], wait=wait
+    )
+    return True
+
+
+def upsert_to_qdrant(points, qdrant_client, collection_name, wait=False):
     """
     Qdrant 벡터 데이터베이스에 데이터를 업서트(삽입 또는 업데이트)하는 함수
     
     Args:
-        batch: 업서트할 데이터 배치
+        points: 업서트할 포인트 목록
+        wait: 저장 완료까지 대기할지 여부
         
     Returns:
         bool: 업서트 성공 여부
@@ -12,7 +260,7 @@ def upsert_to_qdrant(points, qdrant_client, collection_name):
         qdrant_client.upsert(
             collection_name=collection_name,  # 데이터를 저장할 컬렉션 이름
             points=points,                    # 업서트할 데이터 포인트
-            wait=False,                       # 비동기 처리를 위해 응답 대기하지 않음
+            wait=wait,                        # 기본은 비동기 처리 (True이면 저장 완료까지 대기)
         )
     except Exception as e:
         print(f"Error during upsert: {e}")    # 오류 발생 시 출력
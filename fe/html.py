@@ -368,7 +368,7 @@ HTML_TEMPLATE = """
                                 page: item.page_number,
                                 pdf: item.pdf_name,
                                 score: item.score,
-                                image: item.image_path
+                                image: item.image_url
                             }));
                             addMessage('assistant', `참고 문서 ${result.search_results.length}개:`, references);
                         }
@@ -378,7 +378,7 @@ HTML_TEMPLATE = """
                             page: item.page_number,
                             pdf: item.pdf_name,
                             score: item.score,
-                            image: item.image_path
+                            image: item.image_url
                         }));
                         addMessage('assistant', `다음 ${result.search_results.length}개의 관련 문서를 찾았습니다:`, references);
                     } else {
@@ -436,7 +436,7 @@ HTML_TEMPLATE = """
                                 <div class="flex items-start space-x-3">
                                     <div class="flex-shrink-0">
                                         ${ref.image ? 
-                                            `<img src="/images/${ref.image}" alt="페이지 ${ref.page}" class="reference-preview w-16 h-20 rounded border object-cover">` :
+                                            `<img src="${ref.image}" alt="페이지 ${ref.page}" class="reference-preview w-16 h-20 rounded border object-cover">` :
                                             `<div class="w-16 h-20 bg-gray-200 rounded border flex items-center justify-center">
                                                 <i class="fas fa-file-alt text-gray-400"></i>
                                              </div>`
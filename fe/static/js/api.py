@@ -38,6 +38,27 @@ def get_api_functions():
             }
         }
         
+        /**
+         * 여러 PDF 미리보기 일괄 조회
+         */
+        async function fetchPdfPreviews(pdfPaths) {
+            try {
+                const response = await fetch('/pdf-previews', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({ 
+                        pdf_paths: pdfPaths
+                    })
+                });
+                return await response.json();
+            } catch (error) {
+                console.error('PDF 미리보기 일괄 조회 실패:', error);
+                return { success: false, message: error.message };
+            }
+        }
+        
         /**
          * PDF 인덱싱
          */
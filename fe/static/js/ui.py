@@ -63,20 +63,23 @@ def get_ui_functions():
                 return;
             }
             
-            for (const pdf of pdfFiles) {
+            // 모든 PDF 미리보기를 한 번에 조회
+            const previewsResult = await fetchPdfPreviews(pdfFiles.map(pdf => pdf.path));
+            const previews = previewsResult.success ? previewsResult.previews : [];
+            
+            for (const [index, pdf] of pdfFiles.entries()) {
                 const pdfPath = pdf.path;
                 const pdfName = pdf.name;
                 const pdfSize = pdf.size_mb;
                 const isIndexed = indexedPdfs.has(pdfPath);
                 
-                // PDF 미리보기 조회
-                const previewResult = await fetchPdfPreview(pdfPath);
+                const previewResult = previews[index] || { success: false };
                 
                 // 미리보기 이미지 HTML
                 let previewImageHtml = '';
-                if (previewResult.success && previewResult.image_name) {
+                if (previewResult.success && previewResult.image_url) {
                     previewImageHtml = `
-                        <img src="/images/${previewResult.image_name}" 
+                        <img src="${previewResult.image_url}" 
                              alt="${pdfName} 미리보기" 
                              class="w-full h-40 object-cover object-top bg-white rounded mb-2 border"
                              style="image-rendering: -webkit-optimize-contrast; image-rendering: crisp-edges;"
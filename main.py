@@ -2,40 +2,20 @@ import os
 # tokenizers 경고 메시지 제거
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
-from be.config import api_config
-from be.api.frontend import router as frontend_router
-from be.api.pdf import router as pdf_router
-from be.api.rag import router as rag_router
-from be.api.system import router as system_router
+# 앱은 be.app에서 생성
+# spawn으로 시작한 렌더링/임베딩 워커 프로세스는 이 파일을 __mp_main__으로 다시 실행하므로,
+# 모델/캐시/작업 저장소를 import하지 않도록 모듈 최상위에서는 앱을 만들지 않음
 
-app = FastAPI(title="ColPali RAG API", version="1.0.0")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def __getattr__(name):
+    """`uvicorn main:app` 실행을 위해 app을 처음 접근할 때 import"""
+    if name == "app":
+        from be.app import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# 디렉토리 생성
-if not os.path.exists(api_config.STATIC_DIR):
-    os.makedirs(api_config.STATIC_DIR)
-
-if not os.path.exists(api_config.TEMP_IMAGE_DIR):
-    os.makedirs(api_config.TEMP_IMAGE_DIR)
-
-app.mount("/static", StaticFiles(directory=api_config.STATIC_DIR), name="static")
-app.mount("/images", StaticFiles(directory=api_config.TEMP_IMAGE_DIR), name="images")
-
-app.include_router(frontend_router)
-app.include_router(pdf_router)
-app.include_router(rag_router)
-app.include_router(system_router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    from be.app import app
+    uvicorn.run(app, host="0.0.0.0", port=8000)
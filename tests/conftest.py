@@ -0,0 +1,5 @@
+import os
+import sys
+
+# pytest를 저장소 루트 밖에서 실행해도 be 패키지를 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,93 @@
+"""임베딩 배치 크기 자동 조정(AdaptiveBatchController) 테스트"""
+import pytest
+
+from be.services.batching import AdaptiveBatchController
+
+
+def make_controller(monkeypatch, memory_usage: float = 0.1, **kwargs) -> AdaptiveBatchController:
+    controller = AdaptiveBatchController(**kwargs)
+    monkeypatch.setattr(controller, "get_memory_usage", lambda: memory_usage)
+    return controller
+
+
+def test_initial_size_is_clamped(monkeypatch):
+    assert make_controller(monkeypatch, initial_size=64, max_size=16).batch_size == 16
+    assert make_controller(monkeypatch, initial_size=0, min_size=2).batch_size == 2
+
+
+def test_probe_doubles_until_throughput_stops_improving(monkeypatch):
+    controller = make_controller(monkeypatch, initial_size=2, max_size=32)
+
+    controller.record(2, 10.0)  # 워밍업 배치는 측정에서 제외
+    assert controller.batch_size == 2
+    controller.record(2, 1.0)  # 2 pages/sec
+    assert controller.batch_size == 4
+    controller.record(4, 1.0)  # 4 pages/sec
+    assert controller.batch_size == 8
+    controller.record(8, 2.0)  # 4 pages/sec: 향상 없음, 가장 좋았던 크기로 고정
+    assert controller.batch_size == 4
+
+    stats = controller.get_stats()
+    assert stats["probing"] is False
+    assert stats["best_size"] == 4
+
+    # 고정된 뒤에는 처리량이 늘어도 크기를 바꾸지 않음
+    controller.record(4, 0.1)
+    assert controller.batch_size == 4
+
+
+def test_probe_stops_at_max_size(monkeypatch):
+    controller = make_controller(monkeypatch, initial_size=4, max_size=8)
+
+    controller.record(4, 1.0)
+    controller.record(4, 1.0)
+    controller.record(8, 1.0)
+
+    assert controller.batch_size == 8
+    assert controller.get_stats()["probing"] is False
+
+
+def test_memory_ceiling_halves_max_size(monkeypatch):
+    controller = make_controller(monkeypatch, memory_usage=0.95, initial_size=8, max_size=32,
+                                 memory_ceiling=0.85)
+
+    controller.record(8, 1.0)
+
+    assert controller.batch_size == 4
+    stats = controller.get_stats()
+    assert stats["max_size"] == 4
+    assert stats["probing"] is False
+
+
+def test_out_of_memory_halves_max_size(monkeypatch):
+    controller = make_controller(monkeypatch, initial_size=16, max_size=32)
+
+    controller.record_oom(16)
+    assert controller.batch_size == 8
+    controller.record_oom(8)
+    controller.record_oom(4)
+    controller.record_oom(2)
+    controller.record_oom(1)
+
+    # 최소 크기 아래로는 줄이지 않음
+    assert controller.batch_size == 1
+    assert controller.oom_count == 5
+
+
+def test_fixed_size_when_not_adaptive(monkeypatch):
+    controller = make_controller(monkeypatch, initial_size=4, max_size=32, adaptive=False)
+
+    for _ in range(5):
+        controller.record(4, 1.0)
+
+    assert controller.batch_size == 4
+    assert len(controller.history) == 0
+
+
+@pytest.mark.parametrize("elapsed", [0.0, -1.0])
+def test_non_positive_elapsed_is_ignored(monkeypatch, elapsed):
+    controller = make_controller(monkeypatch, initial_size=2, max_size=32)
+
+    controller.record(2, elapsed)
+
+    assert len(controller.history) == 0
@@ -0,0 +1,54 @@
+"""
+ONNX 백엔드와 PyTorch(fp32) 임베딩 정합성 테스트
+onnxruntime, 내보낸 ONNX 그래프(COLPALI_ONNX_DIR), 로컬에 받아 둔 모델 가중치가 모두 있어야 실행되며 없으면 건너뜀
+"""
+import os
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("torch")
+pytest.importorskip("colpali_engine")
+huggingface_hub = pytest.importorskip("huggingface_hub")
+
+from PIL import Image, ImageDraw
+
+from be.config import ColPaliConfig, settings
+from be.core.onnx_backend import IMAGE_ENCODER, QUERY_ENCODER, METADATA_FILE
+
+QUERIES = ["식품 품목제조보고 절차", "multimodal chain-of-thought reasoning"]
+
+
+def make_page_image(title: str) -> Image.Image:
+    """텍스트와 도형이 있는 페이지 이미지 생성"""
+    image = Image.new("RGB", (448, 448), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text((24, 24), title, fill="black")
+    draw.rectangle((24, 80, 424, 200), outline="black", width=3)
+    for row in range(6):
+        draw.line((24, 240 + row * 30, 424, 240 + row * 30), fill="gray", width=2)
+    return image
+
+
+def require_local_weights(repo_id: str):
+    """모델 가중치가 로컬 캐시에 없으면 건너뜀 (테스트 중 다운로드하지 않음)"""
+    try:
+        huggingface_hub.snapshot_download(repo_id, local_files_only=True)
+    except Exception:
+        pytest.skip(f"모델 가중치가 로컬에 없습니다: {repo_id}")
+
+
+def test_onnx_embeddings_match_torch():
+    if not os.path.exists(os.path.join(settings.onnx_dir, METADATA_FILE)):
+        pytest.skip(f"내보낸 ONNX 그래프가 없습니다: {settings.onnx_dir}")
+    require_local_weights(ColPaliConfig.MODEL_NAME)
+    require_local_weights(ColPaliConfig.PROCESSOR_NAME)
+
+    from be.core.models import ColPaliModelManager
+
+    images = [make_page_image("ColPali ONNX parity"), make_page_image("인덱싱 정합성 검사")]
+    report = ColPaliModelManager().check_onnx_parity(images, QUERIES)
+
+    for name in (IMAGE_ENCODER, QUERY_ENCODER):
+        assert report[name]["min_cosine"] >= ColPaliConfig.ONNX_PARITY_MIN_COSINE, report[name]
+    assert report["passed"]
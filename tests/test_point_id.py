@@ -0,0 +1,27 @@
+"""포인트 ID(get_point_id) 안정성 테스트"""
+import uuid
+
+from be.utils.qdrant import get_point_id
+
+
+def test_point_id_is_stable_across_versions():
+    # 값이 바뀌면 기존 컬렉션의 포인트를 찾지 못하고 중복 포인트가 생기므로 고정값으로 확인
+    assert get_point_id("/data/manual.pdf", 1) == "0ea587b1-7a2e-55dd-aaf3-7958568cf9c7"
+    assert get_point_id("abc", 3) == "cb33829f-9a4a-56a9-b03c-949a01dbd98d"
+
+
+def test_point_id_is_deterministic_uuid5():
+    point_id = get_point_id("/data/manual.pdf", 7)
+
+    assert point_id == get_point_id("/data/manual.pdf", 7)
+    assert uuid.UUID(point_id).version == 5
+
+
+def test_point_id_differs_by_document_and_page():
+    point_ids = {
+        get_point_id(document_key, page_number)
+        for document_key in ("/data/a.pdf", "/data/b.pdf")
+        for page_number in range(1, 11)
+    }
+
+    assert len(point_ids) == 20
@@ -0,0 +1,104 @@
+"""쿼리 임베딩 캐시(QueryEmbeddingCache) TTL/LRU 삭제 테스트"""
+import types
+
+import numpy as np
+import pytest
+
+import be.utils.cache as cache_module
+from be.utils.cache import QueryEmbeddingCache
+
+MODEL_ID = "vidore/colpali-v1.3|bf16"
+
+
+class FakeClock:
+    """time.monotonic 대체용 수동 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def make_embedding(value: float, tokens: int = 4) -> np.ndarray:
+    return np.full((tokens, 128), value, dtype=np.float32)
+
+
+def test_get_returns_stored_embedding_read_only(clock):
+    cache = QueryEmbeddingCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    cache.put("매뉴얼 요약", MODEL_ID, make_embedding(0.5), encode_seconds=0.2)
+
+    embedding = cache.get("매뉴얼 요약", MODEL_ID)
+
+    np.testing.assert_array_equal(embedding, make_embedding(0.5))
+    assert not embedding.flags.writeable
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["saved_encode_seconds"] == pytest.approx(0.2)
+
+
+def test_entries_are_separated_by_model_id(clock):
+    cache = QueryEmbeddingCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    cache.put("query", MODEL_ID, make_embedding(1.0))
+
+    assert cache.get("query", "other-model|fp32") is None
+    assert cache.get("query", MODEL_ID) is not None
+
+
+def test_expired_entry_is_removed(clock):
+    cache = QueryEmbeddingCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    cache.put("query", MODEL_ID, make_embedding(1.0))
+
+    clock.now += 59
+    assert cache.get("query", MODEL_ID) is not None
+
+    clock.now += 2
+    assert cache.get("query", MODEL_ID) is None
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 0
+    assert stats["total_bytes"] == 0
+
+
+def test_put_refreshes_ttl(clock):
+    cache = QueryEmbeddingCache(max_bytes=1024 * 1024, ttl_seconds=60)
+    cache.put("query", MODEL_ID, make_embedding(1.0))
+    clock.now += 50
+    cache.put("query", MODEL_ID, make_embedding(2.0))
+    clock.now += 50
+
+    np.testing.assert_array_equal(cache.get("query", MODEL_ID), make_embedding(2.0))
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entry_bytes = make_embedding(0.0).nbytes
+    cache = QueryEmbeddingCache(max_bytes=entry_bytes * 2, ttl_seconds=60)
+    cache.put("a", MODEL_ID, make_embedding(1.0))
+    cache.put("b", MODEL_ID, make_embedding(2.0))
+    # a를 사용하여 b가 가장 오래 사용되지 않은 항목이 됨
+    assert cache.get("a", MODEL_ID) is not None
+
+    cache.put("c", MODEL_ID, make_embedding(3.0))
+
+    assert cache.get("b", MODEL_ID) is None
+    assert cache.get("a", MODEL_ID) is not None
+    assert cache.get("c", MODEL_ID) is not None
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["total_bytes"] == entry_bytes * 2
+
+
+def test_embedding_larger_than_budget_is_not_stored(clock):
+    cache = QueryEmbeddingCache(max_bytes=1024, ttl_seconds=60)
+    cache.put("query", MODEL_ID, make_embedding(1.0, tokens=16))
+
+    assert cache.get("query", MODEL_ID) is None
+    assert cache.get_stats()["total_bytes"] == 0
@@ -0,0 +1,162 @@
+"""추론 스케줄러(InferenceScheduler) 레인 우선순위/대기 정리 테스트"""
+import time
+import threading
+
+import pytest
+
+from be.core.scheduler import InferenceScheduler
+
+LANES = ("query", "indexing")
+
+
+def wait_until(condition, timeout: float = 5.0):
+    """조건이 참이 될 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("대기 시간 초과")
+        time.sleep(0.005)
+
+
+def waiting_count(scheduler: InferenceScheduler, lane: str) -> int:
+    return scheduler.get_stats()["lanes"][lane]["waiting"]
+
+
+class SlotRunner:
+    """슬롯을 얻은 순서를 기록하는 테스트 헬퍼"""
+
+    def __init__(self, scheduler: InferenceScheduler):
+        self.scheduler = scheduler
+        self.order = []
+        self.threads = []
+
+    def hold(self, lane: str, name: str, release: threading.Event):
+        """슬롯을 얻은 뒤 release가 설정될 때까지 점유"""
+        def run():
+            with self.scheduler.slot(lane):
+                self.order.append(name)
+                release.wait(5)
+        self._start(run)
+
+    def run(self, lane: str, name: str, queued: bool = True):
+        """
+        슬롯을 얻으면 순서만 기록하고 바로 반환
+        queued이면 대기열에 들어갈 때까지, 아니면 실행될 때까지 대기
+        """
+        waiting = waiting_count(self.scheduler, lane)
+
+        def run():
+            with self.scheduler.slot(lane):
+                self.order.append(name)
+        self._start(run)
+        if queued:
+            wait_until(lambda: waiting_count(self.scheduler, lane) > waiting)
+        else:
+            wait_until(lambda: name in self.order)
+
+    def _start(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(5)
+
+
+def test_waiting_query_runs_before_earlier_indexing_batches():
+    scheduler = InferenceScheduler(LANES, max_concurrency=1)
+    runner = SlotRunner(scheduler)
+    release = threading.Event()
+
+    runner.hold("indexing", "indexing-0", release)
+    wait_until(lambda: runner.order == ["indexing-0"])
+    runner.run("indexing", "indexing-1")
+    runner.run("indexing", "indexing-2")
+    runner.run("query", "query-1")
+    release.set()
+    runner.join()
+
+    # 실행 중인 배치는 중단하지 않고, 대기 중인 쿼리가 먼저 대기한 인덱싱 배치보다 먼저 실행됨
+    assert runner.order == ["indexing-0", "query-1", "indexing-1", "indexing-2"]
+    stats = scheduler.get_stats()["lanes"]
+    assert stats["query"]["completed"] == 1
+    assert stats["indexing"]["completed"] == 3
+
+
+def test_requests_in_same_lane_run_in_arrival_order():
+    scheduler = InferenceScheduler(LANES, max_concurrency=1)
+    runner = SlotRunner(scheduler)
+    release = threading.Event()
+
+    runner.hold("query", "query-0", release)
+    wait_until(lambda: runner.order == ["query-0"])
+    for index in range(1, 4):
+        runner.run("query", f"query-{index}")
+    release.set()
+    runner.join()
+
+    assert runner.order == ["query-0", "query-1", "query-2", "query-3"]
+
+
+def test_lane_concurrency_leaves_slots_for_other_lanes():
+    scheduler = InferenceScheduler(LANES, max_concurrency=2, lane_concurrency={"indexing": 1})
+    runner = SlotRunner(scheduler)
+    release = threading.Event()
+
+    runner.hold("indexing", "indexing-0", release)
+    wait_until(lambda: runner.order == ["indexing-0"])
+    runner.run("indexing", "indexing-1")
+    # 인덱싱 레인은 한도에 도달했으므로 남은 슬롯은 쿼리가 사용
+    runner.run("query", "query-1", queued=False)
+    assert "indexing-1" not in runner.order
+
+    release.set()
+    runner.join()
+    assert runner.order == ["indexing-0", "query-1", "indexing-1"]
+
+
+def test_unknown_lane_raises():
+    scheduler = InferenceScheduler(LANES)
+
+    with pytest.raises(ValueError):
+        with scheduler.slot("batch"):
+            pass
+
+
+def test_interrupted_wait_removes_ticket():
+    scheduler = InferenceScheduler(LANES, max_concurrency=1)
+    runner = SlotRunner(scheduler)
+    release = threading.Event()
+    runner.hold("indexing", "indexing-0", release)
+    wait_until(lambda: runner.order == ["indexing-0"])
+
+    # 대기 중 예외(KeyboardInterrupt 등)가 발생한 상황을 재현
+    original_wait = scheduler._condition.wait
+
+    def interrupted_wait(*args, **kwargs):
+        if threading.current_thread().name == "interrupted":
+            raise KeyboardInterrupt
+        return original_wait(*args, **kwargs)
+
+    scheduler._condition.wait = interrupted_wait
+    errors = []
+
+    def interrupted():
+        try:
+            with scheduler.slot("query"):
+                pass
+        except KeyboardInterrupt:
+            errors.append("interrupted")
+
+    thread = threading.Thread(target=interrupted, name="interrupted")
+    thread.start()
+    thread.join(5)
+    assert errors == ["interrupted"]
+    assert waiting_count(scheduler, "query") == 0
+
+    # 남은 티켓이 없으므로 다음 쿼리가 막히지 않음
+    runner.run("query", "query-1")
+    release.set()
+    runner.join()
+    assert runner.order == ["indexing-0", "query-1"]